@@ -5,21 +5,24 @@ Efficient BaoStock data download program with DuckDB storage
 Features:
 1. Auto-incremental: queries MAX(date) to determine start_date per symbol
 2. Auto-dedup: uses INSERT OR REPLACE with PRIMARY KEY constraints
-3. Batch transaction: commits once per batch for better performance
+3. Batch transaction: one upsert per table and one commit per batch
 
 Output: DuckDB database (data/simtradedata.duckdb)
 Export to Parquet: use scripts/export_parquet.py
 """
 
+import atexit
 import fcntl
 import json
 import logging
+import logging.handlers
 import os
+import queue
 import sys
+import threading
 from datetime import datetime, timedelta
 from pathlib import Path
 
-import baostock as bs
 import pandas as pd
 from tqdm import tqdm
 
@@ -27,6 +30,7 @@ from simtradedata.config.field_mappings import BENCHMARK_CONFIG
 from simtradedata.fetchers.baostock_fetcher import BaoStockFetcher
 from simtradedata.fetchers.unified_fetcher import UnifiedDataFetcher
 from simtradedata.processors.data_splitter import DataSplitter
+from simtradedata.utils.file_cache import TTL_DAY, TTL_FOREVER, TTL_HOUR, FileCache
 from simtradedata.writers.duckdb_writer import DEFAULT_DB_PATH, DuckDBWriter
 
 # Configuration
@@ -41,15 +45,61 @@ END_DATE = None  # None means use current date
 # Batch configuration
 BATCH_SIZE = 20
 
+# Batches buffered between the fetch loop and the writer thread
+WRITE_QUEUE_SIZE = 4
+
+# Max queued batches merged into one write transaction
+WRITE_COALESCE_BATCHES = 4
+
+# Tables written once per batch by download_batch
+BATCH_TABLES = ["stocks", "valuation", "adjust_factors", "exrights"]
+
+# Response cache TTLs (seconds, None = never expires)
+CACHE_TTL_BASIC = 30 * TTL_DAY
+CACHE_TTL_INDUSTRY = 30 * TTL_DAY
+CACHE_TTL_ADJUST = 7 * TTL_DAY
+
+# stock_basic fields kept as per-stock basic info
+BASIC_INFO_FIELDS = ["status", "ipoDate", "outDate", "type", "code_name"]
+
+# Indices whose constituents are sampled (BaoStock-supported)
+INDEX_CODES = ["000016.SS", "000300.SS", "000905.SS"]
+
+# Daily snapshots (stock list, index members) older than this are immutable
+SNAPSHOT_SETTLE_DAYS = 3
+
+# Sampled dates merged into stock_pool per checkpoint
+SAMPLE_CHECKPOINT_DATES = 12
+
+# Log records buffered in memory before each file write
+LOG_BUFFER_RECORDS = 1024
+
+# Minimum seconds between progress bar refreshes
+PROGRESS_MININTERVAL = 1.0
+
 # Ensure log directory exists
 Path(LOG_FILE).parent.mkdir(parents=True, exist_ok=True)
 
-logging.basicConfig(
-    filename=LOG_FILE,
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    filemode="w",
+# Threads only enqueue log records; a listener thread buffers them and
+# writes to the file in blocks (errors flush immediately)
+_file_handler = logging.FileHandler(LOG_FILE, mode="w")
+_file_handler.setFormatter(
+    logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
 )
+_log_queue = queue.Queue(-1)
+_log_listener = logging.handlers.QueueListener(
+    _log_queue,
+    logging.handlers.MemoryHandler(
+        capacity=LOG_BUFFER_RECORDS,
+        flushLevel=logging.ERROR,
+        target=_file_handler,
+    ),
+)
+_queue_handler = logging.handlers.QueueHandler(_log_queue)
+_queue_handler.setFormatter(logging.Formatter("%(message)s"))
+logging.basicConfig(level=logging.INFO, handlers=[_queue_handler])
+_log_listener.start()
+atexit.register(_log_listener.stop)
 logger = logging.getLogger(__name__)
 
 
@@ -99,6 +149,7 @@ class EfficientBaoStockDownloader:
         db_path: str = DEFAULT_DB_PATH,
         skip_fundamentals: bool = False,
         skip_metadata: bool = False,
+        force_refresh: bool = False,
     ):
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
@@ -107,28 +158,121 @@ class EfficientBaoStockDownloader:
         self.standard_fetcher = BaoStockFetcher()
         self.data_splitter = DataSplitter()
         self.writer = DuckDBWriter(db_path=str(self.db_path))
+        self.cache = FileCache(force_refresh=force_refresh)
 
         self.skip_fundamentals = skip_fundamentals
         self.skip_metadata = skip_metadata
 
-        self.status_cache = {}
         self.failed_stocks = []
 
+        # {symbol: max stored date}, prefetched by load_max_dates()
+        self.max_dates = None
+
+        # {symbol: basic info dict} of all securities, see get_stock_basics()
+        self._stock_basics = None
+
+        self.write_queue = None
+        self.writer_thread = None
+
+        # Stocks whose batch the writer thread failed to write, read
+        # after stop_writer()
+        self.write_failed = set()
+
+    @staticmethod
+    def _period_ttl(period_end: str):
+        """TTL for a query ending at period_end: closed months never expire"""
+        month_start = datetime.now().strftime("%Y-%m-01")
+        return TTL_FOREVER if period_end < month_start else TTL_DAY
+
+    @staticmethod
+    def _snapshot_ttl(snapshot_date: str):
+        """TTL for a daily snapshot: settled dates never expire"""
+        settled = datetime.now() - timedelta(days=SNAPSHOT_SETTLE_DAYS)
+        return TTL_FOREVER if snapshot_date < settled.strftime("%Y-%m-%d") else TTL_HOUR
+
+    def load_max_dates(self) -> None:
+        """Prefetch MAX(date) of every symbol with one grouped query"""
+        self.max_dates = self.writer.get_max_dates("stocks")
+
+    def get_stock_basics(self) -> dict:
+        """Basic info of all securities from one cached query
+
+        The frame is converted once into {symbol: {field: value}}, so each
+        stock's lookup is a dict access instead of a per-stock frame
+        selection.
+        """
+        if self._stock_basics is None:
+            df = self.cache.get_or_fetch(
+                "stock_basic_all",
+                (),
+                self.standard_fetcher.fetch_all_stock_basics,
+                ttl=CACHE_TTL_BASIC,
+            )
+            if df.empty:
+                self._stock_basics = {}
+            else:
+                self._stock_basics = (
+                    df.drop_duplicates("symbol")
+                    .set_index("symbol")[BASIC_INFO_FIELDS]
+                    .to_dict("index")
+                )
+        return self._stock_basics
+
     def get_incremental_start_date(self, symbol: str) -> str:
         """
         Get incremental start date for a symbol.
         Returns next day after MAX(date), or START_DATE if no data.
         """
-        max_date = self.writer.get_max_date("stocks", symbol)
+        if self.max_dates is not None:
+            max_date = self.max_dates.get(symbol)
+        else:
+            max_date = self.writer.get_max_date("stocks", symbol)
         if max_date:
             next_day = datetime.strptime(max_date, "%Y-%m-%d") + timedelta(days=1)
             return next_day.strftime("%Y-%m-%d")
         return START_DATE
 
+    def fetch_dividends(
+        self, symbol: str, start_year: int, end_year: int
+    ) -> pd.DataFrame:
+        """Fetch ex-rights records year by year through the response cache
+
+        Ex-rights years that have ended never change, so they are cached
+        (including years without any record) and only the current year is
+        queried again on later runs.
+        """
+        current_year = datetime.now().year
+        dfs = []
+        for year in range(start_year, end_year + 1):
+            try:
+                df = self.cache.get_or_fetch(
+                    "dividend",
+                    (symbol, year),
+                    lambda: self.standard_fetcher.fetch_dividend_data(
+                        symbol, year, year_type="operate"
+                    ),
+                    ttl=TTL_FOREVER if year < current_year else TTL_DAY,
+                    keep_empty=True,
+                )
+                if not df.empty:
+                    dfs.append(df)
+            except Exception as e:
+                logger.warning(f"Failed to fetch dividend for {symbol} year {year}: {e}")
+
+        if not dfs:
+            return pd.DataFrame()
+
+        result = pd.concat(dfs, ignore_index=True)
+        return result.drop_duplicates(subset=["date"]).sort_values("date")
+
     def download_stock_data(
-        self, symbol: str, start_date: str, end_date: str
+        self, symbol: str, start_date: str, end_date: str, pending: dict
     ) -> dict:
-        """Download all data for a single stock with auto-incremental logic"""
+        """Download all data for a single stock with auto-incremental logic
+
+        Fetched frames are appended to pending[table] as (symbol, data)
+        tuples and written once per batch by download_batch.
+        """
         try:
             # Auto-incremental: determine actual start date
             actual_start = self.get_incremental_start_date(symbol)
@@ -139,8 +283,13 @@ class EfficientBaoStockDownloader:
             if start_date >= end_date:
                 return None
 
-            unified_df = self.unified_fetcher.fetch_unified_daily_data(
-                symbol, start_date, end_date
+            unified_df = self.cache.get_or_fetch(
+                "unified_daily",
+                (symbol, start_date, end_date),
+                lambda: self.unified_fetcher.fetch_unified_daily_data(
+                    symbol, start_date, end_date
+                ),
+                ttl=self._period_ttl(end_date),
             )
 
             if unified_df.empty:
@@ -149,24 +298,29 @@ class EfficientBaoStockDownloader:
 
             split_data = self.data_splitter.split_data(unified_df)
 
-            # Write market data
+            # Queue market data
             if "market" in split_data:
-                self.writer.write_market_data(symbol, split_data["market"])
+                pending["stocks"].append((symbol, split_data["market"]))
 
             valuation_data = split_data.get("valuation")
 
-            # Cache status data
+            # Queue status data (aggregated into ST/HALT rows at write time)
             if "status" in split_data:
-                self.status_cache[symbol] = split_data["status"]
+                pending["status"].append((symbol, split_data["status"]))
 
             # Download adjust factor
             try:
-                adj_factor = self.standard_fetcher.fetch_adjust_factor(
-                    symbol, start_date, end_date
+                adj_factor = self.cache.get_or_fetch(
+                    "adjust_factor",
+                    (symbol, start_date, end_date),
+                    lambda: self.standard_fetcher.fetch_adjust_factor(
+                        symbol, start_date, end_date
+                    ),
+                    ttl=CACHE_TTL_ADJUST,
                 )
                 if not adj_factor.empty:
                     adj_series = adj_factor.set_index("date")["backAdjustFactor"]
-                    self.writer.write_adjust_factor(symbol, adj_series)
+                    pending["adjust_factors"].append((symbol, adj_series))
             except Exception as e:
                 logger.warning(f"Failed to fetch adjust factor for {symbol}: {e}")
 
@@ -174,11 +328,9 @@ class EfficientBaoStockDownloader:
             try:
                 start_year = int(start_date[:4])
                 end_year = int(end_date[:4])
-                dividend_df = self.standard_fetcher.fetch_dividend_data_range(
-                    symbol, start_year, end_year
-                )
+                dividend_df = self.fetch_dividends(symbol, start_year, end_year)
                 if not dividend_df.empty:
-                    self.writer.write_exrights(symbol, dividend_df)
+                    pending["exrights"].append((symbol, dividend_df))
             except Exception as e:
                 logger.warning(f"Failed to fetch dividend for {symbol}: {e}")
 
@@ -187,15 +339,19 @@ class EfficientBaoStockDownloader:
             is_incremental = actual_start > START_DATE
             if not self.skip_metadata and not is_incremental:
                 try:
-                    basic_df = self.standard_fetcher.fetch_stock_basic(symbol)
-                    if not basic_df.empty:
-                        basic_info = {
-                            "status": basic_df["status"].values[0],
-                            "ipoDate": basic_df["ipoDate"].values[0],
-                            "outDate": basic_df["outDate"].values[0],
-                            "type": basic_df["type"].values[0],
-                            "code_name": basic_df["code_name"].values[0],
-                        }
+                    basic_info = self.get_stock_basics().get(symbol)
+                    if basic_info is None:
+                        # Listed after the bulk snapshot was cached
+                        basic_df = self.cache.get_or_fetch(
+                            "stock_basic",
+                            (symbol,),
+                            lambda: self.standard_fetcher.fetch_stock_basic(symbol),
+                            ttl=CACHE_TTL_BASIC,
+                        )
+                        basic_info = {}
+                        if not basic_df.empty:
+                            row = basic_df.iloc[0]
+                            basic_info = {key: row[key] for key in BASIC_INFO_FIELDS}
                 except Exception as e:
                     logger.warning(f"Failed to fetch basic info for {symbol}: {e}")
 
@@ -203,20 +359,24 @@ class EfficientBaoStockDownloader:
             industry_info = {}
             if not self.skip_metadata and not is_incremental:
                 try:
-                    industry_df = self.standard_fetcher.fetch_stock_industry(symbol)
+                    industry_df = self.cache.get_or_fetch(
+                        "stock_industry",
+                        (symbol,),
+                        lambda: self.standard_fetcher.fetch_stock_industry(symbol),
+                        ttl=CACHE_TTL_INDUSTRY,
+                    )
                     if not industry_df.empty:
+                        row = industry_df.iloc[0]
                         industry_info = {
-                            "industry": industry_df["industry"].values[0],
-                            "industryClassification": industry_df[
-                                "industryClassification"
-                            ].values[0],
+                            key: row[key]
+                            for key in ("industry", "industryClassification")
                         }
                 except Exception as e:
                     logger.warning(f"Failed to fetch industry for {symbol}: {e}")
 
-            # Write valuation data (raw data only)
+            # Queue valuation data (raw data only)
             if valuation_data is not None and not valuation_data.empty:
-                self.writer.write_valuation(symbol, valuation_data)
+                pending["valuation"].append((symbol, valuation_data))
 
             # Only return metadata for new stocks (not incremental updates)
             if is_incremental:
@@ -227,9 +387,8 @@ class EfficientBaoStockDownloader:
                 "stock_name": basic_info.get("code_name", ""),
                 "listed_date": basic_info.get("ipoDate", ""),
                 "de_listed_date": basic_info.get("outDate", ""),
-                "blocks": json.dumps(industry_info, ensure_ascii=False)
-                if industry_info
-                else None,
+                # Serialized to JSON once per run when metadata is saved
+                "blocks": industry_info or None,
             }
 
         except Exception as e:
@@ -240,87 +399,180 @@ class EfficientBaoStockDownloader:
     def download_batch(
         self, stock_batch: list, start_date: str, end_date: str, pbar=None
     ) -> list:
-        """Download data for a batch of stocks in a single transaction"""
+        """Download data for a batch of stocks in a single transaction
+
+        Writes are collected per table while fetching and issued as one
+        upsert per table for the whole batch. When the writer thread is
+        running, the batch is handed over to it so the next batch can be
+        fetched while this one is written.
+        """
         metadata_list = []
+        pending = {table: [] for table in BATCH_TABLES}
+        pending["status"] = []
+
+        for stock in stock_batch:
+            try:
+                metadata = self.download_stock_data(
+                    stock, start_date, end_date, pending
+                )
+                if metadata:
+                    metadata_list.append(metadata)
+            except Exception as e:
+                logger.error(f"Exception downloading {stock}: {e}")
+            finally:
+                if pbar:
+                    pbar.update(1)
+
+        if self.write_queue is not None:
+            self.write_queue.put((stock_batch, pending))
+        else:
+            self.write_pending(self.writer, pending)
 
-        self.writer.begin()
+        return metadata_list
+
+    @staticmethod
+    def write_pending(writer: DuckDBWriter, pending: dict) -> None:
+        """Write a batch's collected frames in a single transaction"""
+        writer.begin()
         try:
-            for stock in stock_batch:
-                try:
-                    metadata = self.download_stock_data(stock, start_date, end_date)
-                    if metadata:
-                        metadata_list.append(metadata)
-                except Exception as e:
-                    logger.error(f"Exception downloading {stock}: {e}")
-                finally:
-                    if pbar:
-                        pbar.update(1)
+            for table in BATCH_TABLES:
+                writer.write_batch(table, pending[table])
+            writer.add_stock_status_rows(
+                EfficientBaoStockDownloader.status_rows(pending["status"])
+            )
 
-            self.writer.commit()
+            writer.commit()
         except Exception:
-            self.writer.rollback()
+            writer.rollback()
             raise
 
-        return metadata_list
+    def start_writer(self) -> None:
+        """Start the background writer thread consuming download_batch output"""
+        if self.writer_thread is not None:
+            return
+
+        self.write_queue = queue.Queue(maxsize=WRITE_QUEUE_SIZE)
+        self.writer_thread = threading.Thread(
+            target=self._writer_loop,
+            args=(self.writer.duplicate(),),
+            name="duckdb-writer",
+            daemon=True,
+        )
+        self.writer_thread.start()
+
+    def stop_writer(self) -> None:
+        """Flush queued batches and stop the writer thread"""
+        if self.writer_thread is None:
+            return
+
+        self.write_queue.put(None)
+        self.writer_thread.join()
+        self.writer_thread = None
+        self.write_queue = None
 
-    def aggregate_and_write_status(self) -> None:
+    def _writer_loop(self, writer: DuckDBWriter) -> None:
+        """Write queued batches until a None sentinel is received
+
+        Batches that are already waiting in the queue (up to
+        WRITE_COALESCE_BATCHES) are merged and written in one transaction.
         """
-        Aggregate status_cache and write to stock_status table
+        try:
+            done = False
+            while not done:
+                item = self.write_queue.get()
+                if item is None:
+                    break
+
+                stock_batch, pending = item
+                stock_batch = list(stock_batch)
+                for _ in range(WRITE_COALESCE_BATCHES - 1):
+                    try:
+                        item = self.write_queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        done = True
+                        break
+                    stock_batch.extend(item[0])
+                    for table, items in item[1].items():
+                        pending[table].extend(items)
+
+                try:
+                    self.write_pending(writer, pending)
+                except Exception as e:
+                    logger.error(f"Batch write failed ({len(stock_batch)} stocks): {e}")
+                    self.failed_stocks.extend(stock_batch)
+                    self.write_failed.update(stock_batch)
+        finally:
+            writer.close()
 
-        Transforms per-symbol status data into per-date aggregated format:
-        - For each date, collect all symbols that are ST
-        - For each date, collect all symbols that are HALT (tradestatus=0)
+    @staticmethod
+    def status_rows(items: list) -> pd.DataFrame:
         """
-        if not self.status_cache:
-            logger.info("No status data to aggregate")
-            return
+        Build stock_status rows from a batch's per-symbol status data
 
-        # Collect all status data into a single DataFrame
-        all_status = []
-        for symbol, status_df in self.status_cache.items():
-            if status_df is None or status_df.empty:
-                continue
-            df = status_df.copy()
-            df["symbol"] = symbol
-            all_status.append(df)
-
-        if not all_status:
-            logger.info("No valid status data to aggregate")
-            return
+        Transforms per-symbol status frames into (date, status_type, symbol)
+        rows: ST for isST == 1, HALT for tradestatus == 0.
 
-        combined = pd.concat(all_status, ignore_index=True)
+        Args:
+            items: List of (symbol, status DataFrame with a date column)
+
+        Returns:
+            DataFrame with columns date (YYYYMMDD), status_type, symbol
+        """
+        items = [
+            (symbol, status_df)
+            for symbol, status_df in items
+            if status_df is not None and not status_df.empty
+        ]
+
+        if not items:
+            return pd.DataFrame()
+
+        # One long frame keyed by symbol, without a per-symbol copy
+        combined = pd.concat(
+            [status_df for _, status_df in items],
+            keys=[symbol for symbol, _ in items],
+            names=["symbol", None],
+        ).reset_index(level="symbol")
 
         # Ensure date column exists
         if "date" not in combined.columns:
             logger.warning("No date column in status data")
-            return
+            return pd.DataFrame()
 
-        # Convert isST and tradestatus to int
+        # Rows without a date belong to no day (factorize would code them -1)
+        combined = combined.dropna(subset=["date"])
+        if combined.empty:
+            return pd.DataFrame()
+
+        # Format each distinct date once, then map back by position
+        date_codes, unique_dates = pd.factorize(combined["date"])
+        date_strs = (
+            pd.to_datetime(unique_dates).strftime("%Y%m%d").to_numpy()[date_codes]
+        )
+
+        # Boolean masks over the whole frame instead of one filter per date
+        masks = {}
         if "isST" in combined.columns:
-            combined["isST"] = pd.to_numeric(combined["isST"], errors="coerce").fillna(0)
+            is_st = pd.to_numeric(combined["isST"], errors="coerce").fillna(0)
+            masks["ST"] = (is_st == 1).to_numpy()
         if "tradestatus" in combined.columns:
-            combined["tradestatus"] = pd.to_numeric(
+            trade_status = pd.to_numeric(
                 combined["tradestatus"], errors="coerce"
             ).fillna(1)
-
-        # Group by date and aggregate
-        for date_val in combined["date"].unique():
-            date_str = pd.to_datetime(date_val).strftime("%Y%m%d")
-            day_data = combined[combined["date"] == date_val]
-
-            # ST stocks
-            if "isST" in day_data.columns:
-                st_symbols = day_data[day_data["isST"] == 1]["symbol"].tolist()
-                if st_symbols:
-                    self.writer.write_stock_status(date_str, "ST", st_symbols)
-
-            # HALT stocks (tradestatus == 0)
-            if "tradestatus" in day_data.columns:
-                halt_symbols = day_data[day_data["tradestatus"] == 0]["symbol"].tolist()
-                if halt_symbols:
-                    self.writer.write_stock_status(date_str, "HALT", halt_symbols)
-
-        logger.info(f"Aggregated status data for {len(combined['date'].unique())} dates")
+            masks["HALT"] = (trade_status == 0).to_numpy()
+
+        symbols = combined["symbol"].to_numpy()
+        parts = [
+            pd.DataFrame({
+                "date": date_strs[mask],
+                "status_type": status_type,
+                "symbol": symbols[mask],
+            })
+            for status_type, mask in masks.items()
+        ]
+        return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
 
     def download_fundamentals_by_quarter(
         self, stock_pool: list, start_date: str, end_date: str
@@ -329,8 +581,9 @@ class EfficientBaoStockDownloader:
 
         Iterates quarter -> stocks (instead of stock -> quarters), enabling:
         1. Skip entirely completed quarters via fundamentals_progress table
-        2. Skip individual symbol+quarter pairs already in DB
-        3. Better progress tracking and error recovery
+        2. Skip symbols already in DB for the quarter (one query for all quarters)
+        3. One fundamentals upsert per batch
+        4. Better progress tracking and error recovery
         """
         from simtradedata.utils.sampling import quarter_end_date
         from simtradedata.utils.ttm_calculator import get_quarters_in_range
@@ -353,63 +606,74 @@ class EfficientBaoStockDownloader:
               f"completed: {len(quarters) - len(pending_quarters)}, "
               f"pending: {len(pending_quarters)}")
 
+        # Symbols already stored for each pending quarter (one query)
+        quarter_ends = [quarter_end_date(y, q) for y, q in pending_quarters]
+        stored = self.writer.get_fundamental_symbols(quarter_ends)
+
         for qi, (year, quarter) in enumerate(pending_quarters, 1):
-            q_end = quarter_end_date(year, quarter)
+            q_end = quarter_ends[qi - 1]
+            q_ttl = self._period_ttl(q_end)
             print(f"\n  Quarter {qi}/{len(pending_quarters)}: "
                   f"{year}Q{quarter} (end: {q_end})")
 
+            # Skip symbols already stored for this quarter
+            existing = stored[q_end]
+            to_fetch = [s for s in stock_pool if s not in existing]
+            skip_count = len(stock_pool) - len(to_fetch)
+
             # Batch process stocks for this quarter
             batches = [
-                stock_pool[i : i + BATCH_SIZE]
-                for i in range(0, len(stock_pool), BATCH_SIZE)
+                to_fetch[i : i + BATCH_SIZE]
+                for i in range(0, len(to_fetch), BATCH_SIZE)
             ]
 
             success_count = 0
-            skip_count = 0
 
             with tqdm(
-                total=len(stock_pool),
+                total=len(to_fetch),
                 desc=f"  {year}Q{quarter}",
                 unit="stock",
                 ncols=100,
+                mininterval=PROGRESS_MININTERVAL,
             ) as pbar:
                 for batch in batches:
-                    self.writer.begin()
-                    try:
-                        for symbol in batch:
-                            try:
-                                if self.writer.has_fundamental(symbol, q_end):
-                                    skip_count += 1
-                                    continue
-
-                                fund_df = (
-                                    self.standard_fetcher
-                                    .fetch_quarterly_fundamentals(
-                                        symbol, year, quarter
-                                    )
-                                )
+                    fund_items = []
+                    for symbol in batch:
+                        try:
+                            fund_df = self.cache.get_or_fetch(
+                                "quarterly_fundamentals",
+                                (symbol, year, quarter),
+                                lambda: self.standard_fetcher
+                                .fetch_quarterly_fundamentals(
+                                    symbol, year, quarter
+                                ),
+                                ttl=q_ttl,
+                            )
 
-                                if not fund_df.empty:
-                                    if "end_date" in fund_df.columns:
-                                        fund_df = fund_df.sort_values("end_date")
-                                        fund_df = fund_df.set_index("end_date")
-                                    self.writer.write_fundamentals(
-                                        symbol, fund_df
-                                    )
-                                    success_count += 1
-                            except Exception as e:
-                                logger.warning(
-                                    f"Failed fundamentals {symbol} "
-                                    f"{year}Q{quarter}: {e}"
-                                )
-                            finally:
-                                pbar.update(1)
+                            if not fund_df.empty:
+                                if "end_date" in fund_df.columns:
+                                    fund_df = fund_df.sort_values("end_date")
+                                    fund_df = fund_df.set_index("end_date")
+                                fund_items.append((symbol, fund_df))
+                        except Exception as e:
+                            logger.warning(
+                                f"Failed fundamentals {symbol} "
+                                f"{year}Q{quarter}: {e}"
+                            )
+                        finally:
+                            pbar.update(1)
 
+                    # One upsert for the whole batch
+                    self.writer.begin()
+                    try:
+                        self.writer.write_batch("fundamentals", fund_items)
                         self.writer.commit()
+                        success_count += len(fund_items)
                     except Exception:
                         self.writer.rollback()
                         raise
 
+            self.cache.flush()
             self.writer.mark_fundamental_quarter_completed(
                 year, quarter, success_count
             )
@@ -420,11 +684,13 @@ def download_all_data(
     skip_fundamentals=False,
     skip_metadata=False,
     start_date=None,
+    force_refresh=False,
 ):
     """
     Main download function with auto-incremental logic.
 
     Each symbol automatically starts from MAX(date)+1, no manual resume needed.
+    Responses are cached under data/.cache; force_refresh bypasses cached entries.
     """
     with ProcessLock(LOCK_FILE):
         print("=" * 70)
@@ -436,6 +702,8 @@ def download_all_data(
             print("Fundamentals: Skipped")
         if skip_metadata:
             print("Metadata: Skipped")
+        if force_refresh:
+            print("Cache: Force refresh")
 
         print("=" * 70)
 
@@ -461,6 +729,7 @@ def download_all_data(
             db_path=str(db_path),
             skip_fundamentals=skip_fundamentals,
             skip_metadata=skip_metadata,
+            force_refresh=force_refresh,
         )
         downloader.unified_fetcher.login()
         downloader.standard_fetcher.login()
@@ -471,21 +740,15 @@ def download_all_data(
                 generate_monthly_end_dates,
                 generate_monthly_start_dates,
             )
-            from simtradedata.utils.code_utils import convert_to_ptrade_code
+            from simtradedata.utils.code_utils import (
+                A_SHARE_PREFIXES,
+                convert_to_ptrade_codes,
+            )
 
             def is_a_share_stock(code: str) -> bool:
                 """Filter to only A-share stocks (exclude ETF, index, bonds)"""
                 symbol = code.split('.')[0] if '.' in code else code
-                if len(symbol) != 6:
-                    return False
-                prefix = symbol[:3]
-                # Shanghai: 600/601/603/605 (main), 688/689 (STAR)
-                # Shenzhen: 000/001/002/003 (main), 300/301 (ChiNext)
-                valid_prefixes = {
-                    '600', '601', '603', '605', '688', '689',  # SH
-                    '000', '001', '002', '003', '300', '301',  # SZ
-                }
-                return prefix in valid_prefixes
+                return len(symbol) == 6 and symbol[:3] in A_SHARE_PREFIXES
 
             sample_dates = generate_monthly_start_dates(
                 START_DATE, end_date.strftime("%Y-%m-%d")
@@ -495,19 +758,30 @@ def download_all_data(
             sampled_dates = set(downloader.writer.get_sampled_dates())
             cached_pool = downloader.writer.get_stock_pool()
 
-            # Also get stocks already in database (from TDX import)
-            existing_stocks = set(downloader.writer.get_existing_stocks("stocks"))
-
-            # Filter to only unsampled dates
-            new_dates = [d for d in sample_dates if d.date() not in sampled_dates]
+            # Also get stocks already in database (from TDX import).
+            # One grouped scan serves both the symbol set and the
+            # per-symbol incremental start dates used below.
+            downloader.load_max_dates()
+            existing_stocks = set(downloader.max_dates)
+
+            # Filter to only unsampled dates, probing a frozenset of day
+            # numbers instead of building a date object per sample date
+            sampled_days = frozenset(
+                pd.DatetimeIndex(list(sampled_dates))
+                .values.astype("datetime64[D]")
+                .astype("int64")
+                .tolist()
+            )
+            sample_days = (
+                pd.DatetimeIndex(sample_dates).values.astype("datetime64[D]").astype("int64")
+            )
+            new_dates = [
+                d for d, day in zip(sample_dates, sample_days.tolist())
+                if day not in sampled_days
+            ]
 
             if cached_pool and not new_dates:
-                # Merge cached pool with existing stocks
-                all_stocks = set(cached_pool) | existing_stocks
-                # Filter to A-share stocks only
-                stock_pool = sorted([s for s in all_stocks if is_a_share_stock(s)])
-                print(f"\nStock pool: {len(stock_pool)} A-shares")
-                print(f"  (from stock_pool: {len(cached_pool)}, from TDX import: {len(existing_stocks)})")
+                all_stocks = set(cached_pool)
             else:
                 # Sample new dates (or all if first run)
                 dates_to_sample = new_dates if cached_pool else sample_dates
@@ -515,61 +789,153 @@ def download_all_data(
                 print(f"\n{desc}...")
 
                 all_stocks = set(cached_pool) if cached_pool else set()
-                for date_obj in tqdm(dates_to_sample, desc=desc):
-                    date_str = date_obj.strftime("%Y-%m-%d")
+                sampled_frames = []
+                done_dates = []
+
+                def checkpoint_sampling():
+                    """Merge sampled codes into the pool and mark their dates done"""
+                    if sampled_frames:
+                        pool_df = (
+                            pd.concat(sampled_frames, ignore_index=True)
+                            .groupby("code")["sample_date"]
+                            .agg(first_seen_date="min", last_seen_date="max")
+                            .reset_index()
+                        )
+                        pool_df["symbol"] = convert_to_ptrade_codes(
+                            pool_df["code"], "baostock"
+                        )
+                        downloader.writer.merge_stock_pool(pool_df)
+                        all_stocks.update(pool_df["symbol"])
+                    downloader.writer.add_sampled_dates(done_dates)
+                    downloader.cache.flush()
+                    sampled_frames.clear()
+                    done_dates.clear()
+
+                date_strs = pd.DatetimeIndex(dates_to_sample).strftime("%Y-%m-%d")
+                for date_obj, date_str in tqdm(
+                    zip(dates_to_sample, date_strs), total=len(date_strs), desc=desc
+                ):
                     try:
-                        rs = bs.query_all_stock(day=date_str)
-                        if rs.error_code == "0":
-                            stocks_df = rs.get_data()
-                            if not stocks_df.empty:
-                                codes = [convert_to_ptrade_code(c, "baostock")
-                                         for c in stocks_df["code"].tolist()]
-                                all_stocks.update(codes)
-                                downloader.writer.update_stock_pool(codes, date_obj.date())
-                        downloader.writer.add_sampled_date(date_obj.date())
+                        stocks_df = downloader.cache.get_or_fetch(
+                            "all_stocks",
+                            (date_str,),
+                            lambda: downloader.standard_fetcher.fetch_all_stocks(
+                                date_str
+                            ),
+                            ttl=downloader._snapshot_ttl(date_str),
+                        )
+                        if not stocks_df.empty:
+                            sampled_frames.append(pd.DataFrame({
+                                "code": stocks_df["code"],
+                                "sample_date": date_obj.date(),
+                            }))
+                        done_dates.append(date_obj.date())
                     except Exception as e:
                         logger.error(f"Failed to sample {date_str}: {e}")
 
-                # Merge with existing stocks from TDX import
-                all_stocks |= existing_stocks
-                # Filter to A-share stocks only
-                stock_pool = sorted([s for s in all_stocks if is_a_share_stock(s)])
-                print(f"Total A-share stocks: {len(stock_pool)}")
+                    # Checkpoint every few dates so an interrupted run
+                    # resumes from the last checkpoint instead of date one
+                    if len(done_dates) >= SAMPLE_CHECKPOINT_DATES:
+                        checkpoint_sampling()
+
+                checkpoint_sampling()
+
+            # Merge with existing stocks (e.g. from TDX import) and keep
+            # A-share stocks only, sorted once
+            pool_size = len(all_stocks)
+            all_stocks |= existing_stocks
+            stock_pool = sorted(s for s in all_stocks if is_a_share_stock(s))
+            print(f"\nStock pool: {len(stock_pool)} A-shares")
+            print(f"  (from stock_pool: {pool_size}, from TDX import: {len(existing_stocks)})")
+
+            # Trading calendar (fetched first: its last trading day tells
+            # which stocks already hold all available data)
+            print("\nTrading calendar...")
+            last_trade_day = end_date_str
+            try:
+                trade_cal = downloader.standard_fetcher.fetch_trade_calendar(
+                    start_date_str, end_date_str
+                )
+                if not trade_cal.empty:
+                    trade_days = trade_cal[trade_cal["is_trading_day"] == "1"]
+                    trade_days = trade_days.rename(
+                        columns={"calendar_date": "trade_date"}
+                    )
+                    downloader.writer.write_trade_days(trade_days)
+                    if not trade_days.empty:
+                        last_trade_day = trade_days["trade_date"].max()
+                    print(f"  {len(trade_days)} days, last: {last_trade_day}")
+            except Exception as e:
+                logger.error(f"Failed to download trading calendar: {e}")
+
+            # Skip stocks whose stored data already covers the date range
+            # (no trading day left between their next start and end date)
+            to_update = []
+            for symbol in stock_pool:
+                next_start = max(
+                    downloader.get_incremental_start_date(symbol), start_date_str
+                )
+                if next_start < end_date_str and next_start <= last_trade_day:
+                    to_update.append(symbol)
+            up_to_date = len(stock_pool) - len(to_update)
 
             # Download in batches
             batches = [
-                stock_pool[i : i + BATCH_SIZE]
-                for i in range(0, len(stock_pool), BATCH_SIZE)
+                to_update[i : i + BATCH_SIZE]
+                for i in range(0, len(to_update), BATCH_SIZE)
             ]
 
-            print(f"\nProcessing {len(stock_pool)} stocks in {len(batches)} batches...")
+            print(f"\nUp to date: {up_to_date} stocks")
+            print(f"Processing {len(to_update)} stocks in {len(batches)} batches...")
             print(f"Batch size: {BATCH_SIZE}")
             print("Note: Each symbol auto-detects its incremental start date")
             print("=" * 60)
 
             all_metadata = []
             success = 0
-            skipped = 0
+            skipped = up_to_date
 
-            # Use a single progress bar for total stocks with more info
-            with tqdm(
-                total=len(stock_pool),
-                desc="Downloading stocks",
-                unit="stock",
-                ncols=100,
-                bar_format="{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}, {rate_fmt}]"
-            ) as pbar:
-                for batch in batches:
-                    try:
-                        metadata_list = downloader.download_batch(
-                            batch, start_date_str, end_date_str, pbar
-                        )
-                        all_metadata.extend(metadata_list)
-                        success += len(metadata_list)
-                        skipped += len(batch) - len(metadata_list)
-                    except Exception as e:
-                        logger.error(f"Batch failed: {e}")
-                        pbar.update(len(batch))
+            # Writes run on a background thread while the next batch is
+            # fetched; checkpoints are deferred until all batches are in
+            with downloader.writer.bulk_load():
+                downloader.start_writer()
+                try:
+                    # Use a single progress bar for total stocks with more info
+                    with tqdm(
+                        total=len(to_update),
+                        desc="Downloading stocks",
+                        unit="stock",
+                        ncols=100,
+                        mininterval=PROGRESS_MININTERVAL,
+                        bar_format="{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}, {rate_fmt}]"
+                    ) as pbar:
+                        for batch in batches:
+                            try:
+                                metadata_list = downloader.download_batch(
+                                    batch, start_date_str, end_date_str, pbar
+                                )
+                                all_metadata.extend(metadata_list)
+                                success += len(metadata_list)
+                                skipped += len(batch) - len(metadata_list)
+                            except Exception as e:
+                                logger.error(f"Batch failed: {e}")
+                                pbar.update(len(batch))
+                finally:
+                    downloader.stop_writer()
+                    downloader.cache.flush()
+
+            # Stocks of batches the writer thread failed to write have no
+            # price rows, so they are neither updated nor saved in metadata
+            if downloader.write_failed:
+                updated = len(all_metadata)
+                all_metadata = [
+                    metadata
+                    for metadata in all_metadata
+                    if metadata["stock_code"] not in downloader.write_failed
+                ]
+                dropped = updated - len(all_metadata)
+                success -= dropped
+                skipped += dropped
 
             print("=" * 60)
             print(f"Download complete: {success} updated, {skipped} skipped/failed")
@@ -578,18 +944,14 @@ def download_all_data(
             if all_metadata:
                 print("\nSaving stock metadata...")
                 meta_df = pd.DataFrame(all_metadata)
+                encode = json.JSONEncoder(ensure_ascii=False).encode
+                meta_df["blocks"] = [
+                    encode(blocks) if blocks else None for blocks in meta_df["blocks"]
+                ]
                 meta_df.set_index("stock_code", inplace=True)
                 meta_df = meta_df.sort_index()
                 downloader.writer.write_stock_metadata(meta_df)
 
-            # Aggregate and save stock status (ST/HALT)
-            print("\nAggregating stock status...")
-            try:
-                downloader.aggregate_and_write_status()
-                print("  Stock status saved")
-            except Exception as e:
-                logger.error(f"Failed to aggregate stock status: {e}")
-
             # Download quarterly fundamentals (organized by quarter)
             if not skip_fundamentals:
                 print("\nDownloading quarterly fundamentals...")
@@ -603,22 +965,6 @@ def download_all_data(
             # Download global data
             print("\nDownloading global data...")
 
-            # Trading calendar
-            print("  Trading calendar...")
-            try:
-                trade_cal = downloader.standard_fetcher.fetch_trade_calendar(
-                    start_date_str, end_date_str
-                )
-                if not trade_cal.empty:
-                    trade_days = trade_cal[trade_cal["is_trading_day"] == "1"]
-                    trade_days = trade_days.rename(
-                        columns={"calendar_date": "trade_date"}
-                    )
-                    downloader.writer.write_trade_days(trade_days)
-                    print(f"    {len(trade_days)} days")
-            except Exception as e:
-                logger.error(f"Failed to download trading calendar: {e}")
-
             # Benchmark index
             BENCHMARK_INDEX = BENCHMARK_CONFIG["default_index"]
             print(f"  Benchmark index ({BENCHMARK_INDEX})...")
@@ -638,34 +984,54 @@ def download_all_data(
                 index_sample_dates = generate_monthly_end_dates(
                     START_DATE, end_date.strftime("%Y-%m-%d")
                 )
-                for date_obj in index_sample_dates:
-                    date_str = date_obj.strftime("%Y%m%d")
 
-                    for index_code in ["000016.SS", "000300.SS", "000905.SS"]:
+                # BaoStock allows one session per process, so the queries
+                # stay sequential; settled (date, index) pairs already in
+                # the database are skipped instead.
+                stored_pairs = downloader.writer.get_index_constituent_keys()
+
+                # Format storage (YYYYMMDD) and query (YYYY-MM-DD) dates once
+                index_dates = pd.DatetimeIndex(index_sample_dates)
+                date_pairs = zip(
+                    index_dates.strftime("%Y%m%d"), index_dates.strftime("%Y-%m-%d")
+                )
+
+                fetched = 0
+                for date_str, query_date in date_pairs:
+                    ttl = downloader._snapshot_ttl(query_date)
+                    settled = ttl is TTL_FOREVER
+
+                    for index_code in INDEX_CODES:
+                        if settled and (date_str, index_code) in stored_pairs:
+                            continue
                         try:
-                            stocks_df = downloader.standard_fetcher.fetch_index_stocks(
-                                index_code, date_obj.strftime("%Y-%m-%d")
+                            stocks_df = downloader.cache.get_or_fetch(
+                                "index_stocks",
+                                (index_code, query_date),
+                                lambda: downloader.standard_fetcher.fetch_index_stocks(
+                                    index_code, query_date
+                                ),
+                                ttl=ttl,
                             )
                             if not stocks_df.empty:
-                                from simtradedata.utils.code_utils import (
-                                    convert_to_ptrade_code,
-                                )
-
-                                ptrade_codes = [
-                                    convert_to_ptrade_code(code, "baostock")
-                                    for code in stocks_df["code"].tolist()
-                                ]
+                                ptrade_codes = convert_to_ptrade_codes(
+                                    stocks_df["code"], "baostock"
+                                ).tolist()
                                 downloader.writer.write_index_constituents(
                                     date_str, index_code, ptrade_codes
                                 )
+                                fetched += 1
                         except Exception as e:
                             logger.warning(f"Index {index_code} {date_str}: {e}")
 
-                print(f"    {len(index_sample_dates)} dates")
+                downloader.cache.flush()
+                print(f"    {len(index_sample_dates)} dates, {fetched} snapshots updated")
             except Exception as e:
                 logger.error(f"Failed to download index constituents: {e}")
 
         finally:
+            downloader.stop_writer()
+            downloader.cache.flush()
             downloader.writer.close()
             downloader.unified_fetcher.logout()
             downloader.standard_fetcher.logout()
@@ -707,6 +1073,11 @@ if __name__ == "__main__":
         default=None,
         help="Override default start date (YYYY-MM-DD)",
     )
+    parser.add_argument(
+        "--force-refresh",
+        action="store_true",
+        help="Ignore cached API responses in data/.cache",
+    )
 
     args = parser.parse_args()
 
@@ -714,4 +1085,5 @@ if __name__ == "__main__":
         skip_fundamentals=args.skip_fundamentals,
         skip_metadata=args.skip_metadata,
         start_date=args.start_date,
+        force_refresh=args.force_refresh,
     )
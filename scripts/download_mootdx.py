@@ -14,10 +14,15 @@ Output: DuckDB database (data/simtradedata.duckdb)
 """
 
 import argparse
+import atexit
 import fcntl
 import logging
+import logging.handlers
 import os
+import queue
 import sys
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
 from pathlib import Path
 
@@ -26,6 +31,8 @@ from tqdm import tqdm
 
 from simtradedata.config.field_mappings import BENCHMARK_CONFIG
 from simtradedata.fetchers.mootdx_unified_fetcher import MootdxUnifiedFetcher
+from simtradedata.utils.code_utils import convert_to_ptrade_codes
+from simtradedata.utils.rate_limiter import AdaptiveLimiter
 from simtradedata.writers.duckdb_writer import DEFAULT_DB_PATH, DuckDBWriter
 
 # Configuration
@@ -37,18 +44,34 @@ LOCK_FILE = "data/.download_mootdx.lock"
 START_DATE = "2015-01-01"
 END_DATE = None  # None means current date
 
-# Batch size for stock processing
+# Stocks written per transaction
 BATCH_SIZE = 20
 
+# Max batches waiting for the writer thread (bounds memory if writes lag)
+WRITE_QUEUE_SIZE = 4
+
+# Fetch threads; AdaptiveLimiter decides how many run at once
+MAX_WORKERS = 8
+INITIAL_CONCURRENCY = 2
+
+# Max fetches submitted but not yet collected (bounds queued work and memory)
+MAX_IN_FLIGHT = MAX_WORKERS * 2
+
 # Ensure log directory exists
 Path(LOG_FILE).parent.mkdir(parents=True, exist_ok=True)
 
-logging.basicConfig(
-    filename=LOG_FILE,
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    filemode="w",
+# Fetch threads only enqueue log records; a listener thread writes them
+_file_handler = logging.FileHandler(LOG_FILE, mode="w")
+_file_handler.setFormatter(
+    logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
 )
+_log_queue = queue.Queue(-1)
+_log_listener = logging.handlers.QueueListener(_log_queue, _file_handler)
+_queue_handler = logging.handlers.QueueHandler(_log_queue)
+_queue_handler.setFormatter(logging.Formatter("%(message)s"))
+logging.basicConfig(level=logging.INFO, handlers=[_queue_handler])
+_log_listener.start()
+atexit.register(_log_listener.stop)
 logger = logging.getLogger(__name__)
 
 
@@ -102,85 +125,120 @@ class MootdxDownloader:
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
 
+        self.download_dir = download_dir
         self.unified_fetcher = MootdxUnifiedFetcher(download_dir=download_dir)
         self.writer = DuckDBWriter(db_path=str(self.db_path))
 
         self.skip_fundamentals = skip_fundamentals
         self.failed_stocks = []
 
+        # {symbol: max stored date}, prefetched by load_max_dates()
+        self.max_dates = None
+
+        # Concurrent per-stock fetching: one mootdx client per worker thread,
+        # concurrency adapted to server latency/errors
+        self.limiter = AdaptiveLimiter(
+            initial=INITIAL_CONCURRENCY, max_limit=MAX_WORKERS
+        )
+        self.executor = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+        self._local = threading.local()
+        self._thread_fetchers = []
+        self._fetchers_lock = threading.Lock()
+
+        self.write_queue = None
+        self.writer_thread = None
+        # Stocks written by the writer thread, read after stop_writer()
+        self.written_count = 0
+
+    def load_max_dates(self) -> None:
+        """Prefetch MAX(date) of every symbol with one grouped query"""
+        self.max_dates = self.writer.get_max_dates("stocks")
+
     def get_incremental_start_date(self, symbol: str) -> str:
         """Get next date after MAX(date) for incremental updates."""
-        max_date = self.writer.get_max_date("stocks", symbol)
+        if self.max_dates is not None:
+            max_date = self.max_dates.get(symbol)
+        else:
+            max_date = self.writer.get_max_date("stocks", symbol)
         if max_date:
             next_day = datetime.strptime(max_date, "%Y-%m-%d") + timedelta(days=1)
             return next_day.strftime("%Y-%m-%d")
         return START_DATE
 
-    def download_stock_data(
-        self, symbol: str, start_date: str, end_date: str
-    ) -> bool:
+    def _get_fetcher(self) -> MootdxUnifiedFetcher:
+        """Return this thread's fetcher (a mootdx client serializes calls)"""
+        fetcher = getattr(self._local, "fetcher", None)
+        if fetcher is None:
+            fetcher = MootdxUnifiedFetcher(download_dir=self.download_dir)
+            fetcher.login()
+            self._local.fetcher = fetcher
+            with self._fetchers_lock:
+                self._thread_fetchers.append(fetcher)
+        return fetcher
+
+    def shutdown(self) -> None:
+        """Stop fetch workers and release their clients"""
+        self.executor.shutdown(wait=True)
+        for fetcher in self._thread_fetchers:
+            fetcher.logout()
+        self._thread_fetchers = []
+
+    def fetch_stock_data(self, symbol: str, start_date: str, end_date: str) -> dict:
         """
-        Download daily OHLCV + adjust factor + XDXR for a single stock.
+        Fetch daily OHLCV + adjust factor + XDXR for a single stock.
+
+        Runs on a worker thread; nothing is written here.
 
         Returns:
-            True if data was downloaded, False if skipped/failed
+            Dict with "market", optional "adjust_factor" and "exrights",
+            or an empty dict if there is no data
         """
-        try:
-            # Auto-incremental
-            actual_start = self.get_incremental_start_date(symbol)
-            if actual_start > start_date:
-                start_date = actual_start
+        fetcher = self._get_fetcher()
 
-            if start_date > end_date:
-                return False  # Already up to date
+        # Fetch daily bars
+        with self.limiter.slot():
+            df = fetcher.fetch_daily_data(symbol, start_date, end_date)
 
-            # Fetch daily bars
-            df = self.unified_fetcher.fetch_daily_data(symbol, start_date, end_date)
+        if df.empty:
+            logger.warning(f"No data for {symbol}")
+            return {}
 
-            if df.empty:
-                logger.warning(f"No data for {symbol}")
-                return False
-
-            # Write market data (set date as index)
-            if "date" in df.columns:
-                market_df = df.set_index("date")
-            else:
-                market_df = df
+        # Set date as index
+        if "date" in df.columns:
+            market_df = df.set_index("date")
+        else:
+            market_df = df
 
-            # Rename amount -> money if needed
-            if "amount" in market_df.columns:
-                market_df = market_df.rename(columns={"amount": "money"})
+        # Rename amount -> money if needed
+        if "amount" in market_df.columns:
+            market_df = market_df.rename(columns={"amount": "money"})
 
-            self.writer.write_market_data(symbol, market_df)
+        result = {"market": market_df}
 
-            # Fetch and write adjust factor
-            try:
-                adj_df = self.unified_fetcher.fetch_adjust_factor(
-                    symbol, start_date, end_date
+        # Fetch adjust factor
+        try:
+            with self.limiter.slot():
+                adj_df = fetcher.fetch_adjust_factor(
+                    symbol, start_date, end_date, raw_df=df
                 )
-                if not adj_df.empty:
-                    adj_series = adj_df.set_index("date")["backAdjustFactor"]
-                    self.writer.write_adjust_factor(symbol, adj_series)
-            except Exception as e:
-                logger.warning(f"Failed to fetch adjust factor for {symbol}: {e}")
-
-            # Fetch and write XDXR data
-            try:
-                xdxr_df = self.unified_fetcher.fetch_xdxr(symbol)
-                if not xdxr_df.empty:
-                    # Convert XDXR to exrights format if possible
-                    exrights = self._convert_xdxr_to_exrights(xdxr_df)
-                    if not exrights.empty:
-                        self.writer.write_exrights(symbol, exrights)
-            except Exception as e:
-                logger.warning(f"Failed to fetch XDXR for {symbol}: {e}")
-
-            return True
+            if not adj_df.empty:
+                result["adjust_factor"] = adj_df.set_index("date")["backAdjustFactor"]
+        except Exception as e:
+            logger.warning(f"Failed to fetch adjust factor for {symbol}: {e}")
 
+        # Fetch XDXR data
+        try:
+            with self.limiter.slot():
+                xdxr_df = fetcher.fetch_xdxr(symbol)
+            if not xdxr_df.empty:
+                # Convert XDXR to exrights format if possible
+                exrights = self._convert_xdxr_to_exrights(xdxr_df)
+                if not exrights.empty:
+                    result["exrights"] = exrights
         except Exception as e:
-            logger.error(f"Failed to download {symbol}: {e}")
-            self.failed_stocks.append(symbol)
-            return False
+            logger.warning(f"Failed to fetch XDXR for {symbol}: {e}")
+
+        return result
 
     def _convert_xdxr_to_exrights(self, xdxr_df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -238,31 +296,155 @@ class MootdxDownloader:
 
         return result
 
-    def download_batch(
-        self, stock_batch: list, start_date: str, end_date: str, pbar=None
+    def download_stocks(
+        self, stock_pool: list, start_date: str, end_date: str, pbar=None
     ) -> int:
-        """Download data for a batch of stocks in a single transaction."""
+        """
+        Fetch stocks concurrently and write them in BATCH_SIZE transactions.
+
+        At most MAX_IN_FLIGHT fetches are outstanding: once the window is
+        full, submission waits for the next completion. Results are taken
+        in completion order, so one slow stock does not hold up a batch.
+
+        Returns:
+            Number of stocks written here; batches handed to the writer
+            thread are counted by stop_writer()
+        """
+        in_flight = {}
+        results = {}
         success_count = 0
 
-        self.writer.begin()
-        try:
-            for stock in stock_batch:
-                try:
-                    if self.download_stock_data(stock, start_date, end_date):
-                        success_count += 1
-                except Exception as e:
-                    logger.error(f"Exception downloading {stock}: {e}")
-                finally:
-                    if pbar:
-                        pbar.update(1)
+        for stock in stock_pool:
+            # Auto-incremental
+            stock_start = max(start_date, self.get_incremental_start_date(stock))
+            if stock_start > end_date:
+                # Already up to date
+                if pbar:
+                    pbar.update(1)
+                continue
+
+            if len(in_flight) >= MAX_IN_FLIGHT:
+                success_count += self._collect(in_flight, results, pbar)
+
+            future = self.executor.submit(
+                self.fetch_stock_data, stock, stock_start, end_date
+            )
+            in_flight[future] = stock
 
-            self.writer.commit()
-        except Exception:
-            self.writer.rollback()
-            raise
+        while in_flight:
+            success_count += self._collect(in_flight, results, pbar)
 
+        success_count += self._write_results(results)
         return success_count
 
+    def _collect(self, in_flight: dict, results: dict, pbar=None) -> int:
+        """Wait for at least one fetch, writing whenever a batch fills up"""
+        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+
+        written = 0
+        for future in done:
+            stock = in_flight.pop(future)
+            try:
+                results[stock] = future.result()
+            except Exception as e:
+                logger.error(f"Failed to download {stock}: {e}")
+                self.failed_stocks.append(stock)
+            finally:
+                if pbar:
+                    pbar.update(1)
+
+            if len(results) >= BATCH_SIZE:
+                written += self._write_results(results)
+
+        return written
+
+    def _write_results(self, results: dict) -> int:
+        """Hand fetched stocks to the writer thread (or write them) and clear results"""
+        batch = [(stock, data) for stock, data in results.items() if data]
+        results.clear()
+        if not batch:
+            return 0
+
+        if self.write_queue is not None:
+            # Counted by the writer thread once actually written
+            self.write_queue.put(batch)
+            return 0
+
+        return self._write_batch(self.writer, batch)
+
+    def _write_batch(self, writer: DuckDBWriter, batch: list) -> int:
+        """Write one batch of fetched stocks in a single transaction"""
+        writer.begin()
+        try:
+            writer.write_batch(
+                "stocks", [(stock, data["market"]) for stock, data in batch]
+            )
+            writer.write_batch(
+                "adjust_factors",
+                [
+                    (stock, data["adjust_factor"])
+                    for stock, data in batch
+                    if "adjust_factor" in data
+                ],
+            )
+            writer.write_batch(
+                "exrights",
+                [
+                    (stock, data["exrights"])
+                    for stock, data in batch
+                    if "exrights" in data
+                ],
+            )
+            writer.commit()
+        except Exception as e:
+            writer.rollback()
+            logger.error(f"Batch write failed ({len(batch)} stocks): {e}")
+            self.failed_stocks.extend(stock for stock, _ in batch)
+            return 0
+
+        return len(batch)
+
+    def start_writer(self) -> None:
+        """Start the background writer thread so fetching never waits on DuckDB"""
+        if self.writer_thread is not None:
+            return
+
+        self.write_queue = queue.Queue(maxsize=WRITE_QUEUE_SIZE)
+        self.written_count = 0
+        self.writer_thread = threading.Thread(
+            target=self._writer_loop,
+            args=(self.writer.duplicate(),),
+            name="duckdb-writer",
+            daemon=True,
+        )
+        self.writer_thread.start()
+
+    def stop_writer(self) -> int:
+        """Flush queued batches and stop the writer thread
+
+        Returns:
+            Number of stocks the writer thread wrote successfully
+        """
+        if self.writer_thread is None:
+            return 0
+
+        self.write_queue.put(None)
+        self.writer_thread.join()
+        self.writer_thread = None
+        self.write_queue = None
+        return self.written_count
+
+    def _writer_loop(self, writer: DuckDBWriter) -> None:
+        """Write queued batches until a None sentinel is received"""
+        try:
+            while True:
+                batch = self.write_queue.get()
+                if batch is None:
+                    break
+                self.written_count += self._write_batch(writer, batch)
+        finally:
+            writer.close()
+
     def download_fundamentals_batch(
         self, start_date: str, end_date: str
     ) -> None:
@@ -300,36 +482,21 @@ class MootdxDownloader:
                     logger.warning(f"No fundamentals for {year}Q{quarter}")
                     continue
 
-                # Write per-stock fundamentals
+                # Convert all codes at once and write the quarter in one upsert
                 success_count = 0
                 if "code" in fund_df.columns:
+                    write_df = fund_df.assign(
+                        symbol=convert_to_ptrade_codes(fund_df["code"], "qstock")
+                    ).drop(columns=["code"])
+
                     self.writer.begin()
                     try:
-                        for code, group in fund_df.groupby("code"):
-                            try:
-                                # Convert code to PTrade format
-                                from simtradedata.utils.code_utils import (
-                                    convert_to_ptrade_code,
-                                )
-                                ptrade_code = convert_to_ptrade_code(
-                                    str(code), "qstock"
-                                )
-
-                                write_df = group.drop(columns=["code"])
-                                if "end_date" in write_df.columns:
-                                    write_df = write_df.sort_values("end_date")
-                                    write_df = write_df.set_index("end_date")
-
-                                self.writer.write_fundamentals(ptrade_code, write_df)
-                                success_count += 1
-                            except Exception as e:
-                                logger.warning(
-                                    f"Failed to write fundamentals for {code}: {e}"
-                                )
+                        self.writer.write_fundamentals_frame(write_df)
                         self.writer.commit()
                     except Exception:
                         self.writer.rollback()
                         raise
+                    success_count = write_df["symbol"].nunique()
 
                 self.writer.mark_fundamental_quarter_completed(
                     year, quarter, success_count
@@ -391,34 +558,30 @@ def download_all_data(
                 print("Error: No stocks found")
                 return
 
-            # Download in batches
-            batches = [
-                stock_pool[i : i + BATCH_SIZE]
-                for i in range(0, len(stock_pool), BATCH_SIZE)
-            ]
+            # One grouped scan instead of a MAX(date) query per stock
+            downloader.load_max_dates()
 
-            print(f"\nProcessing {len(stock_pool)} stocks in {len(batches)} batches...")
-            print(f"Batch size: {BATCH_SIZE}")
+            print(f"\nProcessing {len(stock_pool)} stocks...")
+            print(f"Batch size: {BATCH_SIZE}, max in flight: {MAX_IN_FLIGHT}")
             print("=" * 60)
 
-            total_success = 0
-
-            with tqdm(
-                total=len(stock_pool),
-                desc="Downloading stocks",
-                unit="stock",
-                ncols=100,
-                bar_format="{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}, {rate_fmt}]",
-            ) as pbar:
-                for batch in batches:
+            # Defer checkpoints until all batches are written
+            with downloader.writer.bulk_load():
+                with tqdm(
+                    total=len(stock_pool),
+                    desc="Downloading stocks",
+                    unit="stock",
+                    ncols=100,
+                    bar_format="{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}, {rate_fmt}]",
+                ) as pbar:
+                    total_success = 0
+                    downloader.start_writer()
                     try:
-                        success = downloader.download_batch(
-                            batch, start_date_str, end_date_str, pbar
+                        total_success = downloader.download_stocks(
+                            stock_pool, start_date_str, end_date_str, pbar
                         )
-                        total_success += success
-                    except Exception as e:
-                        logger.error(f"Batch failed: {e}")
-                        pbar.update(len(batch))
+                    finally:
+                        total_success += downloader.stop_writer()
 
             print("=" * 60)
             print(
@@ -469,6 +632,7 @@ def download_all_data(
                 logger.error(f"Failed to download benchmark: {e}")
 
         finally:
+            downloader.shutdown()
             downloader.writer.close()
             downloader.unified_fetcher.logout()
 
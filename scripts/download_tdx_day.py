@@ -25,9 +25,15 @@ Usage:
 """
 
 import argparse
+import json
 import logging
+import shutil
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPConnection, HTTPException, HTTPSConnection
 from pathlib import Path
-from urllib.request import Request, urlopen
+from urllib.parse import urljoin, urlsplit
 
 from tqdm import tqdm
 
@@ -38,6 +44,18 @@ from simtradedata.writers.duckdb_writer import DEFAULT_DB_PATH
 DOWNLOAD_URL = "https://data.tdx.com.cn/vipdoc/hsjday.zip"
 DOWNLOAD_DIR = Path("data/downloads")
 LOG_FILE = "data/download_tdx_day.log"
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
+CHUNK_SIZE = 1 << 20  # 1 MiB read size for streaming downloads
+MAX_REDIRECTS = 5
+RANGE_WORKERS = 8  # Parallel byte-range connections for large downloads
+MIN_RANGE_SIZE = 16 << 20  # Below this size a single stream is used
+RANGE_RETRIES = 3  # Resumes of a byte range after a failed or cut-off read
+
+# TCP keep-alive probing (seconds), so a stalled connection is detected and
+# retried instead of hanging until the read timeout
+KEEPALIVE_IDLE = 30
+KEEPALIVE_INTERVAL = 10
+KEEPALIVE_COUNT = 3
 
 # Ensure directories exist
 DOWNLOAD_DIR.mkdir(parents=True, exist_ok=True)
@@ -51,6 +69,129 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Kept-alive connections per thread, keyed by (scheme, host)
+_local = threading.local()
+
+
+class RangeNotSupported(Exception):
+    """Server answered a Range request with the full body"""
+
+
+class _ProgressReader:
+    """Readable wrapper counting bytes into a progress bar
+
+    Lets shutil.copyfileobj drive the copy loop while still updating
+    tqdm; returns EOF early once the optional stop event is set.
+    """
+
+    def __init__(self, raw, pbar=None, stop: threading.Event = None):
+        self.raw = raw
+        self.pbar = pbar
+        self.stop = stop
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        if self.stop is not None and self.stop.is_set():
+            return b""
+        chunk = self.raw.read(size)
+        self.bytes_read += len(chunk)
+        if self.pbar is not None:
+            self.pbar.update(len(chunk))
+        return chunk
+
+
+def _enable_keepalive(sock: socket.socket) -> None:
+    """Turn on TCP keep-alive probes, with tuned timings where supported"""
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    for name, value in (
+        ("TCP_KEEPIDLE", KEEPALIVE_IDLE),
+        ("TCP_KEEPINTVL", KEEPALIVE_INTERVAL),
+        ("TCP_KEEPCNT", KEEPALIVE_COUNT),
+    ):
+        option = getattr(socket, name, None)
+        if option is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, option, value)
+
+
+class _KeepAliveHTTPConnection(HTTPConnection):
+    def connect(self):
+        super().connect()
+        _enable_keepalive(self.sock)
+
+
+class _KeepAliveHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        super().connect()
+        _enable_keepalive(self.sock)
+
+
+def _get_connection(scheme: str, netloc: str, timeout: float):
+    """Return this thread's kept-alive connection for a host"""
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+
+    conn = connections.get((scheme, netloc))
+    if conn is None:
+        conn_cls = (
+            _KeepAliveHTTPSConnection if scheme == "https" else _KeepAliveHTTPConnection
+        )
+        conn = conn_cls(netloc, timeout=timeout)
+        connections[(scheme, netloc)] = conn
+
+    conn.timeout = timeout
+    if conn.sock is not None:
+        conn.sock.settimeout(timeout)
+    return conn
+
+
+def _request(method: str, url: str, headers: dict = None, timeout: float = 60):
+    """
+    Send a request over a reused connection, following redirects.
+
+    The caller must read the returned response to the end before the
+    next request so the connection can be reused.
+
+    Args:
+        method: HTTP method
+        url: Request URL
+        headers: Extra request headers
+        timeout: Socket timeout in seconds
+
+    Returns:
+        http.client.HTTPResponse with a 2xx status
+    """
+    request_headers = {"User-Agent": USER_AGENT, **(headers or {})}
+
+    for _ in range(MAX_REDIRECTS + 1):
+        parts = urlsplit(url)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+
+        conn = _get_connection(parts.scheme, parts.netloc, timeout)
+        try:
+            conn.request(method, path, headers=request_headers)
+            response = conn.getresponse()
+        except (HTTPException, OSError):
+            # Server dropped the idle connection, reconnect once
+            conn.close()
+            conn.request(method, path, headers=request_headers)
+            response = conn.getresponse()
+
+        if response.status in (301, 302, 303, 307, 308):
+            response.read()
+            url = urljoin(url, response.getheader("Location"))
+            continue
+
+        if response.status >= 400:
+            response.read()
+            raise OSError(f"HTTP {response.status} {response.reason} for {url}")
+
+        return response
+
+    raise OSError(f"Too many redirects for {url}")
+
 
 def get_remote_file_info(url: str) -> dict:
     """
@@ -60,73 +201,232 @@ def get_remote_file_info(url: str) -> dict:
         url: Download URL
 
     Returns:
-        Dict with 'size' and 'last_modified' keys
+        Dict with 'size', 'last_modified', 'etag' and 'accept_ranges' keys
     """
     try:
-        req = Request(url, method="HEAD")
-        req.add_header("User-Agent", "Mozilla/5.0 (Windows NT 10.0; Win64; x64)")
-
-        with urlopen(req, timeout=30) as response:
-            size = response.headers.get("Content-Length")
-            last_modified = response.headers.get("Last-Modified")
-
-            return {
-                "size": int(size) if size else None,
-                "last_modified": last_modified,
-            }
+        response = _request("HEAD", url, timeout=30)
+        response.read()
+        size = response.getheader("Content-Length")
+        last_modified = response.getheader("Last-Modified")
+
+        return {
+            "size": int(size) if size else None,
+            "last_modified": last_modified,
+            "etag": response.getheader("ETag"),
+            "accept_ranges": response.getheader("Accept-Ranges") == "bytes",
+        }
     except Exception as e:
         logger.warning(f"Failed to get remote file info: {e}")
-        return {"size": None, "last_modified": None}
+        return {
+            "size": None,
+            "last_modified": None,
+            "etag": None,
+            "accept_ranges": False,
+        }
+
+
+def _meta_path(local_path: Path) -> Path:
+    """Sidecar file recording the remote validators of a downloaded file"""
+    return local_path.with_name(local_path.name + ".meta.json")
 
 
-def download_file(url: str, dest_path: Path, show_progress: bool = True) -> bool:
+def save_file_meta(local_path: Path, remote_info: dict) -> None:
+    """Record size, Last-Modified and ETag of a completed download"""
+    meta = {key: remote_info.get(key) for key in ("size", "last_modified", "etag")}
+    _meta_path(local_path).write_text(json.dumps(meta), encoding="utf-8")
+
+
+def load_file_meta(local_path: Path) -> dict:
+    """Read the sidecar written by save_file_meta, empty if missing"""
+    try:
+        return json.loads(_meta_path(local_path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _reset_connections() -> None:
+    """Close this thread's kept-alive connections after a failed transfer"""
+    for conn in getattr(_local, "connections", {}).values():
+        conn.close()
+
+
+def _download_range(
+    url: str, temp_path: Path, start: int, end: int, pbar, stop: threading.Event
+) -> None:
+    """
+    Download bytes start..end (inclusive) into the same offset of temp_path.
+
+    A read that times out or ends early is resumed on a new connection
+    from the first missing byte, up to RANGE_RETRIES times.
+    """
+    offset = start
+    for attempt in range(RANGE_RETRIES + 1):
+        reader = None
+        try:
+            headers = {"Range": f"bytes={offset}-{end}"}
+            with _request("GET", url, headers=headers, timeout=60) as response:
+                if response.status != 206:
+                    raise RangeNotSupported(f"HTTP {response.status} for range request")
+
+                reader = _ProgressReader(response, pbar, stop)
+                with open(temp_path, "r+b") as f:
+                    f.seek(offset)
+                    shutil.copyfileobj(reader, f, CHUNK_SIZE)
+        except (HTTPException, OSError) as e:
+            error = e
+        else:
+            if stop.is_set() or offset + reader.bytes_read == end + 1:
+                return
+            error = OSError(f"connection closed at byte {offset + reader.bytes_read}")
+
+        if reader is not None:
+            offset += reader.bytes_read
+        _reset_connections()
+        if stop.is_set():
+            return
+        if attempt < RANGE_RETRIES:
+            logger.warning(
+                f"Range {start}-{end} interrupted, resuming at {offset}: {error}"
+            )
+
+    raise OSError(
+        f"Incomplete range {start}-{end} after {RANGE_RETRIES} retries: {error}"
+    )
+
+
+def _download_ranges(
+    url: str, temp_path: Path, total_size: int, show_progress: bool
+) -> None:
+    """
+    Download a file as RANGE_WORKERS concurrent byte ranges.
+
+    Raises:
+        RangeNotSupported: If the server ignores Range requests
+    """
+    # Pre-size the file so every range writes at its own offset
+    with open(temp_path, "wb") as f:
+        f.truncate(total_size)
+
+    part_size = -(-total_size // RANGE_WORKERS)
+    ranges = [
+        (start, min(start + part_size, total_size) - 1)
+        for start in range(0, total_size, part_size)
+    ]
+
+    stop = threading.Event()
+    pbar = (
+        tqdm(total=total_size, unit="B", unit_scale=True, desc="Downloading", ncols=100)
+        if show_progress
+        else None
+    )
+    try:
+        with ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+            futures = [
+                executor.submit(_download_range, url, temp_path, start, end, pbar, stop)
+                for start, end in ranges
+            ]
+            try:
+                for future in futures:
+                    future.result()
+            except BaseException:
+                stop.set()
+                raise
+    finally:
+        if pbar is not None:
+            pbar.close()
+
+
+def download_file(
+    url: str, dest_path: Path, show_progress: bool = True, remote_info: dict = None
+) -> bool:
     """
     Download file with progress bar.
 
+    Large files on servers accepting byte ranges are fetched over
+    RANGE_WORKERS parallel connections, otherwise in a single stream.
+    An interrupted single-stream download is resumed from its temp file
+    when the server still reports the ETag/Last-Modified recorded next
+    to it when that download started.
+
     Args:
         url: Download URL
         dest_path: Destination path
         show_progress: Show progress bar
+        remote_info: Result of get_remote_file_info, enables range download
 
     Returns:
         True if download succeeded
     """
     try:
-        req = Request(url)
-        req.add_header("User-Agent", "Mozilla/5.0 (Windows NT 10.0; Win64; x64)")
-
-        with urlopen(req, timeout=60) as response:
-            total_size = response.headers.get("Content-Length")
-            total_size = int(total_size) if total_size else None
-
-            # Create temp file first, then move
-            temp_path = dest_path.with_suffix(".tmp")
-
-            with open(temp_path, "wb") as f:
+        remote_info = remote_info or {}
+        total_size = remote_info.get("size")
+        if (
+            total_size
+            and total_size >= MIN_RANGE_SIZE
+            and remote_info.get("accept_ranges")
+        ):
+            ranges_path = dest_path.with_suffix(".ranges.tmp")
+            try:
+                _download_ranges(url, ranges_path, total_size, show_progress)
+                ranges_path.replace(dest_path)
+                return True
+            except RangeNotSupported:
+                logger.info("Server ignored Range requests, using single stream")
+
+        # Temp file holds a prefix of the file if a previous run was interrupted,
+        # its sidecar the validator that prefix was downloaded under
+        temp_path = dest_path.with_suffix(".tmp")
+        offset = temp_path.stat().st_size if temp_path.exists() else 0
+        validator = remote_info.get("etag") or remote_info.get("last_modified")
+        temp_meta = load_file_meta(temp_path)
+        if validator != (temp_meta.get("etag") or temp_meta.get("last_modified")):
+            offset = 0
+        if total_size and offset >= total_size:
+            offset = 0
+
+        headers = {}
+        if offset and validator:
+            # If-Range: server sends the full file instead if it changed
+            headers = {"Range": f"bytes={offset}-", "If-Range": validator}
+
+        with _request("GET", url, headers=headers, timeout=60) as response:
+            if response.status == 206:
+                logger.info(f"Resuming download at byte {offset}")
+                mode = "ab"
+            else:
+                offset = 0
+                mode = "wb"
+                save_file_meta(
+                    temp_path,
+                    {
+                        "last_modified": response.getheader("Last-Modified"),
+                        "etag": response.getheader("ETag"),
+                    },
+                )
+
+            length = response.getheader("Content-Length")
+            total_size = offset + int(length) if length else None
+
+            with open(temp_path, mode) as f:
                 if show_progress and total_size:
                     with tqdm(
                         total=total_size,
+                        initial=offset,
                         unit="B",
                         unit_scale=True,
                         desc="Downloading",
                         ncols=100,
                     ) as pbar:
-                        while True:
-                            chunk = response.read(8192)
-                            if not chunk:
-                                break
-                            f.write(chunk)
-                            pbar.update(len(chunk))
+                        shutil.copyfileobj(
+                            _ProgressReader(response, pbar), f, CHUNK_SIZE
+                        )
                 else:
-                    while True:
-                        chunk = response.read(8192)
-                        if not chunk:
-                            break
-                        f.write(chunk)
-
-            # Move temp file to final destination
-            temp_path.rename(dest_path)
-            return True
+                    shutil.copyfileobj(response, f, CHUNK_SIZE)
+
+        # Move temp file to final destination
+        temp_path.replace(dest_path)
+        _meta_path(temp_path).unlink(missing_ok=True)
+        return True
 
     except Exception as e:
         logger.error(f"Download failed: {e}")
@@ -148,6 +448,13 @@ def needs_update(local_path: Path, remote_info: dict) -> bool:
     if not local_path.exists():
         return True
 
+    # Check validators recorded at download time, catches same-size changes
+    local_meta = load_file_meta(local_path)
+    for key in ("etag", "last_modified"):
+        if remote_info.get(key) and local_meta.get(key):
+            if remote_info[key] != local_meta[key]:
+                return True
+
     # Check size
     if remote_info.get("size"):
         local_size = local_path.stat().st_size
@@ -235,8 +542,9 @@ Examples:
         if args.force_download or needs_update(zip_path, remote_info):
             print()
             print("Downloading hsjday.zip...")
-            if not download_file(DOWNLOAD_URL, zip_path):
+            if not download_file(DOWNLOAD_URL, zip_path, remote_info=remote_info):
                 return 1
+            save_file_meta(zip_path, remote_info)
             print(f"Downloaded to: {zip_path}")
         else:
             print()
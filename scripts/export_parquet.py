@@ -10,6 +10,7 @@ Usage:
 
 import argparse
 import logging
+import os
 from pathlib import Path
 
 from simtradedata.writers.duckdb_writer import DEFAULT_DB_PATH, DuckDBWriter
@@ -49,35 +50,32 @@ def export_to_parquet(db_path: str, output_dir: str) -> None:
 
         output_path = Path(output_dir)
 
-        def count_files(subdir: str) -> int:
-            path = output_path / subdir
-            return len(list(path.glob("*.parquet"))) if path.exists() else 0
-
-        def get_dir_size(subdir: str) -> float:
+        def dir_stats(subdir: str) -> tuple:
+            """(file count, size in MB) of a subdir's Parquet files, one scan"""
             path = output_path / subdir
             if not path.exists():
-                return 0
-            return sum(f.stat().st_size for f in path.glob("*.parquet")) / (1024 * 1024)
+                return 0, 0.0
+            count = 0
+            size = 0
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".parquet") and entry.is_file():
+                        count += 1
+                        size += entry.stat(follow_symlinks=False).st_size
+            return count, size / (1024 * 1024)
 
         print("\nExport Statistics:")
-        print(f"  stocks/: {count_files('stocks')} files, {get_dir_size('stocks'):.1f} MB")
-        print(f"  exrights/: {count_files('exrights')} files, {get_dir_size('exrights'):.1f} MB")
-        print(
-            f"  fundamentals/: {count_files('fundamentals')} files, "
-            f"{get_dir_size('fundamentals'):.1f} MB"
-        )
-        print(
-            f"  valuation/: {count_files('valuation')} files, "
-            f"{get_dir_size('valuation'):.1f} MB"
-        )
-        print(f"  metadata/: {count_files('metadata')} files, {get_dir_size('metadata'):.1f} MB")
-
-        adj_pre = output_path / "ptrade_adj_pre.parquet"
-        adj_post = output_path / "ptrade_adj_post.parquet"
-        if adj_pre.exists():
-            print(f"  ptrade_adj_pre.parquet: {adj_pre.stat().st_size / (1024*1024):.1f} MB")
-        if adj_post.exists():
-            print(f"  ptrade_adj_post.parquet: {adj_post.stat().st_size / (1024*1024):.1f} MB")
+        for subdir in ["stocks", "exrights", "fundamentals", "valuation", "metadata"]:
+            count, size_mb = dir_stats(subdir)
+            print(f"  {subdir}/: {count} files, {size_mb:.1f} MB")
+
+        # One stat call per file, a missing file is simply not listed
+        for name in ["ptrade_adj_pre.parquet", "ptrade_adj_post.parquet"]:
+            try:
+                size = (output_path / name).stat().st_size
+            except FileNotFoundError:
+                continue
+            print(f"  {name}: {size / (1024*1024):.1f} MB")
 
         print("\nExport complete!")
 
@@ -27,13 +27,18 @@ Usage:
 
 import argparse
 import logging
-import struct
+import os
+import queue
 import tempfile
+import threading
 import zipfile
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Iterator, Tuple
+from typing import Iterator, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 from tqdm import tqdm
 
@@ -42,30 +47,64 @@ from simtradedata.writers.duckdb_writer import DEFAULT_DB_PATH, DuckDBWriter
 
 # Configuration
 LOG_FILE = "data/import_tdx_day.log"
-BATCH_SIZE = 50  # Number of stocks per transaction
+# A transaction is written once its rows to import reach BATCH_ROWS, or
+# once it holds BATCH_MAX_STOCKS stocks
+BATCH_ROWS = 100_000
+BATCH_MAX_STOCKS = 500
 
-# TDX binary format constants
-RECORD_SIZE = 32  # bytes per record
-RECORD_FORMAT = "<IIIIIfII"  # date, open, high, low, close, amount, volume, reserved
+# Threads decompressing ZIP members concurrently (zlib releases the GIL)
+EXTRACT_WORKERS = min(4, os.cpu_count() or 1)
+EXTRACT_AHEAD_PER_WORKER = 4  # Members decompressed ahead of the consumer
+
+# Processes parsing .day files (1 parses in the importing process)
+PARSE_WORKERS = 1
+PARSE_AHEAD_PER_WORKER = 8  # Files submitted ahead of the consumer
 
-# Ensure log directory exists
-Path(LOG_FILE).parent.mkdir(parents=True, exist_ok=True)
+# Batches waiting for the writer thread before the import loop blocks
+WRITE_QUEUE_SIZE = 2
 
-logging.basicConfig(
-    filename=LOG_FILE,
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    filemode="w",
+# Files counted locally before each progress bar update, and minimum
+# seconds between progress bar refreshes
+PROGRESS_UPDATE_EVERY = 32
+PROGRESS_MININTERVAL = 1.0
+
+# TDX binary format constants
+RECORD_SIZE = 32  # bytes per record
+DAY_DTYPE = np.dtype(
+    [
+        ("date", "<u4"),  # YYYYMMDD
+        ("open", "<u4"),  # prices in fen
+        ("high", "<u4"),
+        ("low", "<u4"),
+        ("close", "<u4"),
+        ("amount", "<f4"),  # turnover in yuan
+        ("volume", "<u4"),  # shares
+        ("reserved", "<u4"),
+    ]
 )
+
 logger = logging.getLogger(__name__)
 
-# Also log to console
-console = logging.StreamHandler()
-console.setLevel(logging.WARNING)
-logger.addHandler(console)
 
+def setup_logging() -> None:
+    """Log to LOG_FILE, and warnings also to the console."""
+    # Ensure log directory exists
+    Path(LOG_FILE).parent.mkdir(parents=True, exist_ok=True)
+
+    logging.basicConfig(
+        filename=LOG_FILE,
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+        filemode="w",
+    )
+
+    # Also log to console
+    console = logging.StreamHandler()
+    console.setLevel(logging.WARNING)
+    logger.addHandler(console)
 
-def parse_tdx_day_file(data: bytes) -> pd.DataFrame:
+
+def parse_tdx_day_file(data: bytes, skip_range: Tuple[int, int] = None) -> pd.DataFrame:
     """
     Parse TDX binary .day file content.
 
@@ -81,6 +120,8 @@ def parse_tdx_day_file(data: bytes) -> pd.DataFrame:
 
     Args:
         data: Raw binary content of .day file
+        skip_range: Optional (first, last) YYYYMMDD range already stored;
+            records inside it are not decoded
 
     Returns:
         DataFrame with columns: date, open, high, low, close, volume, money
@@ -88,51 +129,108 @@ def parse_tdx_day_file(data: bytes) -> pd.DataFrame:
     if len(data) < RECORD_SIZE:
         return pd.DataFrame()
 
+    # Decode all records at once; a trailing partial record is ignored
     num_records = len(data) // RECORD_SIZE
-    records = []
+    arr = np.frombuffer(data, dtype=DAY_DTYPE, count=num_records)
+
+    if skip_range is not None:
+        # Locate the covered records on a strided view of the date field
+        # alone; only the records before and after them are decoded
+        date_int = arr["date"]
+        if (date_int[1:] >= date_int[:-1]).all():
+            lo = date_int.searchsorted(skip_range[0], side="left")
+            hi = date_int.searchsorted(skip_range[1], side="right")
+            if lo == 0:
+                arr = arr[hi:]
+            elif hi == num_records:
+                arr = arr[:lo]
+            else:
+                arr = np.concatenate([arr[:lo], arr[hi:]])
+
+            if len(arr) == 0:
+                return pd.DataFrame()
+
+    # Split YYYYMMDD into int64 components
+    date_int = arr["date"].astype(np.int64)
+    year = date_int // 10000
+    month = (date_int // 100) % 100
+    day = date_int % 100
+
+    # Build the date column as one datetime64 array: month number since
+    # 1970, then the day offset within it. A day past the month's end
+    # (e.g. Feb 30) rolls into the next month and is caught below.
+    months = ((year - 1970) * 12 + (month - 1)).astype("datetime64[M]")
+    dates = months.astype("datetime64[D]") + (day - 1)
+
+    # Skip invalid dates
+    valid = (
+        (year >= 1990)
+        & (year <= 2100)
+        & (month >= 1)
+        & (month <= 12)
+        & (day >= 1)
+        & (day <= 31)
+        & (dates.astype("datetime64[M]") == months)
+    )
 
-    for i in range(num_records):
-        offset = i * RECORD_SIZE
-        record = data[offset : offset + RECORD_SIZE]
+    if not valid.any():
+        return pd.DataFrame()
 
-        try:
-            date_int, open_p, high, low, close, amount, volume, _ = struct.unpack(
-                RECORD_FORMAT, record
-            )
+    # Convert prices from fen to yuan
+    return pd.DataFrame(
+        {
+            "date": dates[valid].astype("datetime64[ns]"),
+            "open": arr["open"][valid] / 100.0,
+            "high": arr["high"][valid] / 100.0,
+            "low": arr["low"][valid] / 100.0,
+            "close": arr["close"][valid] / 100.0,
+            "volume": arr["volume"][valid].astype(np.int64),
+            "money": arr["amount"][valid].astype(np.float64),
+        }
+    )
 
-            # Parse date
-            year = date_int // 10000
-            month = (date_int % 10000) // 100
-            day = date_int % 100
-
-            # Skip invalid dates
-            if year < 1990 or year > 2100 or month < 1 or month > 12 or day < 1 or day > 31:
-                continue
-
-            # Convert prices from fen to yuan
-            records.append(
-                {
-                    "date": f"{year:04d}-{month:02d}-{day:02d}",
-                    "open": open_p / 100.0,
-                    "high": high / 100.0,
-                    "low": low / 100.0,
-                    "close": close / 100.0,
-                    "volume": volume,
-                    "money": amount,
-                }
-            )
-        except struct.error:
-            continue
 
-    if not records:
-        return pd.DataFrame()
+def _ordered_map(executor: Executor, func, items, max_ahead: int) -> Iterator:
+    """
+    Like executor.map, but with at most max_ahead calls submitted ahead.
+
+    executor.map submits every item up front, so the whole input (and
+    every result) would be held in memory at once.
+
+    Yields:
+        func(item) for each item, in input order
+    """
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(func, item))
+        if len(pending) >= max_ahead:
+            yield pending.popleft().result()
+
+    while pending:
+        yield pending.popleft().result()
+
+
+def _day_members(zf: zipfile.ZipFile) -> list:
+    """ZipInfo of .day members in lday directories (backslash paths allowed)"""
+    members = []
+    for info in zf.infolist():
+        # Normalize path separators
+        normalized = info.filename.replace("\\", "/")
+
+        # Only process .day files in lday directories
+        if normalized.endswith(".day") and "/lday/" in normalized:
+            members.append(info)
+    return members
 
-    df = pd.DataFrame(records)
-    df["date"] = pd.to_datetime(df["date"])
-    return df
 
+def _member_filename(name: str) -> str:
+    """Extract filename (e.g., sh600000.day) from a member name"""
+    return name.replace("\\", "/").split("/")[-1]
 
-def iter_day_files_from_zip(zip_path: Path) -> Iterator[Tuple[str, bytes]]:
+
+def iter_day_files_from_zip(
+    zip_path: Path, workers: int = 1
+) -> Iterator[Tuple[str, bytes]]:
     """
     Iterate over .day files in a ZIP archive.
 
@@ -140,28 +238,94 @@ def iter_day_files_from_zip(zip_path: Path) -> Iterator[Tuple[str, bytes]]:
 
     Args:
         zip_path: Path to ZIP file
+        workers: Number of decompression threads, see _iter_zip_members
 
     Yields:
-        Tuples of (filename, file_content)
+        Tuples of (filename, file_content) in archive order
     """
     with zipfile.ZipFile(zip_path, "r") as zf:
-        for name in zf.namelist():
-            # Normalize path separators
-            normalized = name.replace("\\", "/")
+        yield from _iter_zip_members(zf, _day_members(zf), workers)
+
 
-            # Only process .day files in lday directories
-            if not normalized.endswith(".day"):
-                continue
-            if "/lday/" not in normalized:
-                continue
+def _iter_zip_members(
+    zf: zipfile.ZipFile, members: list, workers: int = 1
+) -> Iterator[Tuple[str, bytes]]:
+    """
+    Read the given members of an open ZIP archive.
 
-            # Extract filename (e.g., sh600000.day)
-            filename = normalized.split("/")[-1]
+    Members are passed as ZipInfo from an earlier scan of zf, so the
+    central directory is parsed once. With workers > 1, members are
+    decompressed by a thread pool, each thread reading through its own
+    ZipFile handle; at most workers * EXTRACT_AHEAD_PER_WORKER members
+    are held in memory ahead of the consumer.
+
+    Args:
+        zf: Open ZIP archive
+        members: ZipInfo of the members to read
+        workers: Number of decompression threads
 
-            yield filename, zf.read(name)
+    Yields:
+        Tuples of (filename, file_content) in member order
+    """
+    if workers <= 1:
+        for info in members:
+            with zf.open(info) as f:
+                yield _member_filename(info.filename), f.read()
+        return
+
+    local = threading.local()
+    handles = []
+    handles_lock = threading.Lock()
+
+    def read_member(info: zipfile.ZipInfo) -> bytes:
+        handle = getattr(local, "zf", None)
+        if handle is None:
+            handle = local.zf = zipfile.ZipFile(zf.filename, "r")
+            with handles_lock:
+                handles.append(handle)
+        with handle.open(info) as f:
+            return f.read()
+
+    max_ahead = workers * EXTRACT_AHEAD_PER_WORKER
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            contents = _ordered_map(executor, read_member, members, max_ahead)
+            for info, content in zip(members, contents):
+                yield _member_filename(info.filename), content
+    finally:
+        for handle in handles:
+            handle.close()
 
 
-def iter_day_files_from_dir(dir_path: Path) -> Iterator[Tuple[str, bytes]]:
+def _day_file_entries(dir_path: Path) -> list:
+    """
+    DirEntry of .day files under dir_path/{sh,sz,bj}/lday, one scandir pass.
+
+    Args:
+        dir_path: Path to root directory
+
+    Returns:
+        List of os.DirEntry
+    """
+    entries = []
+    for market in ["sh", "sz", "bj"]:
+        lday_dir = dir_path / market / "lday"
+        if not lday_dir.is_dir():
+            continue
+
+        with os.scandir(lday_dir) as it:
+            entries.extend(entry for entry in it if entry.name.endswith(".day"))
+    return entries
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def iter_day_files_from_dir(
+    dir_path: Path, entries: list = None, workers: int = 1
+) -> Iterator[Tuple[str, bytes]]:
     """
     Iterate over .day files in a directory structure.
 
@@ -170,19 +334,36 @@ def iter_day_files_from_dir(dir_path: Path) -> Iterator[Tuple[str, bytes]]:
     - dir_path/sz/lday/*.day
     - dir_path/bj/lday/*.day
 
+    With workers > 1, files are read ahead by a thread pool (bounded like
+    _iter_zip_members), so a slow disk or network share is read while the
+    consumer parses earlier files.
+
     Args:
         dir_path: Path to root directory
+        entries: DirEntry list from an earlier _day_file_entries scan
+        workers: Number of reader threads
 
     Yields:
-        Tuples of (filename, file_content)
+        Tuples of (filename, file_content) in entry order
     """
-    for market in ["sh", "sz", "bj"]:
-        lday_dir = dir_path / market / "lday"
-        if not lday_dir.exists():
-            continue
+    if entries is None:
+        entries = _day_file_entries(dir_path)
 
-        for day_file in lday_dir.glob("*.day"):
-            yield day_file.name, day_file.read_bytes()
+    if workers <= 1:
+        for entry in entries:
+            yield entry.name, _read_file(entry.path)
+        return
+
+    paths = [entry.path for entry in entries]
+    max_ahead = workers * EXTRACT_AHEAD_PER_WORKER
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        contents = _ordered_map(executor, _read_file, paths, max_ahead)
+        for entry, content in zip(entries, contents):
+            yield entry.name, content
+
+
+# PTrade code suffix per TDX market prefix
+PTRADE_SUFFIXES = {"sh": ".SS", "sz": ".SZ", "bj": ".BJ"}
 
 
 def filename_to_ptrade_code(filename: str) -> str:
@@ -196,20 +377,26 @@ def filename_to_ptrade_code(filename: str) -> str:
         PTrade code, e.g., '600000.SS', '000001.SZ', '430017.BJ'
     """
     # Remove .day extension
-    base = filename.replace(".day", "")
+    base = filename.removesuffix(".day")
 
-    # Extract market and code
-    market = base[:2]  # sh, sz, bj
-    code = base[2:]  # 600000, 000001, etc.
+    # Market (sh, sz, bj) selects the suffix, the rest is the code
+    suffix = PTRADE_SUFFIXES.get(base[:2])
+    if suffix is None:
+        return None
 
-    # Map to PTrade suffix
-    suffix_map = {"sh": "SS", "sz": "SZ", "bj": "BJ"}
-    suffix = suffix_map.get(market, "")
+    return base[2:] + suffix
 
-    if not suffix:
-        return None
 
-    return f"{code}.{suffix}"
+# Code prefixes of stocks per market (anything else is an index/fund/bond)
+# Shanghai stocks: 600xxx, 601xxx, 603xxx, 605xxx (main), 688xxx, 689xxx (STAR)
+# Shenzhen stocks: 000xxx, 001xxx, 002xxx, 003xxx (main), 300xxx, 301xxx (ChiNext)
+# Beijing stocks: 43xxxx, 83xxxx, 87xxxx, 92xxxx (mostly)
+# Indices: usually start with 000xxx (SH) or 399xxx (SZ)
+STOCK_CODE_PREFIXES = {
+    "sh": ("6",),
+    "sz": ("00", "30"),
+    "bj": ("43", "83", "87", "92"),
+}
 
 
 def is_stock_code(filename: str) -> bool:
@@ -222,50 +409,104 @@ def is_stock_code(filename: str) -> bool:
     Returns:
         True if it's a stock code
     """
-    base = filename.replace(".day", "")
-    market = base[:2]
+    base = filename.removesuffix(".day")
     code = base[2:]
 
     if len(code) != 6:
         return False
 
-    # Shanghai stocks: 600xxx, 601xxx, 603xxx, 605xxx (main), 688xxx, 689xxx (STAR)
-    # Shenzhen stocks: 000xxx, 001xxx, 002xxx, 003xxx (main), 300xxx, 301xxx (ChiNext)
-    # Beijing stocks: 43xxxx, 83xxxx, 87xxxx, 92xxxx (mostly)
-    # Indices: usually start with 000xxx (SH) or 399xxx (SZ)
+    return code.startswith(STOCK_CODE_PREFIXES.get(base[:2], ()))
+
+
+def classify_filename(filename: str) -> Optional[str]:
+    """
+    Map a .day filename to its PTrade code if it is a stock.
+
+    Combines is_stock_code and filename_to_ptrade_code in one pass over
+    the name.
+
+    Args:
+        filename: e.g., 'sh600000.day'
+
+    Returns:
+        PTrade code, e.g., '600000.SS', or None for non-stock files
+    """
+    base = filename.removesuffix(".day")
+    market = base[:2]
+    code = base[2:]
+
+    if len(code) != 6 or not code.startswith(STOCK_CODE_PREFIXES.get(market, ())):
+        return None
+
+    # Every market with stock prefixes has a suffix
+    return code + PTRADE_SUFFIXES[market]
+
+
+def parse_day_entry(entry: tuple) -> Tuple[Optional[str], Optional[pd.DataFrame]]:
+    """
+    Parse one classified .day file.
+
+    Module-level so it can run in a worker process.
 
-    if market == "sh":
-        # SH stocks start with 6
-        return code[0] == "6"
-    elif market == "sz":
-        # SZ stocks: 00xxxx (main board) or 30xxxx (ChiNext)
-        return code[:2] in ("00", "30")
-    elif market == "bj":
-        # BJ stocks
-        return code[:2] in ("43", "83", "87", "92")
+    Args:
+        entry: Tuple of (symbol, file_content, skip_range), symbol being
+            None for files that are not stocks; see parse_tdx_day_file
+            for skip_range
 
-    return False
+    Returns:
+        Tuple of (symbol, DataFrame); DataFrame is None for non-stocks
+    """
+    symbol, data, skip_range = entry
+    if not symbol:
+        return symbol, None
+
+    return symbol, parse_tdx_day_file(data, skip_range)
 
 
 class TdxDayImporter:
     """Import TDX daily data into DuckDB database."""
 
-    def __init__(self, db_path: str = DEFAULT_DB_PATH, full_import: bool = False):
+    def __init__(
+        self,
+        db_path: str = DEFAULT_DB_PATH,
+        full_import: bool = False,
+        extract_workers: int = EXTRACT_WORKERS,
+        batch_rows: int = BATCH_ROWS,
+        batch_max_stocks: int = BATCH_MAX_STOCKS,
+        parse_workers: int = PARSE_WORKERS,
+    ):
         """
         Initialize importer.
 
         Args:
             db_path: Path to DuckDB database
             full_import: If True, import all data regardless of existing records
+            extract_workers: Threads reading ZIP members/files, 1 for sequential
+            batch_rows: Target rows written per transaction
+            batch_max_stocks: Max stocks written per transaction
+            parse_workers: Processes parsing .day files, 1 parses in-process
         """
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         self.writer = DuckDBWriter(db_path=str(self.db_path))
         self.full_import = full_import
+        self.extract_workers = extract_workers
+        self.batch_rows = batch_rows
+        self.batch_max_stocks = batch_max_stocks
+        self.parse_workers = parse_workers
+
+        # {symbol: (min_date, max_date)} prefetched by import_from_source
+        self.date_ranges = None
+
+        # Background writer used by import_from_source
+        self.write_queue = None
+        self.writer_thread = None
+        self.write_error = None
 
         self.stats = {
             "files_processed": 0,
             "files_skipped": 0,
+            "files_failed": 0,
             "records_imported": 0,
             "records_skipped": 0,
             "records_backfilled": 0,
@@ -280,13 +521,15 @@ class TdxDayImporter:
         """
         if self.full_import:
             return None, None
+        if self.date_ranges is not None:
+            return self.date_ranges.get(symbol, (None, None))
         min_date = self.writer.get_min_date("stocks", symbol)
         max_date = self.writer.get_max_date("stocks", symbol)
         return min_date, max_date
 
-    def import_stock(self, symbol: str, df: pd.DataFrame) -> int:
+    def filter_new_rows(self, symbol: str, df: pd.DataFrame) -> pd.DataFrame:
         """
-        Import data for a single stock.
+        Keep the rows of a stock not yet in the database.
 
         Handles both:
         - New data (after existing MAX date)
@@ -297,39 +540,81 @@ class TdxDayImporter:
             df: DataFrame with OHLCV data
 
         Returns:
-            Number of records imported
+            DataFrame with the rows to import (may be empty)
         """
         if df.empty:
-            return 0
+            return df
 
         # Check existing data range for incremental import
         min_date, max_date = self.get_existing_date_range(symbol)
 
         if min_date and max_date:
-            min_dt = pd.to_datetime(min_date)
-            max_dt = pd.to_datetime(max_date)
+            # 'YYYY-MM-DD' strings convert directly, without the format
+            # inference pd.to_datetime runs for every call
+            min_dt = np.datetime64(min_date, "ns")
+            max_dt = np.datetime64(max_date, "ns")
 
             # Keep data outside existing range:
             # - Historical backfill: date < min_date
             # - New data: date > max_date
-            df_backfill = df[df["date"] < min_dt]
-            df_new = df[df["date"] > max_dt]
+            if df["date"].is_monotonic_increasing:
+                # .day records are in date order: two binary searches give
+                # the slice bounds without building boolean masks
+                dates = df["date"].to_numpy()
+                lo = dates.searchsorted(min_dt, side="left")
+                hi = dates.searchsorted(max_dt, side="right")
+                df_backfill = df.iloc[:lo]
+                df_new = df.iloc[hi:]
+            else:
+                df_backfill = df[df["date"] < min_dt]
+                df_new = df[df["date"] > max_dt]
 
             if df_backfill.empty and df_new.empty:
                 self.stats["records_skipped"] += 1
-                return 0
+                return df_new
 
             # Track backfilled records separately
             if not df_backfill.empty:
                 self.stats["records_backfilled"] += len(df_backfill)
 
-            # Combine backfill and new data
-            df = pd.concat([df_backfill, df_new], ignore_index=True)
+            # Combine backfill and new data (usually only one is present)
+            if df_backfill.empty:
+                df = df_new
+            elif df_new.empty:
+                df = df_backfill
+            else:
+                df = pd.concat([df_backfill, df_new], ignore_index=True)
+
+        return df
+
+    def get_covered_days(self, symbol: str) -> Optional[Tuple[int, int]]:
+        """
+        Existing date range of a symbol as YYYYMMDD integers.
+
+        Returns:
+            (min_day, max_day), or None if the symbol has no data yet
+        """
+        min_date, max_date = self.get_existing_date_range(symbol)
+        if not (min_date and max_date):
+            return None
+        return int(min_date.replace("-", "")), int(max_date.replace("-", ""))
 
-        # Set date as index for writer
-        df = df.set_index("date")
+    def import_stock(self, symbol: str, df: pd.DataFrame) -> int:
+        """
+        Import data for a single stock.
 
-        # Write to database
+        Args:
+            symbol: PTrade format code
+            df: DataFrame with OHLCV data
+
+        Returns:
+            Number of records imported
+        """
+        df = self.filter_new_rows(symbol, df)
+        if df.empty:
+            return 0
+
+        # Write to database (the writer reads dates from the 'date' column)
         self.writer.write_market_data(symbol, df)
         self.stats["records_imported"] += len(df)
 
@@ -347,87 +632,245 @@ class TdxDayImporter:
         """
         # Determine source type
         if source_path.is_file() and source_path.suffix.lower() == ".zip":
-            file_iter = iter_day_files_from_zip(source_path)
-            # Count total files
+            # Open once: the same member list gives the count and the reads
             with zipfile.ZipFile(source_path, "r") as zf:
-                total_files = sum(
-                    1
-                    for n in zf.namelist()
-                    if n.endswith(".day") and "lday" in n.replace("\\", "/")
-                )
+                members = _day_members(zf)
+                total_files = len(members)
+
+                # Index/fund/bond members and members without a single
+                # record are skipped before decompression
+                members = [
+                    info
+                    for info in members
+                    if info.file_size >= RECORD_SIZE
+                    and classify_filename(_member_filename(info.filename))
+                ]
+                self.stats["files_skipped"] += total_files - len(members)
+                file_iter = _iter_zip_members(zf, members, self.extract_workers)
+                return self._import_files(file_iter, total_files, len(members))
         elif source_path.is_dir():
-            # Count files first
-            total_files = sum(
-                1
-                for market in ["sh", "sz", "bj"]
-                for _ in (source_path / market / "lday").glob("*.day")
-                if (source_path / market / "lday").exists()
+            # One directory scan gives the count and the files to read
+            entries = _day_file_entries(source_path)
+            total_files = len(entries)
+
+            # Same pre-filter as for ZIP members, before opening files
+            entries = [
+                entry
+                for entry in entries
+                if classify_filename(entry.name) and entry.stat().st_size >= RECORD_SIZE
+            ]
+            self.stats["files_skipped"] += total_files - len(entries)
+            file_iter = iter_day_files_from_dir(
+                source_path, entries, self.extract_workers
             )
-            file_iter = iter_day_files_from_dir(source_path)
+            return self._import_files(file_iter, total_files, len(entries))
         else:
             raise ValueError(f"Invalid source: {source_path}")
 
+    def _import_files(
+        self, file_iter: Iterator, total_files: int, files_to_read: int
+    ) -> dict:
+        """
+        Parse, filter and write the .day files of a source.
+
+        Args:
+            file_iter: Iterator of (filename, file_content) to import
+            total_files: Number of .day files found in the source
+            files_to_read: Number of files file_iter yields
+
+        Returns:
+            Statistics dict
+        """
         print(f"Found {total_files} .day files")
         print(f"Mode: {'Full import' if self.full_import else 'Incremental'}")
         print("=" * 60)
 
-        # Process in batches
+        # Existing date ranges of all symbols in one grouped query, instead
+        # of a MIN and a MAX query per stock. Each symbol is imported once
+        # per run, so the ranges stay valid while batches are written.
+        if not self.full_import:
+            self.date_ranges = self.writer.get_date_ranges("stocks")
+
+        # Collect rows to import until a batch is large enough
         batch = []
-        batch_data = []
+        batch_rows = 0
 
-        with tqdm(total=total_files, desc="Importing", unit="file", ncols=100) as pbar:
+        def day_entries():
+            # Attach each stock's stored range, so the parser can leave
+            # already imported records undecoded
             for filename, data in file_iter:
-                pbar.update(1)
-
-                # Skip non-stock files
-                if not is_stock_code(filename):
-                    self.stats["files_skipped"] += 1
-                    continue
+                symbol = classify_filename(filename)
+                covered = self.get_covered_days(symbol) if symbol else None
+                yield symbol, data, covered
+
+        # Parse in worker processes while this process filters and writes
+        executor = None
+        if self.parse_workers > 1:
+            executor = ProcessPoolExecutor(max_workers=self.parse_workers)
+            parsed_iter = _ordered_map(
+                executor,
+                parse_day_entry,
+                day_entries(),
+                self.parse_workers * PARSE_AHEAD_PER_WORKER,
+            )
+        else:
+            parsed_iter = map(parse_day_entry, day_entries())
 
-                # Convert to PTrade code
-                symbol = filename_to_ptrade_code(filename)
-                if not symbol:
-                    self.stats["files_skipped"] += 1
-                    continue
+        # Batches are written on a background thread with its own cursor,
+        # while this thread keeps parsing and filtering the next files
+        self._start_writer()
+        try:
+            # Defer checkpoints until all batches are written
+            with (
+                self.writer.bulk_load(),
+                tqdm(
+                    total=files_to_read,
+                    desc="Importing",
+                    unit="file",
+                    ncols=100,
+                    mininterval=PROGRESS_MININTERVAL,
+                ) as pbar,
+            ):
+                unreported = 0
+                for symbol, df in parsed_iter:
+                    unreported += 1
+                    if unreported >= PROGRESS_UPDATE_EVERY:
+                        pbar.update(unreported)
+                        unreported = 0
+
+                    # Skip non-stock files
+                    if df is None:
+                        self.stats["files_skipped"] += 1
+                        continue
+
+                    if df.empty:
+                        if self.get_covered_days(symbol):
+                            # Every record is already stored
+                            self.stats["files_processed"] += 1
+                            self.stats["records_skipped"] += 1
+                        else:
+                            # No valid records
+                            self.stats["files_skipped"] += 1
+                        continue
+
+                    # Keep only rows not yet in the database
+                    try:
+                        df = self.filter_new_rows(symbol, df)
+                    except Exception as e:
+                        logger.warning(f"Failed to import {symbol}: {e}")
+                        self.stats["files_skipped"] += 1
+                        continue
 
-                # Parse data
-                df = parse_tdx_day_file(data)
-                if df.empty:
-                    self.stats["files_skipped"] += 1
-                    continue
+                    self.stats["files_processed"] += 1
+                    if df.empty:
+                        continue
+
+                    batch.append((symbol, df))
+                    batch_rows += len(df)
+
+                    # Write batch
+                    if (
+                        batch_rows >= self.batch_rows
+                        or len(batch) >= self.batch_max_stocks
+                    ):
+                        self._queue_batch(batch)
+                        batch = []
+                        batch_rows = 0
+
+                pbar.update(unreported)
+
+                # Write remaining, all before the final checkpoint
+                if batch:
+                    self._queue_batch(batch)
+                self._stop_writer()
+        finally:
+            # Still running only if the import loop failed
+            self._stop_writer()
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
 
-                batch.append(symbol)
-                batch_data.append(df)
+        return self.stats
 
-                # Process batch
-                if len(batch) >= BATCH_SIZE:
-                    self._process_batch(batch, batch_data)
-                    batch = []
-                    batch_data = []
+    def _write_batch(self, writer: DuckDBWriter, items: list):
+        """Write a batch of stocks with a single upsert and transaction.
 
-            # Process remaining
-            if batch:
-                self._process_batch(batch, batch_data)
+        All rows are written by one stacked write_batch call, so DuckDB
+        ingests the batch as one columnar scan instead of one statement
+        per stock. If that fails, the batch is rolled back and each stock
+        is written on its own, so one bad stock does not lose the others.
 
-        return self.stats
+        Args:
+            writer: Writer to use (the writer thread's own cursor)
+            items: List of (symbol, DataFrame with rows to import)
+        """
+        writer.begin()
+        try:
+            count = writer.write_batch("stocks", items)
+            writer.commit()
+            self.stats["records_imported"] += count
+            return
+        except Exception as e:
+            logger.warning(f"Batch commit failed, retrying stock by stock: {e}")
+            writer.rollback()
 
-    def _process_batch(self, symbols: list, dataframes: list):
-        """Process a batch of stocks in a single transaction."""
-        self.writer.begin()
+        for symbol, df in items:
+            try:
+                self.stats["records_imported"] += writer.write_batch(
+                    "stocks", [(symbol, df)]
+                )
+            except Exception as e:
+                logger.warning(f"Failed to import {symbol}: {e}")
+                self.stats["files_failed"] += 1
+
+    def _start_writer(self) -> None:
+        """Start the background thread writing queued batches"""
+        self.write_queue = queue.Queue(maxsize=WRITE_QUEUE_SIZE)
+        self.write_error = None
+        self.writer_thread = threading.Thread(
+            target=self._writer_loop,
+            args=(self.writer.duplicate(),),
+            name="duckdb-writer",
+            daemon=True,
+        )
+        self.writer_thread.start()
+
+    def _stop_writer(self) -> None:
+        """Write the queued batches, stop the writer thread and raise its error"""
+        if self.writer_thread is None:
+            return
+
+        self.write_queue.put(None)
+        self.writer_thread.join()
+        self.writer_thread = None
+        self.write_queue = None
+
+        error, self.write_error = self.write_error, None
+        if error is not None:
+            raise error
+
+    def _queue_batch(self, items: list) -> None:
+        """Hand a batch to the writer thread, failing fast on a write error"""
+        if self.write_error is not None:
+            raise self.write_error
+        self.write_queue.put(items)
+
+    def _writer_loop(self, writer: DuckDBWriter) -> None:
+        """Write queued batches until a None sentinel is received
+
+        After a failed batch the remaining batches are drained unwritten,
+        so the import loop never blocks on a full queue; the error is
+        raised in the importing thread.
+        """
         try:
-            for symbol, df in zip(symbols, dataframes):
+            while (items := self.write_queue.get()) is not None:
+                if self.write_error is not None:
+                    continue
                 try:
-                    self.import_stock(symbol, df)
-                    self.stats["files_processed"] += 1
+                    self._write_batch(writer, items)
                 except Exception as e:
-                    logger.warning(f"Failed to import {symbol}: {e}")
-                    self.stats["files_skipped"] += 1
-
-            self.writer.commit()
-        except Exception as e:
-            logger.error(f"Batch commit failed: {e}")
-            self.writer.rollback()
-            raise
+                    self.write_error = e
+        finally:
+            writer.close()
 
     def close(self):
         """Close database connection."""
@@ -470,8 +913,33 @@ Data source:
         action="store_true",
         help="Full import (ignore existing data, reimport all)",
     )
+    parser.add_argument(
+        "--extract-workers",
+        type=int,
+        default=EXTRACT_WORKERS,
+        help=f"Threads reading ZIP members or files (default: {EXTRACT_WORKERS})",
+    )
+    parser.add_argument(
+        "--batch-rows",
+        type=int,
+        default=BATCH_ROWS,
+        help=f"Target rows per transaction (default: {BATCH_ROWS})",
+    )
+    parser.add_argument(
+        "--batch-stocks",
+        type=int,
+        default=BATCH_MAX_STOCKS,
+        help=f"Max stocks per transaction (default: {BATCH_MAX_STOCKS})",
+    )
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=PARSE_WORKERS,
+        help=f"Processes parsing .day files (default: {PARSE_WORKERS})",
+    )
 
     args = parser.parse_args()
+    setup_logging()
 
     source_path = Path(args.source)
     if not source_path.exists():
@@ -485,7 +953,14 @@ Data source:
     print(f"Database: {args.db}")
     print()
 
-    importer = TdxDayImporter(db_path=args.db, full_import=args.full)
+    importer = TdxDayImporter(
+        db_path=args.db,
+        full_import=args.full,
+        extract_workers=args.extract_workers,
+        batch_rows=args.batch_rows,
+        batch_max_stocks=args.batch_stocks,
+        parse_workers=args.parse_workers,
+    )
 
     try:
         stats = importer.import_from_source(source_path)
@@ -496,6 +971,8 @@ Data source:
         print("=" * 60)
         print(f"Files processed: {stats['files_processed']}")
         print(f"Files skipped: {stats['files_skipped']}")
+        if stats["files_failed"] > 0:
+            print(f"Files failed to write: {stats['files_failed']}")
         print(f"Records imported: {stats['records_imported']}")
 
         if stats["records_backfilled"] > 0:
@@ -27,34 +27,47 @@ Usage:
 import argparse
 import logging
 import tempfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 from tqdm import tqdm
 
 from simtradedata.config.mootdx_finvalue_map import (
-    FINVALUE_TO_PTRADE,
-    parse_finvalue_date,
+    FINVALUE_PUBL_DATE,
+    FINVALUE_REPORT_DATE,
+    FINVALUE_VALUE_NAMES,
+    FINVALUE_VALUE_POSITIONS,
 )
-from simtradedata.utils.code_utils import convert_to_ptrade_code
+from simtradedata.utils.code_utils import A_SHARE_PREFIXES, convert_to_ptrade_codes
+from simtradedata.utils.file_cache import TTL_DAY, FileCache
 from simtradedata.writers.duckdb_writer import DEFAULT_DB_PATH, DuckDBWriter
 
 # Configuration
 LOG_FILE = "data/import_tdx_finance.log"
-BATCH_SIZE = 100  # Stocks per transaction
+# Quarter ZIPs downloaded concurrently, ahead of the quarter being written
+DOWNLOAD_WORKERS = 2
+# Server file list is reused from data/.cache for this long (seconds)
+CACHE_TTL_FILE_LIST = TTL_DAY
 
-Path(LOG_FILE).parent.mkdir(parents=True, exist_ok=True)
-
-logging.basicConfig(
-    filename=LOG_FILE,
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    filemode="w",
-)
 logger = logging.getLogger(__name__)
 
 
+def setup_logging() -> None:
+    """Log to LOG_FILE."""
+    Path(LOG_FILE).parent.mkdir(parents=True, exist_ok=True)
+
+    logging.basicConfig(
+        filename=LOG_FILE,
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+        filemode="w",
+    )
+
+
 def parse_quarter_from_filename(filename: str) -> tuple:
     """
     Extract year and quarter from gpcw filename.
@@ -81,14 +94,56 @@ def parse_quarter_from_filename(filename: str) -> tuple:
 
 def is_a_share_stock(code: str) -> bool:
     """Filter to only A-share stocks."""
-    if len(code) != 6:
-        return False
-    prefix = code[:3]
-    valid_prefixes = {
-        '600', '601', '603', '605', '688', '689',  # SH
-        '000', '001', '002', '003', '300', '301',  # SZ
-    }
-    return prefix in valid_prefixes
+    return len(code) == 6 and code[:3] in A_SHARE_PREFIXES
+
+
+def _ymd_to_datetime(ymd: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    """
+    Convert YYYYMMDD integers to datetime64[ns] with integer arithmetic.
+
+    Args:
+        ymd: YYYYMMDD values
+        valid: Mask of values to convert, others (and values that are not
+            calendar dates, e.g. 20230230) become NaT
+
+    Returns:
+        datetime64[ns] array
+    """
+    # Masked values are replaced first so no out of range dates are built
+    ymd = np.where(valid, ymd, 19700101)
+    year = ymd // 10000
+    month = ymd // 100 % 100
+    day = ymd % 100
+
+    valid = valid & (month >= 1) & (month <= 12) & (day >= 1) & (day <= 31)
+    months = ((year - 1970) * 12 + (month - 1)).astype("datetime64[M]")
+    dates = months.astype("datetime64[D]") + (day - 1)
+    # Days past the end of the month roll over into the next one
+    valid &= dates.astype("datetime64[M]") == months
+
+    return np.where(valid, dates, np.datetime64("NaT")).astype("datetime64[ns]")
+
+
+def report_dates(column: pd.Series) -> np.ndarray:
+    """Report dates from a FINVALUE YYYYMMDD column, NaT if invalid"""
+    raw = pd.to_numeric(column, errors="coerce").to_numpy(dtype=np.float64)
+    known = np.isfinite(raw)
+    ymd = np.where(known, raw, 0).astype(np.int64)
+    year = ymd // 10000
+    return _ymd_to_datetime(ymd, known & (year >= 1990) & (year <= 2100))
+
+
+def publ_dates(column: pd.Series) -> np.ndarray:
+    """
+    Announcement dates from a FINVALUE YYMMDD column, NaT if missing.
+
+    Vectorized parse_finvalue_date: years below 50 are 20xx, others 19xx.
+    """
+    raw = pd.to_numeric(column, errors="coerce").to_numpy(dtype=np.float64)
+    known = np.isfinite(raw)
+    yymmdd = np.where(known, raw, 0).astype(np.int64)
+    century = np.where(yymmdd // 10000 < 50, 20000000, 19000000)
+    return _ymd_to_datetime(yymmdd + century, known & (yymmdd > 0) & (yymmdd < 1000000))
 
 
 class TdxFinanceImporter:
@@ -99,11 +154,17 @@ class TdxFinanceImporter:
         db_path: str = DEFAULT_DB_PATH,
         download_dir: str = None,
         full_import: bool = False,
+        download_workers: int = DOWNLOAD_WORKERS,
+        refresh_index: bool = False,
     ):
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         self.writer = DuckDBWriter(db_path=str(self.db_path))
         self.full_import = full_import
+        self.download_workers = max(1, download_workers)
+
+        # Holds the server file list only, written inline
+        self.cache = FileCache(force_refresh=refresh_index, write_workers=0)
 
         if download_dir:
             self.download_dir = Path(download_dir)
@@ -119,13 +180,25 @@ class TdxFinanceImporter:
         }
 
     def list_available_quarters(self) -> list:
-        """List all available quarter files from TDX server."""
+        """
+        List all available quarter files from TDX server.
+
+        The server's file list is cached for CACHE_TTL_FILE_LIST, so
+        re-runs (and --list-only) skip the listing round trip;
+        --refresh-index fetches it again.
+        """
         from mootdx.affair import Affair
 
-        files = Affair.files()
+        files = self.cache.get_or_fetch(
+            "tdx_gpcw_files",
+            (),
+            lambda: pd.DataFrame(Affair.files()),
+            ttl=CACHE_TTL_FILE_LIST,
+        )
+        self.cache.flush()
         quarters = []
 
-        for f in files:
+        for f in files.to_dict("records"):
             filename = f["filename"]
             filesize = f["filesize"]
 
@@ -156,38 +229,56 @@ class TdxFinanceImporter:
         """
         Download and parse a quarter's financial data.
 
-        Affair.fetch() downloads the file, Affair.parse() reads it.
-        The returned DataFrame has:
-        - index: stock code (e.g., '000001')
-        - columns: Chinese field names, positional index = FINVALUE ID
-        - column[0] = report_date (YYYYMMDD as float)
-
         Returns DataFrame with columns mapped to PTrade format.
         """
+        self.download_quarter(filename)
+        return self.parse_quarter(filename)
+
+    def download_quarter(self, filename: str) -> None:
+        """
+        Download a quarter's ZIP file into download_dir with Affair.fetch().
+
+        Only touches the network and the file, so it can run on a
+        background thread while another quarter is parsed and written.
+        """
         from mootdx.affair import Affair
 
         try:
-            # Download the file
             Affair.fetch(
                 downdir=str(self.download_dir),
                 filename=filename,
             )
+        except Exception as e:
+            logger.error(f"Failed to fetch {filename}: {e}")
+            raise
+
+    def parse_quarter(self, filename: str) -> pd.DataFrame:
+        """
+        Parse a downloaded quarter's ZIP file with Affair.parse().
 
-            # Parse the downloaded file
+        The raw DataFrame has:
+        - index: stock code (e.g., '000001')
+        - columns: Chinese field names, positional index = FINVALUE ID
+        - column[0] = report_date (YYYYMMDD as float)
+
+        Returns DataFrame with columns mapped to PTrade format.
+        """
+        from mootdx.affair import Affair
+
+        try:
             raw_df = Affair.parse(
                 downdir=str(self.download_dir),
                 filename=filename,
             )
-
-            if raw_df is None or raw_df.empty:
-                return pd.DataFrame()
-
-            return self._convert_to_ptrade_format(raw_df)
-
         except Exception as e:
-            logger.error(f"Failed to fetch {filename}: {e}")
+            logger.error(f"Failed to parse {filename}: {e}")
             raise
 
+        if raw_df is None or raw_df.empty:
+            return pd.DataFrame()
+
+        return self._convert_to_ptrade_format(raw_df)
+
     def _convert_to_ptrade_format(self, raw_df: pd.DataFrame) -> pd.DataFrame:
         """
         Convert Affair DataFrame to PTrade format.
@@ -197,100 +288,67 @@ class TdxFinanceImporter:
         - columns: positional index matches FINVALUE ID
         - column 0 = report_date (YYYYMMDD format), 314 = 财报公告日期 (YYMMDD format)
         """
-        records = []
         num_cols = len(raw_df.columns)
+        if FINVALUE_REPORT_DATE >= num_cols:
+            return pd.DataFrame()
 
-        for code, row in raw_df.iterrows():
-            code = str(code)
-            if not is_a_share_stock(code):
-                continue
-
-            ptrade_code = convert_to_ptrade_code(code, "qstock")
-            record = {"symbol": ptrade_code}
-
-            for idx, (field_name, desc, unit) in FINVALUE_TO_PTRADE.items():
-                if idx >= num_cols:
-                    continue
-
-                value = row.iloc[idx]
-
-                # Parse date fields
-                if field_name == "_report_date_raw":
-                    # YYYYMMDD format (8 digits)
-                    try:
-                        date_int = int(value)
-                        year = date_int // 10000
-                        month = (date_int % 10000) // 100
-                        day = date_int % 100
-                        if 1990 <= year <= 2100 and 1 <= month <= 12 and 1 <= day <= 31:
-                            record["end_date"] = f"{year:04d}-{month:02d}-{day:02d}"
-                    except (ValueError, TypeError):
-                        pass
-                elif field_name == "_publ_date_raw":
-                    # YYMMDD format (6 digits)
-                    try:
-                        date_str = parse_finvalue_date(int(value))
-                        if date_str:
-                            record["publ_date"] = date_str
-                    except (ValueError, TypeError):
-                        pass
-                elif not field_name.startswith("_"):
-                    try:
-                        v = float(value)
-                        # FINVALUE uses 0 for null
-                        record[field_name] = v if v != 0.0 else None
-                    except (ValueError, TypeError):
-                        record[field_name] = None
-
-            if "end_date" in record:
-                records.append(record)
-
-        if not records:
+        # A-share rows with a valid report date. Only these rows of the
+        # needed columns are copied out of the raw frame, and the result
+        # is built column-wise without any per-row records.
+        codes = raw_df.index.astype(str)
+        end_dates = report_dates(raw_df.iloc[:, FINVALUE_REPORT_DATE])
+        keep = np.asarray(
+            (codes.str.len() == 6) & codes.str[:3].isin(A_SHARE_PREFIXES)
+        ) & ~np.isnat(end_dates)
+        rows = np.flatnonzero(keep)
+        if len(rows) == 0:
             return pd.DataFrame()
 
-        df = pd.DataFrame(records)
-        df["end_date"] = pd.to_datetime(df["end_date"])
-        if "publ_date" in df.columns:
-            df["publ_date"] = pd.to_datetime(df["publ_date"])
+        # All value fields as one float matrix, column by column conversion
+        # instead of one float() per cell
+        # Positions are ascending, fields present in this file form a prefix
+        present = int(np.searchsorted(FINVALUE_VALUE_POSITIONS, num_cols))
+        data = raw_df.iloc[rows, list(FINVALUE_VALUE_POSITIONS[:present])]
+        # Affair.parse yields float columns, only other dtypes need coercing
+        if not all(pd.api.types.is_numeric_dtype(dtype) for dtype in data.dtypes):
+            data = data.apply(pd.to_numeric, errors="coerce")
+        values = data.to_numpy(dtype=np.float64, copy=True)
+
+        # FINVALUE uses 0 for null, masked in place over the whole matrix
+        values[values == 0.0] = np.nan
+
+        df = pd.DataFrame(values, columns=FINVALUE_VALUE_NAMES[:present])
+        symbols = convert_to_ptrade_codes(pd.Series(codes[rows]), "qstock")
+        df.insert(0, "symbol", symbols.to_numpy())
+        df.insert(1, "end_date", end_dates[rows])
+        if FINVALUE_PUBL_DATE < num_cols:
+            df["publ_date"] = publ_dates(raw_df.iloc[rows, FINVALUE_PUBL_DATE])
 
         logger.info(f"Converted {len(df)} rows, {len(df.columns)} columns")
         return df
 
     def import_quarter(self, filename: str, year: int, quarter: int) -> int:
         """Import a single quarter's data."""
-        df = self.fetch_and_parse_quarter(filename)
+        return self.write_quarter(self.fetch_and_parse_quarter(filename), year, quarter)
 
+    def write_quarter(self, df: pd.DataFrame, year: int, quarter: int) -> int:
+        """Write a parsed quarter, returning the number of stocks written."""
         if df.empty:
             logger.warning(f"No data for {year}Q{quarter}")
             return 0
 
-        # Group by symbol and write
-        success_count = 0
-        symbols = df["symbol"].unique()
-
-        # Process in batches
-        for i in range(0, len(symbols), BATCH_SIZE):
-            batch_symbols = symbols[i:i + BATCH_SIZE]
-
-            self.writer.begin()
-            try:
-                for symbol in batch_symbols:
-                    symbol_df = df[df["symbol"] == symbol].copy()
-                    symbol_df = symbol_df.drop(columns=["symbol"])
-
-                    if "end_date" in symbol_df.columns:
-                        symbol_df = symbol_df.set_index("end_date")
-
-                    self.writer.write_fundamentals(symbol, symbol_df)
-                    success_count += 1
-                    self.stats["records_imported"] += len(symbol_df)
-
-                self.writer.commit()
-            except Exception as e:
-                logger.error(f"Batch failed for {year}Q{quarter}: {e}")
-                self.writer.rollback()
-                raise
+        # The whole quarter (symbol column included) is written with one
+        # upsert in one transaction, instead of one statement per symbol
+        self.writer.begin()
+        try:
+            self.stats["records_imported"] += self.writer.write_fundamentals_frame(df)
+            self.writer.commit()
+        except Exception as e:
+            logger.error(f"Write failed for {year}Q{quarter}: {e}")
+            self.writer.rollback()
+            raise
 
+        success_count = df["symbol"].nunique()
         self.stats["stocks_imported"] += success_count
         return success_count
 
@@ -328,24 +386,57 @@ class TdxFinanceImporter:
 
         print()
 
-        for q in tqdm(pending, desc="Importing quarters", unit="quarter"):
-            year, quarter = q["year"], q["quarter"]
-            filename = q["filename"]
+        # The next quarters download on worker threads while this thread
+        # parses and writes the current one (DuckDB is only written here).
+        # At most download_workers downloads run ahead of the writer.
+        executor = ThreadPoolExecutor(
+            max_workers=self.download_workers, thread_name_prefix="gpcw"
+        )
+        queued = iter(pending)
+        downloads = deque()
 
-            try:
-                count = self.import_quarter(filename, year, quarter)
+        def queue_download():
+            q = next(queued, None)
+            if q is not None:
+                future = executor.submit(self.download_quarter, q["filename"])
+                downloads.append((q, future))
 
-                if count > 0:
-                    self.writer.mark_fundamental_quarter_completed(
-                        year, quarter, count
-                    )
-                    self.stats["quarters_processed"] += 1
-                else:
-                    self.stats["quarters_skipped"] += 1
+        try:
+            for _ in range(self.download_workers):
+                queue_download()
+
+            # Defer checkpoints until all quarters are written
+            with (
+                self.writer.bulk_load(),
+                tqdm(
+                    total=len(pending), desc="Importing quarters", unit="quarter"
+                ) as pbar,
+            ):
+                while downloads:
+                    q, download = downloads.popleft()
+                    queue_download()
+                    year, quarter = q["year"], q["quarter"]
 
-            except Exception as e:
-                logger.error(f"Failed {year}Q{quarter}: {e}")
-                self.stats["quarters_skipped"] += 1
+                    try:
+                        download.result()
+                        df = self.parse_quarter(q["filename"])
+                        count = self.write_quarter(df, year, quarter)
+
+                        if count > 0:
+                            self.writer.mark_fundamental_quarter_completed(
+                                year, quarter, count
+                            )
+                            self.stats["quarters_processed"] += 1
+                        else:
+                            self.stats["quarters_skipped"] += 1
+
+                    except Exception as e:
+                        logger.error(f"Failed {year}Q{quarter}: {e}")
+                        self.stats["quarters_skipped"] += 1
+
+                    pbar.update(1)
+        finally:
+            executor.shutdown(cancel_futures=True)
 
         return self.stats
 
@@ -393,8 +484,20 @@ def main():
         default=None,
         help="Directory for downloaded ZIP files",
     )
+    parser.add_argument(
+        "--download-workers",
+        type=int,
+        default=DOWNLOAD_WORKERS,
+        help=f"Quarters downloaded ahead concurrently (default: {DOWNLOAD_WORKERS})",
+    )
+    parser.add_argument(
+        "--refresh-index",
+        action="store_true",
+        help="Fetch the server file list again instead of the cached one",
+    )
 
     args = parser.parse_args()
+    setup_logging()
 
     print("=" * 60)
     print("TDX Financial Data Import")
@@ -404,6 +507,8 @@ def main():
         db_path=args.db,
         download_dir=args.download_dir,
         full_import=args.full,
+        download_workers=args.download_workers,
+        refresh_index=args.refresh_index,
     )
 
     try:
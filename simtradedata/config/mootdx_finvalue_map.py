@@ -95,6 +95,19 @@ FINVALUE_TO_PTRADE = {
 # Reverse mapping: PTrade field name -> FINVALUE position
 PTRADE_TO_FINVALUE = {v[0]: k for k, v in FINVALUE_TO_PTRADE.items()}
 
+# Positions of the two date fields, which need parsing
+FINVALUE_REPORT_DATE = PTRADE_TO_FINVALUE["_report_date_raw"]
+FINVALUE_PUBL_DATE = PTRADE_TO_FINVALUE["_publ_date_raw"]
+
+# Value fields (everything but the dates) as parallel tuples sorted by
+# position, for selecting all of them from a raw frame at once
+FINVALUE_VALUE_POSITIONS = tuple(
+    sorted(k for k, v in FINVALUE_TO_PTRADE.items() if not v[0].startswith("_"))
+)
+FINVALUE_VALUE_NAMES = tuple(
+    FINVALUE_TO_PTRADE[k][0] for k in FINVALUE_VALUE_POSITIONS
+)
+
 # Core fields commonly used in analysis
 CORE_FUNDAMENTAL_FIELDS = [
     # Per-share
@@ -93,9 +93,11 @@ class DataConverter:
                         f"{symbol}.{col}: {nan_count}/{len(result)} values converted to NaN"
                     )
 
-        logger.info(
-            f"Converted market data for {symbol}: {len(result)} rows, "
-            f"{len(result.columns)} columns"
+        logger.debug(
+            "Converted market data for %s: %d rows, %d columns",
+            symbol,
+            len(result),
+            len(result.columns),
         )
 
         return result
@@ -151,7 +153,7 @@ class DataConverter:
         # calculated in the download script using market_cap_calculator.py
         # They require combining daily valuation data with quarterly fundamental data
 
-        logger.info(f"Converted valuation data for {symbol}: {len(result)} rows")
+        logger.debug("Converted valuation data for %s: %d rows", symbol, len(result))
 
         return result
 
@@ -246,9 +248,11 @@ class DataConverter:
         # Important: reindex preserves existing values, only adds NaN for truly missing columns
         final_result = mapped_result.reindex(columns=ptrade_fields)
 
-        logger.info(
-            f"Converted fundamentals for {symbol}: {len(final_result)} quarters, "
-            f"{len(final_result.columns)} indicators"
+        logger.debug(
+            "Converted fundamentals for %s: %d quarters, %d indicators",
+            symbol,
+            len(final_result),
+            len(final_result.columns),
         )
 
         return final_result
@@ -291,7 +295,7 @@ class DataConverter:
         else:
             result = pd.Series(dtype=np.float32, name="backward_a")
 
-        logger.info(f"Converted adjust factor for {symbol}: {len(result)} days")
+        logger.debug("Converted adjust factor for %s: %d days", symbol, len(result))
 
         return result
 
@@ -375,7 +379,7 @@ class DataConverter:
         ]
         result = result[[col for col in ptrade_fields if col in result.columns]]
 
-        logger.info(f"Converted exrights data for {symbol}: {len(result)} records")
+        logger.debug("Converted exrights data for %s: %d records", symbol, len(result))
 
         return result
 
@@ -410,6 +414,6 @@ class DataConverter:
             "blocks": "{}",  # TODO: Fetch industry classification
         }
 
-        logger.info(f"Converted metadata for {symbol}")
+        logger.debug("Converted metadata for %s", symbol)
 
         return metadata
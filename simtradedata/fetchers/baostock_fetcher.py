@@ -3,16 +3,27 @@ BaoStock data fetcher implementation
 """
 
 import logging
+import socket
 from datetime import datetime
 
 import baostock as bs
+import baostock.common.context as bs_context
 import pandas as pd
 
 from simtradedata.fetchers.base_fetcher import BaseFetcher
-from simtradedata.utils.code_utils import convert_from_ptrade_code, retry_on_failure
+from simtradedata.utils.code_utils import (
+    convert_from_ptrade_code,
+    convert_to_ptrade_codes,
+    retry_on_failure,
+)
 
 logger = logging.getLogger(__name__)
 
+# Socket options applied to the BaoStock session socket after login
+SOCKET_RCVBUF_BYTES = 1 << 20
+SOCKET_KEEPIDLE_SECONDS = 60
+SOCKET_KEEPINTVL_SECONDS = 30
+
 
 class BaoStockFetcher(BaseFetcher):
     """
@@ -38,6 +49,7 @@ class BaoStockFetcher(BaseFetcher):
             if lg.error_code != "0":
                 raise ConnectionError(f"BaoStock login failed: {lg.error_msg}")
             BaoStockFetcher._bs_logged_in = True
+            BaoStockFetcher._tune_socket()
             logger.info("BaoStock login successful")
         BaoStockFetcher._bs_login_count += 1
 
@@ -49,8 +61,53 @@ class BaoStockFetcher(BaseFetcher):
             if lg.error_code != "0":
                 raise ConnectionError(f"BaoStock re-login failed: {lg.error_msg}")
             cls._bs_logged_in = True
+            cls._tune_socket()
             logger.info("BaoStock re-login successful")
 
+    @staticmethod
+    def _tune_socket():
+        """Enable keep-alive, disable Nagle and enlarge the receive buffer
+
+        BaoStock keeps one module-level socket for the whole session;
+        every query is a small request followed by a (possibly large)
+        compressed response on that socket.
+        """
+        sock = getattr(bs_context, "default_socket", None)
+        if sock is None:
+            return
+
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_RCVBUF_BYTES)
+            if hasattr(socket, "TCP_KEEPIDLE"):
+                sock.setsockopt(
+                    socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, SOCKET_KEEPIDLE_SECONDS
+                )
+            if hasattr(socket, "TCP_KEEPINTVL"):
+                sock.setsockopt(
+                    socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, SOCKET_KEEPINTVL_SECONDS
+                )
+        except OSError as e:
+            logger.debug(f"Could not tune BaoStock socket: {e}")
+
+    @staticmethod
+    def _result_frame(rs) -> pd.DataFrame:
+        """Collect all pages of a BaoStock result set into one DataFrame
+
+        rs.get_data() builds a DataFrame per page and appends them one by
+        one; here the raw rows of every page are gathered first and the
+        DataFrame is built once.
+        """
+        rows = []
+        while rs.error_code == "0" and rs.next():
+            rows.extend(rs.data[rs.cur_row_num:])
+            rs.cur_row_num = len(rs.data)
+
+        if not rows:
+            return pd.DataFrame()
+        return pd.DataFrame(rows, columns=rs.fields)
+
     def _do_logout(self):
         """BaoStock-specific logout implementation"""
         BaoStockFetcher._bs_login_count -= 1
@@ -88,14 +145,14 @@ class BaoStockFetcher(BaseFetcher):
                 f"Failed to query adjust factor for {symbol}: {rs.error_msg}"
             )
 
-        df = rs.get_data()
+        df = self._result_frame(rs)
 
         if df.empty:
             # Check if it's an index (indices don't have adjust factors)
             if bs_code.startswith("sh.") and bs_code[3:].startswith("00"):
-                logger.debug(f"No adjust factor data for index {symbol} (expected)")
+                logger.debug("No adjust factor data for index %s (expected)", symbol)
             elif bs_code.startswith("sz.399"):  # Shenzhen indices
-                logger.debug(f"No adjust factor data for index {symbol} (expected)")
+                logger.debug("No adjust factor data for index %s (expected)", symbol)
             else:
                 logger.warning(f"No adjust factor data for {symbol}")
             return pd.DataFrame()
@@ -115,7 +172,7 @@ class BaoStockFetcher(BaseFetcher):
                 f"{symbol}: {nan_count}/{len(df)} adjust factors are invalid/NaN"
             )
 
-        logger.info(f"Fetched {len(df)} adjust factor rows for {symbol}")
+        logger.debug("Fetched %d adjust factor rows for %s", len(df), symbol)
 
         return df
 
@@ -140,13 +197,37 @@ class BaoStockFetcher(BaseFetcher):
                 f"Failed to query stock basic info for {symbol}: {rs.error_msg}"
             )
 
-        df = rs.get_data()
+        df = self._result_frame(rs)
 
         if df.empty:
             return pd.DataFrame()
 
         return df
 
+    @retry_on_failure()
+    def fetch_all_stock_basics(self) -> pd.DataFrame:
+        """
+        Fetch basic information for all listed and delisted securities
+
+        A single query_stock_basic() call without a code returns every
+        security, replacing one request per symbol.
+
+        Returns:
+            DataFrame with basic stock information and a 'symbol' column
+            in PTrade format
+        """
+        rs = bs.query_stock_basic()
+
+        if rs.error_code != "0":
+            raise RuntimeError(f"Failed to query all stock basic info: {rs.error_msg}")
+
+        df = self._result_frame(rs)
+
+        if df.empty:
+            return pd.DataFrame()
+
+        df["symbol"] = convert_to_ptrade_codes(df["code"])
+        return df
 
     @retry_on_failure()
     def fetch_stock_industry(self, symbol: str, date: str = None) -> pd.DataFrame:
@@ -168,7 +249,7 @@ class BaoStockFetcher(BaseFetcher):
         if rs.error_code != "0":
             raise RuntimeError(f"Failed to query industry for {symbol}: {rs.error_msg}")
 
-        df = rs.get_data()
+        df = self._result_frame(rs)
 
         if df.empty:
             logger.warning(f"No industry data for {symbol}")
@@ -194,7 +275,30 @@ class BaoStockFetcher(BaseFetcher):
         if rs.error_code != "0":
             raise RuntimeError(f"Failed to query trade calendar: {rs.error_msg}")
 
-        df = rs.get_data()
+        df = self._result_frame(rs)
+
+        if df.empty:
+            return pd.DataFrame()
+
+        return df
+
+    @retry_on_failure()
+    def fetch_all_stocks(self, date: str) -> pd.DataFrame:
+        """
+        Fetch all securities listed on a given day
+
+        Args:
+            date: Date string (YYYY-MM-DD)
+
+        Returns:
+            DataFrame with columns: code, tradeStatus, code_name
+        """
+        rs = bs.query_all_stock(day=date)
+
+        if rs.error_code != "0":
+            raise RuntimeError(f"Failed to query all stocks for {date}: {rs.error_msg}")
+
+        df = self._result_frame(rs)
 
         if df.empty:
             return pd.DataFrame()
@@ -240,7 +344,7 @@ class BaoStockFetcher(BaseFetcher):
                 f"Failed to query index stocks for {index_code}: {rs.error_msg}"
             )
 
-        df = rs.get_data()
+        df = self._result_frame(rs)
 
         if df.empty:
             logger.warning(f"No constituent stocks found for {index_code}")
@@ -286,12 +390,12 @@ class BaoStockFetcher(BaseFetcher):
         for api_func in api_calls:
             rs = api_func(code=bs_code, year=year, quarter=quarter)
             if rs.error_code == "0":
-                df = rs.get_data()
+                df = self._result_frame(rs)
                 if not df.empty:
                     dfs.append(df)
 
         if not dfs:
-            logger.debug(f"No fundamentals data for {symbol} {year}Q{quarter}")
+            logger.debug("No fundamentals data for %s %dQ%d", symbol, year, quarter)
             return pd.DataFrame()
 
         # Merge all dataframes on common keys
@@ -367,7 +471,9 @@ class BaoStockFetcher(BaseFetcher):
             if field in result.columns:
                 result[field] = pd.to_numeric(result[field], errors='coerce')
         
-        logger.info(f"Fetched fundamentals for {symbol} {year}Q{quarter}: {len(result)} rows")
+        logger.debug(
+            "Fetched fundamentals for %s %dQ%d: %d rows", symbol, year, quarter, len(result)
+        )
         return result
 
     @retry_on_failure()
@@ -402,18 +508,17 @@ class BaoStockFetcher(BaseFetcher):
                 f"Failed to query dividend data for {symbol} year {year}: {rs.error_msg}"
             )
 
-        # Use get_data() instead of iterating with next()
-        df = rs.get_data()
+        df = self._result_frame(rs)
 
         if df.empty:
-            logger.debug(f"No dividend data for {symbol} year {year}")
+            logger.debug("No dividend data for %s year %s", symbol, year)
             return pd.DataFrame()
 
         # Filter only records with valid ex-dividend date
         df = df[df["dividOperateDate"].notna() & (df["dividOperateDate"] != "")]
 
         if df.empty:
-            logger.debug(f"No valid dividend records for {symbol} year {year}")
+            logger.debug("No valid dividend records for %s year %s", symbol, year)
             return pd.DataFrame()
 
         # Map to PTrade format
@@ -441,7 +546,7 @@ class BaoStockFetcher(BaseFetcher):
             df["dividCashPsBeforeTax"], errors="coerce"
         )
 
-        logger.info(f"Fetched {len(result)} dividend records for {symbol} year {year}")
+        logger.debug("Fetched %d dividend records for %s year %s", len(result), symbol, year)
         return result
 
     def fetch_dividend_data_range(
@@ -473,8 +578,8 @@ class BaoStockFetcher(BaseFetcher):
         result = pd.concat(dfs, ignore_index=True)
         result = result.drop_duplicates(subset=["date"]).sort_values("date")
 
-        logger.info(
-            f"Fetched {len(result)} total dividend records for {symbol} "
-            f"({start_year}-{end_year})"
+        logger.debug(
+            "Fetched %d total dividend records for %s (%s-%s)",
+            len(result), symbol, start_year, end_year,
         )
         return result
@@ -18,6 +18,7 @@ from simtradedata.config.mootdx_finvalue_map import (
     FINVALUE_TO_PTRADE,
     parse_finvalue_date,
 )
+from simtradedata.utils.code_utils import coerce_numeric
 
 logger = logging.getLogger(__name__)
 
@@ -212,8 +213,7 @@ class MootdxAffairFetcher:
 
         # Convert numeric fields
         numeric_cols = [c for c in result.columns if c not in ("end_date", "publ_date")]
-        for col in numeric_cols:
-            result[col] = pd.to_numeric(result[col], errors="coerce")
+        coerce_numeric(result, numeric_cols)
 
         # Preserve stock code column if present
         for code_col in ["code", "symbol", "stock_code"]:
@@ -175,7 +175,7 @@ class MootdxFetcher(BaseFetcher):
                 df["date"] = pd.to_datetime(df["date"])
                 df = df[(df["date"] >= start_date) & (df["date"] <= end_date)]
 
-            logger.info(f"Fetched {len(df)} daily bars for {symbol}")
+            logger.debug("Fetched %d daily bars for %s", len(df), symbol)
             return df
 
         except Exception as e:
@@ -212,7 +212,7 @@ class MootdxFetcher(BaseFetcher):
 
             df = df.rename(columns={"datetime": "date", "vol": "volume"})
 
-            logger.info(f"Fetched {len(df)} minute bars for {symbol}")
+            logger.debug("Fetched %d minute bars for %s", len(df), symbol)
             return df
 
         except Exception as e:
@@ -273,7 +273,7 @@ class MootdxFetcher(BaseFetcher):
                 logger.debug(f"No XDXR data for {symbol}")
                 return pd.DataFrame()
 
-            logger.info(f"Fetched {len(df)} XDXR records for {symbol}")
+            logger.debug("Fetched %d XDXR records for %s", len(df), symbol)
             return df
 
         except Exception as e:
@@ -415,6 +415,7 @@ class MootdxFetcher(BaseFetcher):
         symbol: str,
         start_date: str,
         end_date: str,
+        raw_df: pd.DataFrame = None,
     ) -> pd.DataFrame:
         """
         Calculate adjust factors from hfq (backward adjusted) and raw prices.
@@ -426,6 +427,8 @@ class MootdxFetcher(BaseFetcher):
             symbol: Stock code in PTrade format
             start_date: Start date (YYYY-MM-DD)
             end_date: End date (YYYY-MM-DD)
+            raw_df: Raw daily bars already fetched for the same range
+                (columns: date, close). Saves one k() round trip.
 
         Returns:
             DataFrame with columns: date, backAdjustFactor
@@ -435,14 +438,18 @@ class MootdxFetcher(BaseFetcher):
         code = convert_from_ptrade_code(symbol, "mootdx")
 
         try:
-            # Fetch raw and hfq data
-            raw_df = self._client.k(
-                symbol=code,
-                begin=start_date.replace("-", ""),
-                end=end_date.replace("-", ""),
-            )
-
-            if raw_df is None or raw_df.empty:
+            # Fetch raw data unless the caller already has it
+            if raw_df is None:
+                raw_df = self._client.k(
+                    symbol=code,
+                    begin=start_date.replace("-", ""),
+                    end=end_date.replace("-", ""),
+                )
+                if raw_df is None or raw_df.empty:
+                    return pd.DataFrame()
+                raw_df = raw_df.rename(columns={"datetime": "date"})
+                raw_df["date"] = pd.to_datetime(raw_df["date"])
+            elif raw_df.empty:
                 return pd.DataFrame()
 
             hfq_df = self._client.k(
@@ -456,10 +463,7 @@ class MootdxFetcher(BaseFetcher):
                 return pd.DataFrame()
 
             # Calculate adjust factor: hfq_close / raw_close
-            raw_df = raw_df.rename(columns={"datetime": "date"})
             hfq_df = hfq_df.rename(columns={"datetime": "date"})
-
-            raw_df["date"] = pd.to_datetime(raw_df["date"])
             hfq_df["date"] = pd.to_datetime(hfq_df["date"])
 
             merged = raw_df[["date", "close"]].merge(
@@ -471,7 +475,7 @@ class MootdxFetcher(BaseFetcher):
             merged["backAdjustFactor"] = merged["close_hfq"] / merged["close_raw"]
             result = merged[["date", "backAdjustFactor"]]
 
-            logger.info(f"Calculated {len(result)} adjust factors for {symbol}")
+            logger.debug("Calculated %d adjust factors for %s", len(result), symbol)
             return result
 
         except Exception as e:
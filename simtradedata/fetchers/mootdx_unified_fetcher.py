@@ -12,7 +12,7 @@ import pandas as pd
 from simtradedata.config.field_mappings import MARKET_FIELD_MAP
 from simtradedata.fetchers.mootdx_affair_fetcher import MootdxAffairFetcher
 from simtradedata.fetchers.mootdx_fetcher import MootdxFetcher
-from simtradedata.utils.code_utils import convert_to_ptrade_code
+from simtradedata.utils.code_utils import A_SHARE_PREFIXES, convert_to_ptrade_codes
 
 logger = logging.getLogger(__name__)
 
@@ -145,35 +145,22 @@ class MootdxUnifiedFetcher:
         if df.empty:
             return []
 
-        # Filter to actual stock codes (exclude indices, funds, etc.)
-        codes = []
-        for _, row in df.iterrows():
-            code = str(row.get("code", "")).strip()
-            if not code or len(code) != 6:
-                continue
-
-            # Only include A-share stocks: 000xxx-003xxx (SZ), 600xxx-605xxx (SH)
-            first_char = code[0]
-            first_three = code[:3]
-
-            if first_char in ("0", "3"):
-                # Shenzhen main board, ChiNext
-                if first_three in ("000", "001", "002", "003", "300", "301"):
-                    ptrade_code = convert_to_ptrade_code(code, "qstock")
-                    codes.append(ptrade_code)
-            elif first_char == "6":
-                # Shanghai main board, STAR Market
-                if first_three in ("600", "601", "603", "605", "688", "689"):
-                    ptrade_code = convert_to_ptrade_code(code, "qstock")
-                    codes.append(ptrade_code)
-
-        return sorted(codes)
+        if "code" not in df.columns:
+            return []
+
+        # Filter to actual stock codes (exclude indices, funds, etc.) with
+        # one vectorized pass over the code column
+        codes = df["code"].astype(str).str.strip()
+        is_a_share = (codes.str.len() == 6) & codes.str[:3].isin(A_SHARE_PREFIXES)
+
+        return sorted(convert_to_ptrade_codes(codes[is_a_share], "qstock"))
 
     def fetch_adjust_factor(
         self,
         symbol: str,
         start_date: str,
         end_date: str,
+        raw_df: pd.DataFrame = None,
     ) -> pd.DataFrame:
         """
         Calculate backward adjust factors.
@@ -182,12 +169,14 @@ class MootdxUnifiedFetcher:
             symbol: Stock code in PTrade format
             start_date: Start date (YYYY-MM-DD)
             end_date: End date (YYYY-MM-DD)
+            raw_df: Daily data from fetch_daily_data for the same range,
+                reused instead of querying raw bars again
 
         Returns:
             DataFrame with columns: date, backAdjustFactor
         """
         return self._quotes_fetcher.fetch_adjust_factor(
-            symbol, start_date, end_date
+            symbol, start_date, end_date, raw_df=raw_df
         )
 
     def fetch_xdxr(self, symbol: str) -> pd.DataFrame:
@@ -12,7 +12,7 @@ import baostock as bs
 import pandas as pd
 
 from simtradedata.fetchers.baostock_fetcher import BaoStockFetcher
-from simtradedata.utils.code_utils import convert_from_ptrade_code
+from simtradedata.utils.code_utils import coerce_numeric, convert_from_ptrade_code
 from simtradedata.config.field_mappings import MARKET_FIELD_MAP
 
 logger = logging.getLogger(__name__)
@@ -24,7 +24,10 @@ if IS_POSIX:
     import signal
 else:
     # For Windows, we'll use threading-based timeout
+    import queue
     import threading
+    from concurrent.futures import Future
+    from concurrent.futures import TimeoutError as FutureTimeoutError
 
 
 # All fields that can be fetched from query_history_k_data_plus in one call
@@ -45,6 +48,39 @@ UNIFIED_DAILY_FIELDS = [
 ]
 
 
+class _CallWorker:
+    """Daemon thread running submitted calls one at a time
+
+    Reused across API calls instead of starting a thread per call. Calls
+    are serialized, which BaoStock's single global socket requires anyway.
+    """
+
+    def __init__(self):
+        self._calls = queue.Queue()
+        thread = threading.Thread(
+            target=self._run, name="baostock-call", daemon=True
+        )
+        thread.start()
+
+    def _run(self):
+        while True:
+            func, future = self._calls.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(func())
+            except BaseException as e:
+                future.set_exception(e)
+
+    def submit(self, func) -> "Future":
+        future = Future()
+        self._calls.put((func, future))
+        return future
+
+
+_call_worker = None
+
+
 def _run_with_timeout(func, timeout_seconds, error_message):
     """
     Run a function with timeout protection (cross-platform)
@@ -78,31 +114,21 @@ def _run_with_timeout(func, timeout_seconds, error_message):
         finally:
             signal.signal(signal.SIGALRM, old_handler)
     else:
-        # Windows: use threading
-        result = [None]
-        exception = [None]
-
-        def wrapper():
-            try:
-                result[0] = func()
-            except Exception as e:
-                exception[0] = e
-
-        thread = threading.Thread(target=wrapper)
-        thread.daemon = True
-        thread.start()
-        thread.join(timeout=timeout_seconds)
+        # Windows: run on a reusable worker thread
+        global _call_worker
+        if _call_worker is None:
+            _call_worker = _CallWorker()
 
-        if thread.is_alive():
-            # Thread is still running, timeout occurred
+        future = _call_worker.submit(func)
+        try:
+            return future.result(timeout=timeout_seconds)
+        except FutureTimeoutError:
+            # The worker is stuck in the call; leave it and start a new
+            # one for the next call
+            _call_worker = None
             logger.warning(f"Timeout: {error_message}")
             raise TimeoutError(error_message)
 
-        if exception[0]:
-            raise exception[0]
-
-        return result[0]
-
 
 class UnifiedDataFetcher(BaoStockFetcher):
     """
@@ -146,7 +172,7 @@ class UnifiedDataFetcher(BaoStockFetcher):
         # Build fields string (all fields in one call)
         fields_str = ",".join(UNIFIED_DAILY_FIELDS)
 
-        logger.debug(f"Fetching unified data for {symbol}...")
+        logger.debug("Fetching unified data for %s...", symbol)
 
         # Define API call function
         def api_call():
@@ -196,24 +222,21 @@ class UnifiedDataFetcher(BaoStockFetcher):
                     f"Failed to query unified data for {symbol}: {rs.error_msg}"
                 )
         
-        df = rs.get_data()
+        df = self._result_frame(rs)
 
         if df.empty:
-            logger.info(f"No unified data for {symbol} (may be delisted or no trading)")
+            logger.debug("No unified data for %s (may be delisted or no trading)", symbol)
             return pd.DataFrame()
         
         # Convert data types
         df["date"] = pd.to_datetime(df["date"])
         
         # Convert all numeric columns
-        numeric_cols = [c for c in df.columns if c != "date"]
-        for col in numeric_cols:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors="coerce")
+        coerce_numeric(df, [c for c in df.columns if c != "date"])
         
-        logger.info(
-            f"Fetched unified data for {symbol}: {len(df)} rows, "
-            f"{len(df.columns)} fields"
+        logger.debug(
+            "Fetched unified data for %s: %d rows, %d fields",
+            symbol, len(df), len(df.columns),
         )
         
         return df
@@ -272,7 +295,7 @@ class UnifiedDataFetcher(BaoStockFetcher):
                 f"Failed to query index data for {index_code}: {rs.error_msg}"
             )
 
-        df = rs.get_data()
+        df = self._result_frame(rs)
 
         if df.empty:
             logger.info(f"No index data for {index_code} (may be unavailable for date range)")
@@ -284,9 +307,7 @@ class UnifiedDataFetcher(BaoStockFetcher):
 
         # Convert numeric columns
         numeric_cols = ["open", "high", "low", "close", "volume", "amount"]
-        for col in numeric_cols:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors="coerce")
+        coerce_numeric(df, [c for c in numeric_cols if c in df.columns])
 
         # Rename fields to match PTrade format using centralized mapping
         # Only rename fields that exist in the DataFrame
@@ -82,13 +82,13 @@ class DataSplitter:
             result[data_type] = subset
             
             logger.debug(
-                f"Split {data_type} data: {len(subset)} rows, "
-                f"{len(subset.columns)} columns"
+                "Split %s data: %d rows, %d columns",
+                data_type, len(subset), len(subset.columns),
             )
         
-        logger.info(
-            f"Data split complete: {len(result)} data types "
-            f"({', '.join(result.keys())})"
+        logger.debug(
+            "Data split complete: %d data types (%s)",
+            len(result), ", ".join(result.keys()),
         )
 
         return result
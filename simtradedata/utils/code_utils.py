@@ -2,10 +2,21 @@
 Utility functions for stock code conversion
 """
 
-from functools import wraps
+from functools import lru_cache, wraps
 import time
 
+import numpy as np
+import pandas as pd
 
+# A-share stock code prefixes (anything else is an index/fund/bond)
+# Shanghai: 600, 601, 603, 605 (main board), 688, 689 (STAR Market)
+# Shenzhen: 000, 001, 002, 003 (main board), 300, 301 (ChiNext)
+A_SHARE_PREFIXES = frozenset(
+    {"600", "601", "603", "605", "688", "689", "000", "001", "002", "003", "300", "301"}
+)
+
+
+@lru_cache(maxsize=8192)
 def convert_to_ptrade_code(code: str, source: str = "baostock") -> str:
     """
     Convert stock code from various sources to PTrade format
@@ -54,6 +65,40 @@ def convert_to_ptrade_code(code: str, source: str = "baostock") -> str:
     return code
 
 
+def convert_to_ptrade_codes(codes: pd.Series, source: str = "baostock") -> pd.Series:
+    """
+    Vectorized convert_to_ptrade_code for a Series of codes
+
+    Args:
+        codes: Series of stock codes in source format
+        source: Data source name ('baostock', 'qstock', 'yahoo')
+
+    Returns:
+        Series of codes in PTrade format, same index as input.
+        Codes that cannot be mapped are returned unchanged.
+
+    Examples:
+        >>> convert_to_ptrade_codes(pd.Series(['sh.600000', 'sz.000001'])).tolist()
+        ['600000.SS', '000001.SZ']
+    """
+    codes = codes.astype(str)
+
+    if source == "baostock":
+        market = codes.str[:3].str.lower().map({"sh.": ".SS", "sz.": ".SZ"})
+        return (codes.str[3:] + market).where(market.notna(), codes)
+
+    elif source == "qstock":
+        first = codes.str[:1]
+        suffix = np.select(
+            [first.isin(["6", "5"]), first.isin(["0", "3"])],
+            [".SS", ".SZ"],
+            default="",
+        )
+        return codes + suffix
+
+    return codes
+
+
 def convert_from_ptrade_code(code: str, target_source: str) -> str:
     """
     Convert PTrade format code to target source format
@@ -115,6 +160,37 @@ def get_mootdx_market(symbol: str) -> int:
     return 0 if code[0] in "0123" else 1
 
 
+def coerce_numeric(df: pd.DataFrame, columns: list) -> pd.DataFrame:
+    """
+    Convert columns to float64 in a single cast
+
+    Data sources return numbers as strings with "" for missing values.
+    The columns are taken out as one object ndarray, "" is masked to NaN
+    in place and the block is cast to float64 once, replacing both a
+    pd.to_numeric call per column and the frame copies of replace().
+    If any value is not a number, falls back to per-column coercion
+    (invalid -> NaN).
+
+    Args:
+        df: DataFrame, modified in place
+        columns: Columns to convert
+
+    Returns:
+        The same DataFrame
+    """
+    if not columns:
+        return df
+
+    try:
+        values = df[columns].to_numpy(dtype=object)
+        values[values == ""] = np.nan
+        df[columns] = values.astype(np.float64)
+    except (TypeError, ValueError):
+        df[columns] = df[columns].apply(pd.to_numeric, errors="coerce")
+
+    return df
+
+
 def retry_on_failure(max_retries: int = 1, delay: float = 0.0):
     """
     Decorator factory for retrying a function on failure.
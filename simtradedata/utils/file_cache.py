@@ -0,0 +1,239 @@
+"""
+On-disk response cache for data source queries
+
+Stores fetched DataFrames as Parquet files keyed by endpoint and query
+parameters, so repeated runs (retries, partial failures, development)
+can skip identical network calls.
+
+Layout:
+    data/.cache/{endpoint}/{md5(key_parts)}.parquet
+    data/.cache/metadata.parquet  (endpoint, key, expires_at)
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from simtradedata.utils.paths import DATA_PATH
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = DATA_PATH / ".cache"
+
+# TTL presets (seconds). None means the entry never expires.
+TTL_FOREVER = None
+TTL_HOUR = 3600
+TTL_DAY = 86400
+
+# Entries are short-lived scratch data read back soon after writing, so
+# favour encode/decode speed over size (existing zstd entries stay readable)
+CACHE_COMPRESSION = "lz4"
+
+
+class FileCache:
+    """Keyed Parquet file cache with per-entry TTLs
+
+    Entry expiry times are kept in memory and persisted to a single
+    metadata.parquet sidecar on flush(), avoiding one small metadata
+    file per entry.
+
+    Parquet encoding of new entries runs on a background thread so the
+    caller can issue its next request while the previous result is being
+    compressed and written; an entry becomes visible once its file is
+    complete.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = None,
+        force_refresh: bool = False,
+        write_workers: int = 1,
+    ):
+        """
+        Args:
+            cache_dir: Cache root directory, defaults to data/.cache
+            force_refresh: Ignore existing entries (new results still stored)
+            write_workers: Background threads writing entries, 0 writes inline
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.force_refresh = force_refresh
+
+        self._meta_path = self.cache_dir / "metadata.parquet"
+        self._expires = self._load_metadata()
+        self._dirty = False
+
+        self._lock = threading.Lock()
+        self._writer = (
+            ThreadPoolExecutor(max_workers=write_workers, thread_name_prefix="cache")
+            if write_workers
+            else None
+        )
+        self._pending = set()
+
+        self.hits = 0
+        self.misses = 0
+
+    def _load_metadata(self) -> dict:
+        """Load {(endpoint, key): expires_at} from the sidecar file"""
+        if not self._meta_path.exists():
+            return {}
+        try:
+            meta = pd.read_parquet(self._meta_path)
+        except Exception as e:
+            logger.warning(f"Failed to read cache metadata, starting empty: {e}")
+            return {}
+
+        expires = meta["expires_at"].astype(object).where(
+            meta["expires_at"].notna(), None
+        )
+        return dict(zip(zip(meta["endpoint"], meta["key"]), expires))
+
+    @staticmethod
+    def make_key(*key_parts) -> str:
+        """Build a stable cache key from query parameters"""
+        raw = "|".join(str(p) for p in key_parts)
+        return hashlib.md5(raw.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, endpoint: str, key: str) -> Path:
+        return self.cache_dir / endpoint / f"{key}.parquet"
+
+    def get(self, endpoint: str, *key_parts) -> pd.DataFrame:
+        """Return cached DataFrame, or None on miss/expiry/force_refresh"""
+        if self.force_refresh:
+            self.misses += 1
+            return None
+
+        key = self.make_key(*key_parts)
+        with self._lock:
+            if (endpoint, key) not in self._expires:
+                self.misses += 1
+                return None
+            expires_at = self._expires[(endpoint, key)]
+
+        if expires_at is not None and expires_at < time.time():
+            self.misses += 1
+            return None
+
+        try:
+            df = pd.read_parquet(self._entry_path(endpoint, key))
+        except Exception as e:
+            logger.debug(f"Cache read failed for {endpoint}/{key}: {e}")
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return df
+
+    def put(
+        self,
+        endpoint: str,
+        df: pd.DataFrame,
+        *key_parts,
+        ttl: float = None,
+        keep_empty: bool = False,
+    ):
+        """Store a DataFrame under endpoint/key_parts
+
+        Args:
+            endpoint: Logical endpoint name (sub-directory)
+            df: Result to cache, empty frames are skipped unless keep_empty
+            *key_parts: Query parameters identifying the result
+            ttl: Time to live in seconds, None for never expiring
+            keep_empty: Also cache empty results, for queries where "no
+                data" is a definitive answer rather than a failure
+        """
+        if df is None or (df.empty and not keep_empty):
+            return
+
+        key = self.make_key(*key_parts)
+        expires_at = None if ttl is None else time.time() + ttl
+
+        if self._writer is None:
+            self._write_entry(endpoint, key, df, expires_at)
+            return
+
+        future = self._writer.submit(self._write_entry, endpoint, key, df, expires_at)
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._discard_pending)
+
+    def _discard_pending(self, future) -> None:
+        with self._lock:
+            self._pending.discard(future)
+
+    def _write_entry(self, endpoint: str, key: str, df: pd.DataFrame, expires_at):
+        """Write one entry file and register it once complete"""
+        path = self._entry_path(endpoint, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        try:
+            df.to_parquet(path, engine="pyarrow", compression=CACHE_COMPRESSION)
+        except Exception as e:
+            logger.debug(f"Cache write failed for {endpoint}/{key}: {e}")
+            return
+
+        with self._lock:
+            self._expires[(endpoint, key)] = expires_at
+            self._dirty = True
+
+    def wait(self) -> None:
+        """Block until all background entry writes have finished"""
+        with self._lock:
+            pending = list(self._pending)
+        for future in pending:
+            future.result()
+
+    def get_or_fetch(
+        self,
+        endpoint: str,
+        key_parts: tuple,
+        fetch_func,
+        ttl: float = None,
+        keep_empty: bool = False,
+    ):
+        """Return cached result for key_parts, or call fetch_func and cache it
+
+        Args:
+            endpoint: Logical endpoint name
+            key_parts: Tuple of query parameters
+            fetch_func: Zero-argument callable performing the real query
+            ttl: Time to live in seconds, None for never expiring
+            keep_empty: Also cache empty results (see put)
+
+        Returns:
+            DataFrame from cache or from fetch_func
+        """
+        df = self.get(endpoint, *key_parts)
+        if df is not None:
+            return df
+
+        df = fetch_func()
+        self.put(endpoint, df, *key_parts, ttl=ttl, keep_empty=keep_empty)
+        return df
+
+    def flush(self) -> None:
+        """Persist entry expiry times to metadata.parquet"""
+        self.wait()
+        if not self._dirty:
+            return
+
+        now = time.time()
+        with self._lock:
+            rows = [
+                (endpoint, key, expires_at)
+                for (endpoint, key), expires_at in self._expires.items()
+                if expires_at is None or expires_at >= now
+            ]
+        meta = pd.DataFrame(rows, columns=["endpoint", "key", "expires_at"])
+        meta["expires_at"] = meta["expires_at"].astype("float64")
+
+        tmp_path = self._meta_path.with_suffix(".tmp")
+        meta.to_parquet(tmp_path, engine="pyarrow", index=False)
+        tmp_path.replace(self._meta_path)
+        self._dirty = False
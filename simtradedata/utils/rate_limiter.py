@@ -0,0 +1,117 @@
+"""
+Adaptive request limiter for data source queries
+
+Combines an AIMD (additive increase, multiplicative decrease) concurrency
+limit with an optional sliding-window requests-per-minute cap:
+
+- Success with latency under target: limit += increase
+- Failure or slow response: limit *= decrease
+
+Usage:
+    limiter = AdaptiveLimiter(initial=2, max_limit=8)
+    with limiter.slot():
+        df = fetcher.fetch_daily_data(...)
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limiter with a sliding-window request cap
+
+    Thread-safe. Callers acquire a slot before each request; the number
+    of slots grows while the source responds quickly and halves as soon
+    as it errors or slows down.
+    """
+
+    def __init__(
+        self,
+        initial: int = 2,
+        min_limit: int = 1,
+        max_limit: int = 8,
+        increase: float = 0.5,
+        decrease: float = 0.5,
+        target_latency: float = 2.0,
+        max_rpm: int = None,
+    ):
+        """
+        Args:
+            initial: Starting concurrency limit
+            min_limit: Lower bound for the limit
+            max_limit: Upper bound for the limit
+            increase: Additive step on fast success
+            decrease: Multiplicative factor on failure/slow response
+            target_latency: Latency (seconds) above which a call counts as slow
+            max_rpm: Max requests in any 60s window, None for unlimited
+        """
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.target_latency = target_latency
+        self.max_rpm = max_rpm
+
+        self._limit = float(initial)
+        self._active = 0
+        self._cond = threading.Condition()
+        self._window = deque()
+
+    @property
+    def limit(self) -> int:
+        """Current integer concurrency limit"""
+        return max(self.min_limit, int(self._limit))
+
+    def acquire(self) -> None:
+        """Block until a slot and the RPM window allow another request"""
+        with self._cond:
+            while self._active >= self.limit:
+                self._cond.wait()
+            self._active += 1
+        self.wait_if_throttled()
+
+    def release(self) -> None:
+        """Return a slot"""
+        with self._cond:
+            self._active -= 1
+            self._cond.notify()
+
+    def wait_if_throttled(self) -> None:
+        """Sleep until the last-60s request count is below max_rpm"""
+        if not self.max_rpm:
+            return
+
+        while True:
+            with self._cond:
+                now = time.monotonic()
+                while self._window and self._window[0] <= now - 60:
+                    self._window.popleft()
+                if len(self._window) < self.max_rpm:
+                    self._window.append(now)
+                    return
+                wait = self._window[0] + 60 - now
+            time.sleep(wait)
+
+    def on_result(self, latency: float, ok: bool) -> None:
+        """Adjust the limit from one request's outcome"""
+        with self._cond:
+            if ok and latency <= self.target_latency:
+                self._limit = min(self.max_limit, self._limit + self.increase)
+            else:
+                self._limit = max(self.min_limit, self._limit * self.decrease)
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self):
+        """Hold a slot for one request and feed its outcome back"""
+        self.acquire()
+        start = time.monotonic()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            self.release()
+            self.on_result(time.monotonic() - start, ok)
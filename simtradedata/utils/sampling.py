@@ -23,14 +23,11 @@ def generate_monthly_start_dates(start_date: str, end_date: str = None) -> list:
         List of datetime objects at month starts, plus end_date if not included
     """
     end = end_date or datetime.now().strftime("%Y-%m-%d")
-    end_dt = pd.to_datetime(end)
 
-    dates = pd.date_range(start=start_date, end=end, freq="MS").to_pydatetime().tolist()
+    dates = pd.date_range(start=start_date, end=end, freq="MS")
+    dates = dates.union(pd.DatetimeIndex([pd.to_datetime(end)]))
 
-    if end_dt not in [pd.to_datetime(d) for d in dates]:
-        dates.append(end_dt.to_pydatetime())
-
-    return dates
+    return dates.to_pydatetime().tolist()
 
 
 def generate_monthly_end_dates(start_date: str, end_date: str = None) -> list:
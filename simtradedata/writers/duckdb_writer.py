@@ -8,17 +8,32 @@ with automatic upsert (INSERT OR REPLACE) for deduplication.
 
 import json
 import logging
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
 from typing import List, Optional
 
 import duckdb
+import numpy as np
 import pandas as pd
 
 logger = logging.getLogger(__name__)
 
 DEFAULT_DB_PATH = "data/simtradedata.duckdb"
 
+# COPY options for all exported Parquet files. ZSTD gives noticeably
+# smaller files than DuckDB's default Snappy at similar read speed.
+PARQUET_COPY_OPTIONS = "FORMAT PARQUET, COMPRESSION ZSTD"
+
+# WAL size allowed to build up before a checkpoint during bulk_load()
+BULK_CHECKPOINT_THRESHOLD = "1GB"
+
+# Threads used for per-symbol Parquet export
+EXPORT_WORKERS = min(8, os.cpu_count() or 1)
+
 
 class DuckDBWriter:
     """
@@ -35,6 +50,7 @@ class DuckDBWriter:
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
 
         self.conn = duckdb.connect(str(self.db_path))
+        self._existing_stocks = {}
         self._init_schema()
 
         logger.info(f"DuckDBWriter initialized: {self.db_path}")
@@ -169,23 +185,9 @@ class DuckDBWriter:
             )
         """)
 
-        self.conn.execute("""
-            CREATE TABLE IF NOT EXISTS index_constituents (
-                date VARCHAR NOT NULL,
-                index_code VARCHAR NOT NULL,
-                symbols VARCHAR NOT NULL,
-                PRIMARY KEY (date, index_code)
-            )
-        """)
-
-        self.conn.execute("""
-            CREATE TABLE IF NOT EXISTS stock_status (
-                date VARCHAR NOT NULL,
-                status_type VARCHAR NOT NULL,
-                symbols VARCHAR NOT NULL,
-                PRIMARY KEY (date, status_type)
-            )
-        """)
+        # Long format: one row per member symbol (exported as JSON lists)
+        self._create_member_table("index_constituents", "index_code")
+        self._create_member_table("stock_status", "status_type")
 
         self.conn.execute("""
             CREATE TABLE IF NOT EXISTS stock_pool (
@@ -227,6 +229,56 @@ class DuckDBWriter:
             INSERT OR REPLACE INTO version_info VALUES ('format', 'duckdb')
         """)
 
+    def _create_member_table(self, table: str, key_col: str) -> None:
+        """Create a long-format (date, key_col, symbol) membership table
+
+        Databases created by older versions stored one JSON 'symbols'
+        array per (date, key_col); those rows are unnested on first open.
+        """
+        columns = {
+            row[0] for row in self.conn.execute(
+                "SELECT column_name FROM information_schema.columns WHERE table_name = ?",
+                [table],
+            ).fetchall()
+        }
+        legacy = "symbols" in columns
+        if legacy:
+            self.conn.execute(f"ALTER TABLE {table} RENAME TO {table}_legacy")
+
+        self.conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                date VARCHAR NOT NULL,
+                {key_col} VARCHAR NOT NULL,
+                symbol VARCHAR NOT NULL,
+                PRIMARY KEY (date, {key_col}, symbol)
+            )
+        """)
+
+        if legacy:
+            self.conn.execute(f"""
+                INSERT OR IGNORE INTO {table}
+                SELECT date, {key_col}, unnest(from_json(symbols, '["VARCHAR"]'))
+                FROM {table}_legacy
+            """)
+            self.conn.execute(f"DROP TABLE {table}_legacy")
+            logger.info(f"Migrated {table} from JSON lists to long format")
+
+    def _replace_members(
+        self, table: str, key_col: str, date: str, key: str, symbols: List[str]
+    ) -> None:
+        """Replace the member symbols of one (date, key) group"""
+        self.conn.execute(
+            f"DELETE FROM {table} WHERE date = ? AND {key_col} = ?", [date, key]
+        )
+        if not symbols:
+            return
+
+        df = pd.DataFrame({"date": date, key_col: key, "symbol": list(symbols)})
+        self.conn.execute(f"""
+            INSERT OR IGNORE INTO {table} (date, {key_col}, symbol)
+            SELECT date, {key_col}, symbol FROM df
+        """)
+
     def get_sampled_dates(self) -> list:
         """Get list of dates that have already been sampled"""
         result = self.conn.execute(
@@ -241,6 +293,16 @@ class DuckDBWriter:
             [sample_date]
         )
 
+    def add_sampled_dates(self, sample_dates: list) -> None:
+        """Mark several dates as sampled in one statement"""
+        if not sample_dates:
+            return
+
+        df = pd.DataFrame({"sample_date": pd.to_datetime(sample_dates).date})
+        self.conn.execute(
+            "INSERT OR IGNORE INTO sampling_progress SELECT sample_date FROM df"
+        )
+
     def get_stock_pool(self) -> list:
         """Get all symbols in stock pool"""
         result = self.conn.execute(
@@ -250,22 +312,37 @@ class DuckDBWriter:
 
     def update_stock_pool(self, symbols: list, sample_date) -> None:
         """Update stock pool with new symbols from a sample date"""
-        for symbol in symbols:
-            self.conn.execute("""
-                INSERT INTO stock_pool (symbol, first_seen_date, last_seen_date)
-                VALUES (?, ?, ?)
-                ON CONFLICT (symbol) DO UPDATE SET
-                    last_seen_date = CASE
-                        WHEN excluded.last_seen_date > stock_pool.last_seen_date
-                        THEN excluded.last_seen_date
-                        ELSE stock_pool.last_seen_date
-                    END,
-                    first_seen_date = CASE
-                        WHEN excluded.first_seen_date < stock_pool.first_seen_date
-                        THEN excluded.first_seen_date
-                        ELSE stock_pool.first_seen_date
-                    END
-            """, [symbol, sample_date, sample_date])
+        self.merge_stock_pool(pd.DataFrame({
+            "symbol": list(symbols),
+            "first_seen_date": sample_date,
+            "last_seen_date": sample_date,
+        }))
+
+    def merge_stock_pool(self, df: pd.DataFrame) -> None:
+        """Merge (symbol, first_seen_date, last_seen_date) rows into stock pool
+
+        Existing symbols keep the earliest first_seen_date and the latest
+        last_seen_date.
+        """
+        if df.empty:
+            return
+
+        df = df[["symbol", "first_seen_date", "last_seen_date"]]
+        self.conn.execute("""
+            INSERT INTO stock_pool (symbol, first_seen_date, last_seen_date)
+            SELECT symbol, first_seen_date, last_seen_date FROM df
+            ON CONFLICT (symbol) DO UPDATE SET
+                last_seen_date = CASE
+                    WHEN excluded.last_seen_date > stock_pool.last_seen_date
+                    THEN excluded.last_seen_date
+                    ELSE stock_pool.last_seen_date
+                END,
+                first_seen_date = CASE
+                    WHEN excluded.first_seen_date < stock_pool.first_seen_date
+                    THEN excluded.first_seen_date
+                    ELSE stock_pool.first_seen_date
+                END
+        """)
 
     # ========================================
     # Fundamentals progress tracking
@@ -289,6 +366,29 @@ class DuckDBWriter:
         """, [symbol, date_str]).fetchone()
         return result is not None
 
+    def get_fundamental_symbols(self, dates: list) -> dict:
+        """Get symbols that already have fundamentals, for several quarter ends
+
+        Args:
+            dates: Quarter end dates (YYYY-MM-DD)
+
+        Returns:
+            {date: set of symbols}, with an empty set for dates without data
+        """
+        symbols = {date_str: set() for date_str in dates}
+        if not dates:
+            return symbols
+
+        result = self.conn.execute("""
+            SELECT strftime(date, '%Y-%m-%d'), list(symbol)
+            FROM fundamentals
+            WHERE date IN (SELECT unnest(?::DATE[]))
+            GROUP BY date
+        """, [list(dates)]).fetchall()
+        for date_str, date_symbols in result:
+            symbols[date_str] = set(date_symbols)
+        return symbols
+
     def get_completed_fundamental_quarters(self) -> set:
         """Get set of (year, quarter) tuples that are fully downloaded."""
         result = self.conn.execute(
@@ -305,6 +405,21 @@ class DuckDBWriter:
             VALUES (?, ?, ?)
         """, [year, quarter, stock_count])
 
+    def duplicate(self) -> "DuckDBWriter":
+        """Create a writer on a new cursor of the same database
+
+        DuckDB connections must not be shared between threads; the
+        returned writer has its own cursor and can be used from another
+        thread (e.g. a background writer) while this one keeps reading.
+        Both share the get_existing_stocks cache, so writes through either
+        writer invalidate it.
+        """
+        writer = DuckDBWriter.__new__(DuckDBWriter)
+        writer.db_path = self.db_path
+        writer.conn = self.conn.cursor()
+        writer._existing_stocks = self._existing_stocks
+        return writer
+
     def close(self) -> None:
         """Close database connection"""
         if self.conn:
@@ -318,11 +433,39 @@ class DuckDBWriter:
     def commit(self) -> None:
         """Commit current transaction"""
         self.conn.execute("COMMIT")
+        # Readers on other cursors may have cached the pre-commit symbols
+        self._existing_stocks.clear()
 
     def rollback(self) -> None:
         """Rollback current transaction"""
         self.conn.execute("ROLLBACK")
 
+    @contextmanager
+    def bulk_load(self):
+        """Defer checkpoints during a long series of batch commits
+
+        With the default threshold DuckDB checkpoints (compresses and
+        rewrites row groups) every few batches. Raising it lets batches
+        accumulate in the WAL and be compressed once by the final
+        CHECKPOINT.
+        """
+        self.conn.execute(f"SET checkpoint_threshold = '{BULK_CHECKPOINT_THRESHOLD}'")
+        try:
+            yield self
+        except BaseException:
+            # Keep the body's exception if the cleanup fails as well
+            try:
+                self._end_bulk_load()
+            except Exception as e:
+                logger.error(f"Failed to end bulk load: {e}")
+            raise
+        self._end_bulk_load()
+
+    def _end_bulk_load(self) -> None:
+        """Restore the checkpoint threshold and checkpoint the bulk load"""
+        self.conn.execute("RESET checkpoint_threshold")
+        self.conn.execute("CHECKPOINT")
+
     def __enter__(self):
         return self
 
@@ -333,93 +476,101 @@ class DuckDBWriter:
     # Core write methods (with upsert)
     # ========================================
 
-    def write_market_data(self, symbol: str, df: pd.DataFrame) -> int:
-        """Write market data with automatic upsert"""
-        if df.empty:
-            return 0
+    @staticmethod
+    def _date_frame(data) -> pd.DataFrame:
+        """Return data with its dates in a 'date' column
 
-        df = df.copy()
-        df["symbol"] = symbol
+        Accepts a DataFrame (DatetimeIndex or 'date' column) or an adjust
+        factor Series indexed by date. The result may share memory with
+        data, callers must copy before modifying it.
+        """
+        if isinstance(data, pd.Series):
+            df = data.reset_index()
+            df.columns = ["date", "adj_a"]
+            return df
 
-        if isinstance(df.index, pd.DatetimeIndex):
-            df = df.reset_index()
+        if isinstance(data.index, pd.DatetimeIndex):
+            df = data.reset_index()
             if "index" in df.columns:
                 df = df.rename(columns={"index": "date"})
+            return df
 
-        df["date"] = pd.to_datetime(df["date"]).dt.date
+        return data
 
-        columns = [
-            "symbol", "date", "open", "close", "high", "low",
-            "high_limit", "low_limit", "preclose", "volume", "money",
-        ]
-        available = [c for c in columns if c in df.columns]
-        df = df[available]
-
-        cols_str = ", ".join(available)
-        self.conn.execute(f"""
-            INSERT OR REPLACE INTO stocks ({cols_str})
-            SELECT {cols_str} FROM df
-        """)
+    def _with_symbol(self, symbol: str, data) -> pd.DataFrame:
+        """Copy one symbol's data into a frame with symbol and date columns"""
+        df = self._date_frame(data).copy()
+        df["symbol"] = symbol
+        return df
 
-        logger.debug(f"Wrote {len(df)} market rows for {symbol}")
-        return len(df)
+    @staticmethod
+    def _yyyymmdd_strings(values) -> np.ndarray:
+        """Format dates as 'YYYYMMDD' strings, None where missing or invalid
 
-    def write_valuation(self, symbol: str, df: pd.DataFrame) -> int:
-        """Write valuation data with upsert"""
-        if df.empty:
-            return 0
+        Builds the strings from integer year/month/day arithmetic instead
+        of strftime, which formats one Python object per row.
+        """
+        dates = pd.to_datetime(values, errors="coerce")
+        ymd = (dates.dt.year * 10000 + dates.dt.month * 100 + dates.dt.day).to_numpy()
+        known = ~np.isnan(ymd)
 
-        df = df.copy()
-        df["symbol"] = symbol
+        result = np.full(len(ymd), None, dtype=object)
+        result[known] = ymd[known].astype(np.int64).astype(str)
+        return result
 
-        if isinstance(df.index, pd.DatetimeIndex):
-            df = df.reset_index()
-            if "index" in df.columns:
-                df = df.rename(columns={"index": "date"})
+    @staticmethod
+    def _select_columns(df: pd.DataFrame, columns: list) -> pd.DataFrame:
+        """Keep the table columns present in df, in table order"""
+        return df[[c for c in columns if c in df.columns]]
 
-        df["date"] = pd.to_datetime(df["date"]).dt.date
+    def _upsert(self, table: str, df: pd.DataFrame) -> int:
+        """INSERT OR REPLACE all rows of a prepared frame into table
 
-        columns = [
-            "symbol", "date", "pe_ttm", "pb", "ps_ttm", "pcf",
-            "roe", "roe_ttm", "roa", "roa_ttm", "naps",
-            "total_shares", "a_floats", "turnover_rate",
-        ]
-        available = [c for c in columns if c in df.columns]
-        df = df[available]
+        'date' columns stay datetime64 and are cast to DATE by DuckDB
+        while scanning the frame, instead of materializing one Python
+        date object per row.
+        """
+        if df is None or df.empty:
+            return 0
 
-        cols_str = ", ".join(available)
+        cols_str = ", ".join(df.columns)
         self.conn.execute(f"""
-            INSERT OR REPLACE INTO valuation ({cols_str})
+            INSERT OR REPLACE INTO {table} ({cols_str})
             SELECT {cols_str} FROM df
         """)
-
-        logger.debug(f"Wrote {len(df)} valuation rows for {symbol}")
+        self._existing_stocks.pop(table, None)
         return len(df)
 
-    def write_fundamentals(self, symbol: str, df: pd.DataFrame) -> int:
-        """Write quarterly fundamentals with upsert"""
-        if df.empty:
-            return 0
+    def _market_rows(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Normalize stocks rows from a frame with symbol and date columns"""
+        df["date"] = pd.to_datetime(df["date"])
 
-        df = df.copy()
-        df["symbol"] = symbol
+        return self._select_columns(df, [
+            "symbol", "date", "open", "close", "high", "low",
+            "high_limit", "low_limit", "preclose", "volume", "money",
+        ])
 
-        if isinstance(df.index, pd.DatetimeIndex):
-            df = df.reset_index()
-            if "index" in df.columns:
-                df = df.rename(columns={"index": "date"})
+    def _valuation_rows(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Normalize valuation rows from a frame with symbol and date columns"""
+        df["date"] = pd.to_datetime(df["date"])
 
+        return self._select_columns(df, [
+            "symbol", "date", "pe_ttm", "pb", "ps_ttm", "pcf",
+            "roe", "roe_ttm", "roa", "roa_ttm", "naps",
+            "total_shares", "a_floats", "turnover_rate",
+        ])
+
+    def _fundamentals_rows(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Normalize a fundamentals frame that already has a symbol column"""
         if "end_date" in df.columns and "date" not in df.columns:
             df = df.rename(columns={"end_date": "date"})
 
-        df["date"] = pd.to_datetime(df["date"]).dt.date
+        df["date"] = pd.to_datetime(df["date"])
 
         if "publ_date" in df.columns:
-            df["publ_date"] = pd.to_datetime(
-                df["publ_date"], errors="coerce"
-            ).dt.strftime("%Y%m%d")
+            df["publ_date"] = self._yyyymmdd_strings(df["publ_date"])
 
-        columns = [
+        return self._select_columns(df, [
             "symbol", "date", "publ_date",
             "operating_revenue_grow_rate", "net_profit_grow_rate",
             "basic_eps_yoy", "np_parent_company_yoy",
@@ -432,85 +583,156 @@ class DuckDBWriter:
             "current_ratio", "quick_ratio", "debt_equity_ratio",
             "interest_cover", "roic", "roa_ebit_ttm",
             "total_shares", "a_floats",
-        ]
-        available = [c for c in columns if c in df.columns]
-        df = df[available]
+        ])
 
-        cols_str = ", ".join(available)
-        self.conn.execute(f"""
-            INSERT OR REPLACE INTO fundamentals ({cols_str})
-            SELECT {cols_str} FROM df
-        """)
+    def _exrights_rows(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Normalize exrights rows from a frame with symbol and date columns"""
+        df["date"] = pd.to_datetime(df["date"])
 
-        logger.debug(f"Wrote {len(df)} fundamental rows for {symbol}")
-        return len(df)
+        return self._select_columns(df, [
+            "symbol", "date", "allotted_ps", "rationed_ps",
+            "rationed_px", "bonus_ps", "dividend",
+        ])
 
-    def write_exrights(self, symbol: str, df: pd.DataFrame) -> int:
-        """Write exrights data with upsert"""
+    def _adjust_factor_rows(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Normalize adjust_factors rows from a frame with symbol and date columns"""
+        df["date"] = pd.to_datetime(df["date"])
+
+        if "backAdjustFactor" in df.columns:
+            if "adj_a" in df.columns:
+                df["adj_a"] = df["backAdjustFactor"].fillna(df["adj_a"])
+            else:
+                df["adj_a"] = df["backAdjustFactor"]
+
+        if "adj_b" in df.columns:
+            df["adj_b"] = df["adj_b"].fillna(0.0)
+        else:
+            df["adj_b"] = 0.0
+
+        return df[["symbol", "date", "adj_a", "adj_b"]]
+
+    def _prepare_market_data(self, symbol: str, df: pd.DataFrame) -> pd.DataFrame:
+        """Build stocks rows for a symbol"""
+        return self._market_rows(self._with_symbol(symbol, df))
+
+    def _prepare_valuation(self, symbol: str, df: pd.DataFrame) -> pd.DataFrame:
+        """Build valuation rows for a symbol"""
+        return self._valuation_rows(self._with_symbol(symbol, df))
+
+    def _prepare_fundamentals(self, symbol: str, df: pd.DataFrame) -> pd.DataFrame:
+        """Build fundamentals rows for a symbol"""
+        return self._fundamentals_rows(self._with_symbol(symbol, df))
+
+    def _prepare_exrights(self, symbol: str, df: pd.DataFrame) -> pd.DataFrame:
+        """Build exrights rows for a symbol"""
+        return self._exrights_rows(self._with_symbol(symbol, df))
+
+    def _prepare_adjust_factor(self, symbol: str, data) -> Optional[pd.DataFrame]:
+        """Build adjust_factors rows for a symbol from a Series or DataFrame"""
+        if not isinstance(data, (pd.Series, pd.DataFrame)):
+            return None
+        if data.empty:
+            return None
+
+        return self._adjust_factor_rows(self._with_symbol(symbol, data))
+
+    def write_market_data(self, symbol: str, df: pd.DataFrame) -> int:
+        """Write market data with automatic upsert"""
         if df.empty:
             return 0
 
-        df = df.copy()
-        df["symbol"] = symbol
+        count = self._upsert("stocks", self._prepare_market_data(symbol, df))
+        logger.debug(f"Wrote {count} market rows for {symbol}")
+        return count
 
-        if isinstance(df.index, pd.DatetimeIndex):
-            df = df.reset_index()
-            if "index" in df.columns:
-                df = df.rename(columns={"index": "date"})
+    def write_valuation(self, symbol: str, df: pd.DataFrame) -> int:
+        """Write valuation data with upsert"""
+        if df.empty:
+            return 0
 
-        df["date"] = pd.to_datetime(df["date"]).dt.date
+        count = self._upsert("valuation", self._prepare_valuation(symbol, df))
+        logger.debug(f"Wrote {count} valuation rows for {symbol}")
+        return count
 
-        columns = [
-            "symbol", "date", "allotted_ps", "rationed_ps",
-            "rationed_px", "bonus_ps", "dividend",
-        ]
-        available = [c for c in columns if c in df.columns]
-        df = df[available]
-
-        cols_str = ", ".join(available)
-        self.conn.execute(f"""
-            INSERT OR REPLACE INTO exrights ({cols_str})
-            SELECT {cols_str} FROM df
-        """)
+    def write_fundamentals(self, symbol: str, df: pd.DataFrame) -> int:
+        """Write quarterly fundamentals with upsert"""
+        if df.empty:
+            return 0
 
-        logger.debug(f"Wrote {len(df)} exrights rows for {symbol}")
-        return len(df)
+        count = self._upsert("fundamentals", self._prepare_fundamentals(symbol, df))
+        logger.debug(f"Wrote {count} fundamental rows for {symbol}")
+        return count
 
-    def write_adjust_factor(self, symbol: str, data) -> int:
-        """Write adjust factors with upsert"""
-        if isinstance(data, pd.Series):
-            df = data.reset_index()
-            df.columns = ["date", "adj_a"]
-        elif isinstance(data, pd.DataFrame):
-            df = data.copy()
-            if isinstance(df.index, pd.DatetimeIndex):
-                df = df.reset_index()
-                if "index" in df.columns:
-                    df = df.rename(columns={"index": "date"})
-        else:
+    def write_exrights(self, symbol: str, df: pd.DataFrame) -> int:
+        """Write exrights data with upsert"""
+        if df.empty:
             return 0
 
+        count = self._upsert("exrights", self._prepare_exrights(symbol, df))
+        logger.debug(f"Wrote {count} exrights rows for {symbol}")
+        return count
+
+    def write_fundamentals_frame(self, df: pd.DataFrame) -> int:
+        """Write fundamentals of many symbols from one frame with a symbol column"""
         if df.empty:
             return 0
 
-        df["symbol"] = symbol
-        df["date"] = pd.to_datetime(df["date"]).dt.date
+        count = self._upsert("fundamentals", self._fundamentals_rows(df.copy()))
+        logger.debug(f"Wrote {count} fundamentals rows")
+        return count
 
-        if "backAdjustFactor" in df.columns:
-            df["adj_a"] = df["backAdjustFactor"]
+    def write_adjust_factor(self, symbol: str, data) -> int:
+        """Write adjust factors with upsert"""
+        count = self._upsert(
+            "adjust_factors", self._prepare_adjust_factor(symbol, data)
+        )
+        logger.debug(f"Wrote {count} adjust factor rows for {symbol}")
+        return count
 
-        if "adj_b" not in df.columns:
-            df["adj_b"] = 0.0
+    def write_batch(self, table: str, items: list) -> int:
+        """Write per-symbol data for many symbols with a single upsert
 
-        df = df[["symbol", "date", "adj_a", "adj_b"]]
+        Stacks the raw frames of all symbols into one long frame keyed
+        by symbol, then normalizes and upserts it once, so per-row work
+        is vectorized over the whole batch instead of repeated per symbol.
 
-        self.conn.execute("""
-            INSERT OR REPLACE INTO adjust_factors
-            SELECT * FROM df
-        """)
+        Args:
+            table: One of 'stocks', 'valuation', 'fundamentals',
+                'exrights', 'adjust_factors'
+            items: List of (symbol, data) tuples, where data is what the
+                matching write_* method accepts
 
-        logger.debug(f"Wrote {len(df)} adjust factor rows for {symbol}")
-        return len(df)
+        Returns:
+            Number of rows written
+        """
+        row_builders = {
+            "stocks": self._market_rows,
+            "valuation": self._valuation_rows,
+            "fundamentals": self._fundamentals_rows,
+            "exrights": self._exrights_rows,
+            "adjust_factors": self._adjust_factor_rows,
+        }
+        build_rows = row_builders[table]
+
+        frames = []
+        symbols = []
+        for symbol, data in items:
+            if data is None or data.empty:
+                continue
+            df = self._date_frame(data)
+            if "symbol" in df.columns:
+                df = df.drop(columns="symbol")
+            frames.append(df)
+            symbols.append(symbol)
+
+        if not frames:
+            return 0
+
+        df = pd.concat(frames, keys=symbols, names=["symbol", None])
+        df = df.reset_index(level="symbol").reset_index(drop=True)
+        count = self._upsert(table, build_rows(df))
+        logger.debug(f"Wrote {count} {table} rows for {len(frames)} symbols")
+        return count
 
     def write_benchmark(self, df: pd.DataFrame) -> int:
         """Write benchmark index data"""
@@ -524,7 +746,7 @@ class DuckDBWriter:
             if "index" in df.columns:
                 df = df.rename(columns={"index": "date"})
 
-        df["date"] = pd.to_datetime(df["date"]).dt.date
+        df["date"] = pd.to_datetime(df["date"])
 
         columns = ["date", "open", "high", "low", "close", "volume", "money"]
         available = [c for c in columns if c in df.columns]
@@ -554,7 +776,7 @@ class DuckDBWriter:
         if "trade_date" in df.columns:
             df = df.rename(columns={"trade_date": "date"})
 
-        df["date"] = pd.to_datetime(df["date"]).dt.date
+        df["date"] = pd.to_datetime(df["date"])
         df = df[["date"]]
 
         self.conn.execute("""
@@ -570,8 +792,8 @@ class DuckDBWriter:
         if df.empty:
             return 0
 
-        df = df.copy()
-
+        # reset_index/rename/column selection below all return new frames,
+        # so the caller's frame is never modified without a defensive copy
         if df.index.name == "stock_code" or "stock_code" in df.columns:
             df = df.reset_index()
             if "stock_code" in df.columns:
@@ -584,44 +806,73 @@ class DuckDBWriter:
         available = [c for c in columns if c in df.columns]
         df = df[available]
 
+        # Upsert in place: new non-empty values win, missing ones keep the
+        # stored value (combine_first semantics without re-reading the table)
         cols_str = ", ".join(available)
+        updates = ",\n                ".join(
+            f"{c} = COALESCE(NULLIF(excluded.{c}, ''), stock_metadata.{c})"
+            for c in available if c != "symbol"
+        )
+        conflict_action = f"DO UPDATE SET\n                {updates}" if updates else "DO NOTHING"
         self.conn.execute(f"""
-            INSERT OR REPLACE INTO stock_metadata ({cols_str})
+            INSERT INTO stock_metadata ({cols_str})
             SELECT {cols_str} FROM df
+            ON CONFLICT (symbol) {conflict_action}
         """)
 
         logger.info(f"Wrote {len(df)} stock metadata records")
         return len(df)
 
+    def get_index_constituent_keys(self) -> set:
+        """Get set of (date, index_code) pairs already stored"""
+        result = self.conn.execute("""
+            SELECT DISTINCT date, index_code FROM index_constituents
+        """).fetchall()
+        return {(row[0], row[1]) for row in result}
+
     def write_index_constituents(
         self, date: str, index_code: str, symbols: List[str]
     ) -> None:
         """Write index constituents for a specific date"""
-        symbols_json = json.dumps(symbols, ensure_ascii=False)
-
-        self.conn.execute("""
-            INSERT OR REPLACE INTO index_constituents (date, index_code, symbols)
-            VALUES (?, ?, ?)
-        """, [date, index_code, symbols_json])
+        self._replace_members(
+            "index_constituents", "index_code", date, index_code, symbols
+        )
 
     def write_stock_status(
         self, date: str, status_type: str, symbols: List[str]
     ) -> None:
         """Write stock status for a specific date"""
-        symbols_json = json.dumps(symbols, ensure_ascii=False)
+        self._replace_members("stock_status", "status_type", date, status_type, symbols)
+
+    def add_stock_status_rows(self, df: pd.DataFrame) -> int:
+        """Add (date, status_type, symbol) rows to stock_status in one insert
+
+        Unlike write_stock_status, existing members of a (date, status_type)
+        group are kept, so runs covering a subset of symbols accumulate.
+        """
+        if df.empty:
+            return 0
 
+        df = df[["date", "status_type", "symbol"]]
         self.conn.execute("""
-            INSERT OR REPLACE INTO stock_status (date, status_type, symbols)
-            VALUES (?, ?, ?)
-        """, [date, status_type, symbols_json])
+            INSERT OR IGNORE INTO stock_status (date, status_type, symbol)
+            SELECT date, status_type, symbol FROM df
+        """)
+        return len(df)
 
     def write_global_metadata(self, meta: pd.Series) -> None:
         """Write global metadata to version_info table"""
-        for key, value in meta.items():
-            self.conn.execute("""
-                INSERT OR REPLACE INTO version_info (key, value)
-                VALUES (?, ?)
-            """, [str(key), str(value)])
+        if meta.empty:
+            return
+
+        df = pd.DataFrame({
+            "key": meta.index.astype(str),
+            "value": meta.astype(str).to_numpy(),
+        })
+        self.conn.execute("""
+            INSERT OR REPLACE INTO version_info (key, value)
+            SELECT key, value FROM df
+        """)
 
     # ========================================
     # Incremental update helpers
@@ -642,6 +893,29 @@ class DuckDBWriter:
             return str(result[0])
         return None
 
+    def get_max_dates(self, table: str) -> dict:
+        """Get maximum date per symbol in a single grouped query
+
+        Returns:
+            Dict of {symbol: 'YYYY-MM-DD'}
+        """
+        result = self.conn.execute(f"""
+            SELECT symbol, MAX(date)::VARCHAR FROM {table} GROUP BY symbol
+        """).fetchall()
+        return {row[0]: row[1] for row in result}
+
+    def get_date_ranges(self, table: str) -> dict:
+        """Get (MIN(date), MAX(date)) per symbol in a single grouped query
+
+        Returns:
+            Dict of {symbol: ('YYYY-MM-DD', 'YYYY-MM-DD')}
+        """
+        result = self.conn.execute(f"""
+            SELECT symbol, MIN(date)::VARCHAR, MAX(date)::VARCHAR
+            FROM {table} GROUP BY symbol
+        """).fetchall()
+        return {row[0]: (row[1], row[2]) for row in result}
+
     def get_min_date(self, table: str, symbol: str = None) -> Optional[str]:
         """Get minimum date for backfill detection"""
         if symbol:
@@ -658,11 +932,18 @@ class DuckDBWriter:
         return None
 
     def get_existing_stocks(self, table: str = "stocks") -> List[str]:
-        """Get list of symbols in database"""
-        result = self.conn.execute(f"""
-            SELECT DISTINCT symbol FROM {table}
-        """).fetchall()
-        return [r[0] for r in result]
+        """Get sorted list of symbols in database
+
+        The result is cached per table until this writer, or one created
+        by duplicate(), writes to it.
+        """
+        symbols = self._existing_stocks.get(table)
+        if symbols is None:
+            result = self.conn.execute(f"""
+                SELECT DISTINCT symbol FROM {table} ORDER BY symbol
+            """).fetchall()
+            symbols = self._existing_stocks[table] = [r[0] for r in result]
+        return list(symbols)
 
     def get_stock_count(self) -> int:
         """Get total number of unique stocks"""
@@ -694,50 +975,79 @@ class DuckDBWriter:
         logger.info("Exporting valuation...")
         self._export_per_symbol_table("valuation", output_path / "valuation")
 
+        # One scan of stocks shared by version.parquet and manifest.json
+        summary = self._stocks_summary()
+
         logger.info("Exporting metadata...")
-        self._export_metadata(output_path / "metadata")
+        self._export_metadata(output_path / "metadata", summary)
 
         logger.info("Exporting adjust factors...")
         self._export_adjust_factors(output_path)
 
-        self._write_manifest(output_path)
+        self._write_manifest(output_path, summary)
 
         logger.info(f"Export complete: {output_path}")
 
     def _export_per_symbol_table(self, table: str, output_dir: Path) -> None:
-        """Export table to per-symbol Parquet files using DuckDB COPY"""
+        """Export table to per-symbol Parquet files using DuckDB COPY
+
+        Symbols are sharded across EXPORT_WORKERS threads, each running its
+        own cursor. DuckDB releases the GIL while executing, so Parquet
+        encoding and ZSTD compression of different shards run in parallel.
+        """
         symbols = self.get_existing_stocks(table)
 
         if not symbols:
             logger.info(f"No data in {table} to export")
             return
 
-        for symbol in symbols:
-            output_file = output_dir / f"{symbol}.parquet"
-            # Escape single quotes in symbol for SQL safety
-            symbol_escaped = symbol.replace("'", "''")
-
-            if table == "stocks":
-                # Calculate high_limit and low_limit during export
-                self._export_stocks_with_limits(symbol_escaped, output_file)
-            elif table == "fundamentals":
-                # Calculate TTM indicators during export
-                self._export_fundamentals_with_ttm(symbol_escaped, output_file)
-            elif table == "valuation":
-                # Enrich with total_shares/a_floats from fundamentals
-                self._export_valuation_enriched(symbol_escaped, output_file)
-            else:
-                self.conn.execute(f"""
-                    COPY (
-                        SELECT * EXCLUDE (symbol) FROM {table}
-                        WHERE symbol = '{symbol_escaped}'
-                        ORDER BY date
-                    ) TO '{output_file}' (FORMAT PARQUET)
-                """)
+        workers = max(1, min(EXPORT_WORKERS, len(symbols)))
+        shards = [symbols[i::workers] for i in range(workers)]
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(self._export_symbol_shard, table, shard, output_dir)
+                for shard in shards
+            ]
+            for future in futures:
+                future.result()
 
         logger.info(f"Exported {len(symbols)} {table} files")
 
-    def _export_stocks_with_limits(self, symbol_escaped: str, output_file: Path) -> None:
+    def _export_symbol_shard(
+        self, table: str, symbols: List[str], output_dir: Path
+    ) -> None:
+        """Export one shard of symbols on a dedicated cursor"""
+        conn = self.conn.cursor()
+        try:
+            for symbol in symbols:
+                output_file = output_dir / f"{symbol}.parquet"
+                # Escape single quotes in symbol for SQL safety
+                symbol_escaped = symbol.replace("'", "''")
+
+                if table == "stocks":
+                    # Calculate high_limit and low_limit during export
+                    self._export_stocks_with_limits(conn, symbol_escaped, output_file)
+                elif table == "fundamentals":
+                    # Calculate TTM indicators during export
+                    self._export_fundamentals_with_ttm(conn, symbol_escaped, output_file)
+                elif table == "valuation":
+                    # Enrich with total_shares/a_floats from fundamentals
+                    self._export_valuation_enriched(conn, symbol_escaped, output_file)
+                else:
+                    conn.execute(f"""
+                        COPY (
+                            SELECT * EXCLUDE (symbol) FROM {table}
+                            WHERE symbol = '{symbol_escaped}'
+                            ORDER BY date
+                        ) TO '{output_file}' ({PARQUET_COPY_OPTIONS})
+                    """)
+        finally:
+            conn.close()
+
+    def _export_stocks_with_limits(
+        self, conn, symbol_escaped: str, output_file: Path
+    ) -> None:
         """
         Export stocks data with calculated price limits
 
@@ -754,7 +1064,7 @@ class DuckDBWriter:
 
         if is_chinext_star:
             # ChiNext/STAR: 20% after 2020-08-24, 10% before
-            self.conn.execute(f"""
+            conn.execute(f"""
                 COPY (
                     SELECT
                         date, open, close, high, low,
@@ -770,12 +1080,12 @@ class DuckDBWriter:
                     FROM stocks
                     WHERE symbol = '{symbol_escaped}'
                     ORDER BY date
-                ) TO '{output_file}' (FORMAT PARQUET)
+                ) TO '{output_file}' ({PARQUET_COPY_OPTIONS})
             """)
         else:
             # Normal stocks: 10% limit (ST handling needs isST from status)
             # For now, use 10% as default; ST detection could be added later
-            self.conn.execute(f"""
+            conn.execute(f"""
                 COPY (
                     SELECT
                         date, open, close, high, low,
@@ -785,11 +1095,11 @@ class DuckDBWriter:
                     FROM stocks
                     WHERE symbol = '{symbol_escaped}'
                     ORDER BY date
-                ) TO '{output_file}' (FORMAT PARQUET)
+                ) TO '{output_file}' ({PARQUET_COPY_OPTIONS})
             """)
 
     def _export_fundamentals_with_ttm(
-        self, symbol_escaped: str, output_file: Path
+        self, conn, symbol_escaped: str, output_file: Path
     ) -> None:
         """
         Export fundamentals data with TTM indicators calculated
@@ -797,7 +1107,7 @@ class DuckDBWriter:
         TTM (Trailing Twelve Months) is calculated as 4-quarter rolling average
         for ratio fields: roe, roa, net_profit_ratio, gross_income_ratio
         """
-        self.conn.execute(f"""
+        conn.execute(f"""
             COPY (
                 SELECT
                     date, publ_date,
@@ -827,11 +1137,11 @@ class DuckDBWriter:
                 FROM fundamentals
                 WHERE symbol = '{symbol_escaped}'
                 ORDER BY date
-            ) TO '{output_file}' (FORMAT PARQUET)
+            ) TO '{output_file}' ({PARQUET_COPY_OPTIONS})
         """)
 
     def _export_valuation_enriched(
-        self, symbol_escaped: str, output_file: Path
+        self, conn, symbol_escaped: str, output_file: Path
     ) -> None:
         """
         Export valuation data with enriched fields:
@@ -841,7 +1151,7 @@ class DuckDBWriter:
 
         Uses LAST_VALUE with IGNORE NULLS for forward fill.
         """
-        self.conn.execute(f"""
+        conn.execute(f"""
             COPY (
                 WITH daily_data AS (
                     SELECT
@@ -895,72 +1205,87 @@ class DuckDBWriter:
                 FROM combined
                 WINDOW w AS (ORDER BY date ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW)
                 ORDER BY date
-            ) TO '{output_file}' (FORMAT PARQUET)
+            ) TO '{output_file}' ({PARQUET_COPY_OPTIONS})
         """)
 
-    def _export_metadata(self, output_dir: Path) -> None:
+    def _has_rows(self, table: str) -> bool:
+        """Check whether a table has any row without counting all of them"""
+        return self.conn.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone() is not None
+
+    def _stocks_summary(self) -> dict:
+        """Date range and symbol count of the stocks table"""
+        result = self.conn.execute("""
+            SELECT MIN(date), MAX(date), COUNT(DISTINCT symbol)
+            FROM stocks
+        """).fetchone()
+
+        return {
+            "start_date": str(result[0]) if result[0] else "",
+            "end_date": str(result[1]) if result[1] else "",
+            "num_stocks": result[2] or 0,
+        }
+
+    def _export_metadata(self, output_dir: Path, summary: dict) -> None:
         """Export metadata tables using DuckDB COPY"""
         # stock_metadata.parquet
-        count = self.conn.execute("SELECT COUNT(*) FROM stock_metadata").fetchone()[0]
-        if count > 0:
+        if self._has_rows("stock_metadata"):
             self.conn.execute(f"""
                 COPY stock_metadata TO '{output_dir / "stock_metadata.parquet"}'
-                (FORMAT PARQUET)
+                ({PARQUET_COPY_OPTIONS})
             """)
 
         # benchmark.parquet
-        count = self.conn.execute("SELECT COUNT(*) FROM benchmark").fetchone()[0]
-        if count > 0:
+        if self._has_rows("benchmark"):
             self.conn.execute(f"""
                 COPY (SELECT * FROM benchmark ORDER BY date)
-                TO '{output_dir / "benchmark.parquet"}' (FORMAT PARQUET)
+                TO '{output_dir / "benchmark.parquet"}' ({PARQUET_COPY_OPTIONS})
             """)
 
         # trade_days.parquet
-        count = self.conn.execute("SELECT COUNT(*) FROM trade_days").fetchone()[0]
-        if count > 0:
+        if self._has_rows("trade_days"):
             self.conn.execute(f"""
                 COPY (SELECT * FROM trade_days ORDER BY date)
-                TO '{output_dir / "trade_days.parquet"}' (FORMAT PARQUET)
+                TO '{output_dir / "trade_days.parquet"}' ({PARQUET_COPY_OPTIONS})
             """)
 
-        # index_constituents.parquet
-        count = self.conn.execute("SELECT COUNT(*) FROM index_constituents").fetchone()[0]
-        if count > 0:
-            self.conn.execute(f"""
-                COPY index_constituents TO '{output_dir / "index_constituents.parquet"}'
-                (FORMAT PARQUET)
-            """)
-
-        # stock_status.parquet
-        count = self.conn.execute("SELECT COUNT(*) FROM stock_status").fetchone()[0]
-        if count > 0:
-            self.conn.execute(f"""
-                COPY stock_status TO '{output_dir / "stock_status.parquet"}'
-                (FORMAT PARQUET)
-            """)
+        # index_constituents.parquet / stock_status.parquet
+        # Members are aggregated back to one JSON array per (date, key)
+        for table, key_col in (
+            ("index_constituents", "index_code"),
+            ("stock_status", "status_type"),
+        ):
+            if self._has_rows(table):
+                self.conn.execute(f"""
+                    COPY (
+                        SELECT
+                            date, {key_col},
+                            to_json(list(symbol ORDER BY symbol))::VARCHAR AS symbols
+                        FROM {table}
+                        GROUP BY date, {key_col}
+                        ORDER BY date, {key_col}
+                    ) TO '{output_dir / f"{table}.parquet"}' ({PARQUET_COPY_OPTIONS})
+                """)
 
         # version.parquet
         result = self.conn.execute("""
             SELECT
                 (SELECT value FROM version_info WHERE key='version') as version,
-                (SELECT COUNT(DISTINCT symbol) FROM stocks) as num_stocks,
-                CURRENT_DATE as export_date,
-                (SELECT MIN(date)::VARCHAR FROM stocks) as start_date
+                CURRENT_DATE as export_date
         """).fetchone()
 
         version_data = pd.DataFrame([{
             "version": result[0] or "3.0.0",
-            "num_stocks": result[1] or 0,
-            "export_date": str(result[2]),
-            "start_date": result[3] or "",
+            "num_stocks": summary["num_stocks"],
+            "export_date": str(result[1]),
+            "start_date": summary["start_date"],
         }])
-        version_data.to_parquet(output_dir / "version.parquet", index=False)
+        version_data.to_parquet(
+            output_dir / "version.parquet", index=False, compression="zstd"
+        )
 
     def _export_adjust_factors(self, output_dir: Path) -> None:
         """Export adjust factors to pre/post files using DuckDB COPY"""
-        count = self.conn.execute("SELECT COUNT(*) FROM adjust_factors").fetchone()[0]
-        if count == 0:
+        if not self._has_rows("adjust_factors"):
             logger.info("No adjust factors to export")
             return
 
@@ -970,36 +1295,25 @@ class DuckDBWriter:
                 SELECT date, symbol, adj_a, adj_b
                 FROM adjust_factors
                 ORDER BY date, symbol
-            ) TO '{output_dir / "ptrade_adj_pre.parquet"}' (FORMAT PARQUET)
+            ) TO '{output_dir / "ptrade_adj_pre.parquet"}' ({PARQUET_COPY_OPTIONS})
         """)
 
-        # ptrade_adj_post.parquet (same data for now)
-        self.conn.execute(f"""
-            COPY (
-                SELECT date, symbol, adj_a, adj_b
-                FROM adjust_factors
-                ORDER BY date, symbol
-            ) TO '{output_dir / "ptrade_adj_post.parquet"}' (FORMAT PARQUET)
-        """)
+        # ptrade_adj_post.parquet (same data for now): copy the file
+        # instead of scanning and sorting the whole table a second time
+        shutil.copyfile(
+            output_dir / "ptrade_adj_pre.parquet",
+            output_dir / "ptrade_adj_post.parquet",
+        )
 
-    def _write_manifest(self, output_dir: Path) -> None:
+    def _write_manifest(self, output_dir: Path, summary: dict) -> None:
         """Write manifest.json"""
-        result = self.conn.execute("""
-            SELECT MIN(date), MAX(date), COUNT(DISTINCT symbol)
-            FROM stocks
-        """).fetchone()
-
-        start_date = str(result[0]) if result[0] else ""
-        end_date = str(result[1]) if result[1] else ""
-        stock_count = result[2] or 0
-
         manifest = {
             "version": "3.0.0",
             "date_range": {
-                "start": start_date,
-                "end": end_date,
+                "start": summary["start_date"],
+                "end": summary["end_date"],
             },
-            "description": f"SimTradeData export ({stock_count} stocks)",
+            "description": f"SimTradeData export ({summary['num_stocks']} stocks)",
             "export_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
         }
 
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""Tests for DuckDBWriter batch writes"""
+
+import pandas as pd
+import pytest
+
+from simtradedata.writers.duckdb_writer import DuckDBWriter
+
+
+@pytest.fixture
+def make_writer(tmp_path):
+    writers = []
+
+    def make(name="test.duckdb"):
+        writer = DuckDBWriter(db_path=str(tmp_path / name))
+        writers.append(writer)
+        return writer
+
+    yield make
+    for writer in writers:
+        writer.close()
+
+
+def market_frame(dates, close):
+    """Market data indexed by date, as DataSplitter returns it"""
+    return pd.DataFrame(
+        {
+            "open": close,
+            "close": close,
+            "high": close,
+            "low": close,
+            "volume": [100] * len(dates),
+            "money": [1000.0] * len(dates),
+        },
+        index=pd.DatetimeIndex(pd.to_datetime(dates), name="date"),
+    )
+
+
+BATCH_ITEMS = {
+    "stocks": [
+        ("600000.SS", market_frame(["2024-01-02", "2024-01-03"], [10.0, 10.5])),
+        ("000001.SZ", market_frame(["2024-01-03"], [8.0])),
+    ],
+    "valuation": [
+        (
+            "600000.SS",
+            pd.DataFrame(
+                {
+                    "date": ["2024-01-02", "2024-01-03"],
+                    "pe_ttm": [5.1, 5.2],
+                    "turnover_rate": [0.1, 0.2],
+                }
+            ),
+        ),
+        ("000001.SZ", pd.DataFrame({"date": ["2024-01-03"], "pb": [0.6]})),
+    ],
+    "exrights": [
+        (
+            "600000.SS",
+            pd.DataFrame(
+                {"bonus_ps": [0.1], "dividend": [0.5]},
+                index=pd.DatetimeIndex(["2023-07-20"]),
+            ),
+        ),
+    ],
+    "adjust_factors": [
+        (
+            "600000.SS",
+            pd.Series([1.0, 1.1], index=pd.to_datetime(["2023-01-03", "2023-07-20"])),
+        ),
+        (
+            "000001.SZ",
+            pd.DataFrame(
+                {
+                    "date": ["2023-06-14"],
+                    "backAdjustFactor": [2.0],
+                }
+            ),
+        ),
+    ],
+    "fundamentals": [
+        (
+            "600000.SS",
+            pd.DataFrame(
+                {
+                    "end_date": ["2023-12-31"],
+                    "publ_date": ["2024-03-30"],
+                    "roe": [8.5],
+                }
+            ),
+        ),
+    ],
+}
+
+WRITE_METHODS = {
+    "stocks": "write_market_data",
+    "valuation": "write_valuation",
+    "exrights": "write_exrights",
+    "adjust_factors": "write_adjust_factor",
+    "fundamentals": "write_fundamentals",
+}
+
+
+def table_rows(writer, table):
+    return writer.conn.execute(
+        f"SELECT * FROM {table} ORDER BY symbol, date"
+    ).fetchall()
+
+
+@pytest.mark.parametrize("table", list(BATCH_ITEMS))
+def test_write_batch_matches_per_symbol_writes(make_writer, table):
+    per_symbol = make_writer("per_symbol.duckdb")
+    batched = make_writer("batched.duckdb")
+    items = BATCH_ITEMS[table]
+
+    write = getattr(per_symbol, WRITE_METHODS[table])
+    expected = sum(write(symbol, data) for symbol, data in items)
+
+    assert batched.write_batch(table, items) == expected
+    assert table_rows(batched, table) == table_rows(per_symbol, table)
+
+
+def test_write_batch_leaves_input_frames_unchanged(make_writer):
+    writer = make_writer()
+    df = BATCH_ITEMS["valuation"][0][1]
+    before = df.copy()
+
+    writer.write_batch("valuation", [("600000.SS", df)])
+    pd.testing.assert_frame_equal(df, before)
+
+
+def test_write_batch_skips_empty_items(make_writer):
+    writer = make_writer()
+    items = [("600000.SS", pd.DataFrame()), ("000001.SZ", None)]
+    assert writer.write_batch("stocks", items) == 0
+    assert writer.write_batch("stocks", []) == 0
+
+
+def test_write_batch_replaces_existing_and_duplicate_rows(make_writer):
+    writer = make_writer()
+    writer.write_batch(
+        "stocks",
+        [
+            ("600000.SS", market_frame(["2024-01-02"], [10.0])),
+        ],
+    )
+
+    # An existing date and a date repeated within the batch are upserted
+    writer.write_batch(
+        "stocks",
+        [
+            (
+                "600000.SS",
+                market_frame(
+                    ["2024-01-02", "2024-01-03", "2024-01-03"], [11.0, 12.0, 12.0]
+                ),
+            ),
+            ("000001.SZ", market_frame(["2024-01-03"], [8.0])),
+        ],
+    )
+
+    rows = writer.conn.execute(
+        "SELECT symbol, strftime(date, '%Y-%m-%d'), close FROM stocks"
+        " ORDER BY symbol, date"
+    ).fetchall()
+    assert rows == [
+        ("000001.SZ", "2024-01-03", 8.0),
+        ("600000.SS", "2024-01-02", 11.0),
+        ("600000.SS", "2024-01-03", 12.0),
+    ]
+
+
+def test_existing_stocks_cache_sees_duplicate_writes(make_writer):
+    writer = make_writer()
+    assert writer.get_existing_stocks() == []
+
+    other = writer.duplicate()
+    other.begin()
+    other.write_batch("stocks", BATCH_ITEMS["stocks"])
+    other.commit()
+    other.close()
+
+    assert writer.get_existing_stocks() == ["000001.SZ", "600000.SS"]
+
+
+def test_bulk_load_keeps_the_body_exception(make_writer, monkeypatch):
+    writer = make_writer()
+
+    def failing_cleanup():
+        raise RuntimeError("cleanup")
+
+    monkeypatch.setattr(writer, "_end_bulk_load", failing_cleanup)
+    with pytest.raises(KeyError):
+        with writer.bulk_load():
+            raise KeyError("body")
+
+    # Without a body exception a failing cleanup is raised
+    with pytest.raises(RuntimeError):
+        with writer.bulk_load():
+            pass
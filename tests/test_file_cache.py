@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""Tests for the on-disk FileCache"""
+
+import pandas as pd
+import pytest
+
+from simtradedata.utils.file_cache import FileCache
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame(
+        {
+            "date": pd.to_datetime(["2024-01-02", "2024-01-03"]),
+            "close": [10.5, 10.7],
+            "volume": [1000, 2000],
+        }
+    )
+
+
+@pytest.mark.parametrize("write_workers", [0, 1])
+def test_round_trip(tmp_path, frame, write_workers):
+    cache = FileCache(cache_dir=tmp_path, write_workers=write_workers)
+    cache.put("daily", frame, "600000.SS", "2024-01-01", "2024-01-31")
+    cache.wait()
+
+    cached = cache.get("daily", "600000.SS", "2024-01-01", "2024-01-31")
+    pd.testing.assert_frame_equal(cached, frame)
+    assert cache.get("daily", "600000.SS", "2024-02-01", "2024-02-29") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_entries_survive_flush_and_reload(tmp_path, frame):
+    cache = FileCache(cache_dir=tmp_path)
+    cache.put("basic", frame, "600000.SS", ttl=3600)
+    cache.put("industry", frame, "600000.SS")
+    cache.flush()
+
+    reloaded = FileCache(cache_dir=tmp_path)
+    pd.testing.assert_frame_equal(reloaded.get("basic", "600000.SS"), frame)
+    pd.testing.assert_frame_equal(reloaded.get("industry", "600000.SS"), frame)
+
+
+def test_expired_entry_is_a_miss(tmp_path, frame):
+    cache = FileCache(cache_dir=tmp_path, write_workers=0)
+    cache.put("adjust", frame, "600000.SS", ttl=-1)
+
+    assert cache.get("adjust", "600000.SS") is None
+
+    # Expired entries are not written to the metadata sidecar
+    cache.flush()
+    assert FileCache(cache_dir=tmp_path)._expires == {}
+
+
+def test_empty_results_need_keep_empty(tmp_path):
+    empty = pd.DataFrame({"close": pd.Series(dtype="float64")})
+    cache = FileCache(cache_dir=tmp_path, write_workers=0)
+
+    cache.put("dividends", empty, "600000.SS", 2023)
+    assert cache.get("dividends", "600000.SS", 2023) is None
+
+    cache.put("dividends", empty, "600000.SS", 2023, keep_empty=True)
+    cached = cache.get("dividends", "600000.SS", 2023)
+    assert cached is not None
+    assert cached.empty
+    assert list(cached.columns) == ["close"]
+
+
+def test_force_refresh_ignores_entries(tmp_path, frame):
+    cache = FileCache(cache_dir=tmp_path, write_workers=0)
+    cache.put("daily", frame, "600000.SS")
+    cache.flush()
+
+    refreshing = FileCache(cache_dir=tmp_path, force_refresh=True, write_workers=0)
+    assert refreshing.get("daily", "600000.SS") is None
+
+    calls = []
+    result = refreshing.get_or_fetch(
+        "daily", ("600000.SS",), lambda: calls.append(1) or frame
+    )
+    assert calls == [1]
+    pd.testing.assert_frame_equal(result, frame)
+
+
+def test_get_or_fetch_calls_fetch_once(tmp_path, frame):
+    cache = FileCache(cache_dir=tmp_path, write_workers=0)
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return frame
+
+    for _ in range(3):
+        result = cache.get_or_fetch("daily", ("600000.SS",), fetch)
+        pd.testing.assert_frame_equal(result, frame)
+    assert calls == [1]
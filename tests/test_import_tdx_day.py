@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""Tests for TDX .day parsing and incremental import"""
+
+import zipfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.import_tdx_day import (
+    DAY_DTYPE,
+    TdxDayImporter,
+    classify_filename,
+    parse_tdx_day_file,
+)
+
+
+def day_bytes(dates, close=None):
+    """Encode records in the TDX .day layout, prices given in yuan"""
+    records = np.zeros(len(dates), dtype=DAY_DTYPE)
+    records["date"] = dates
+    prices = np.round(np.asarray(close or [10.0] * len(dates)) * 100)
+    for field in ("open", "high", "low", "close"):
+        records[field] = prices
+    records["amount"] = 1000.0
+    records["volume"] = 100
+    return records.tobytes()
+
+
+def write_zip(path, files):
+    """ZIP with Windows-style member paths, as hsjday.zip has"""
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for filename, data in files.items():
+            zf.writestr(f"{filename[:2]}\\lday\\{filename}", data)
+    return path
+
+
+@pytest.fixture
+def make_importer(tmp_path):
+    importers = []
+
+    def make(**kwargs):
+        importer = TdxDayImporter(db_path=str(tmp_path / "tdx.duckdb"), **kwargs)
+        importers.append(importer)
+        return importer
+
+    yield make
+    for importer in importers:
+        importer.close()
+
+
+def stored_rows(importer):
+    return importer.writer.conn.execute(
+        "SELECT symbol, strftime(date, '%Y%m%d'), close FROM stocks"
+        " ORDER BY symbol, date"
+    ).fetchall()
+
+
+class TestParseTdxDayFile:
+    def test_decodes_records(self):
+        df = parse_tdx_day_file(day_bytes([20240102, 20240103], [10.5, 10.71]))
+
+        assert list(df.columns) == [
+            "date",
+            "open",
+            "high",
+            "low",
+            "close",
+            "volume",
+            "money",
+        ]
+        assert df["date"].tolist() == list(pd.to_datetime(["2024-01-02", "2024-01-03"]))
+        assert df["close"].tolist() == [10.5, 10.71]
+        assert df["volume"].dtype == np.int64
+
+    def test_drops_invalid_dates(self):
+        # Feb 30 rolls over into March and must not become 2024-03-01
+        df = parse_tdx_day_file(
+            day_bytes([20240229, 20240230, 19891231, 20241301, 20240301])
+        )
+        assert df["date"].tolist() == list(pd.to_datetime(["2024-02-29", "2024-03-01"]))
+
+    def test_keeps_duplicated_dates(self):
+        df = parse_tdx_day_file(day_bytes([20240102, 20240103, 20240103]))
+        assert len(df) == 3
+
+    def test_ignores_trailing_partial_record(self):
+        data = day_bytes([20240102])
+        assert len(parse_tdx_day_file(data + data[:10])) == 1
+        assert parse_tdx_day_file(data[:10]).empty
+
+    def test_skip_range_leaves_covered_records_out(self):
+        data = day_bytes([20240102, 20240103, 20240104, 20240105])
+
+        df = parse_tdx_day_file(data, skip_range=(20240103, 20240104))
+        assert df["date"].tolist() == list(pd.to_datetime(["2024-01-02", "2024-01-05"]))
+
+        assert parse_tdx_day_file(data, skip_range=(20240101, 20240131)).empty
+
+
+def test_classify_filename():
+    assert classify_filename("sh600000.day") == "600000.SS"
+    assert classify_filename("sz300750.day") == "300750.SZ"
+    assert classify_filename("sz302132.day") == "302132.SZ"
+    assert classify_filename("bj430017.day") == "430017.BJ"
+    assert classify_filename("sh000001.day") is None  # SSE Composite
+    assert classify_filename("sz399001.day") is None  # SZSE Component
+    assert classify_filename("sh510300.day") is None  # ETF
+
+
+class TestFilterNewRows:
+    @pytest.fixture
+    def importer(self, make_importer):
+        importer = make_importer()
+        importer.date_ranges = {"600000.SS": ("2024-01-03", "2024-01-04")}
+        return importer
+
+    def frame(self, dates):
+        return pd.DataFrame(
+            {
+                "date": pd.to_datetime(dates),
+                "close": np.arange(len(dates), dtype=float),
+            }
+        )
+
+    def test_keeps_backfill_and_new_rows(self, importer):
+        df = importer.filter_new_rows(
+            "600000.SS",
+            self.frame(["2024-01-02", "2024-01-03", "2024-01-04", "2024-01-05"]),
+        )
+        assert df["date"].tolist() == list(pd.to_datetime(["2024-01-02", "2024-01-05"]))
+        assert importer.stats["records_backfilled"] == 1
+
+    def test_keeps_duplicated_new_dates(self, importer):
+        df = importer.filter_new_rows(
+            "600000.SS", self.frame(["2024-01-04", "2024-01-05", "2024-01-05"])
+        )
+        assert len(df) == 2
+
+    def test_unordered_dates(self, importer):
+        df = importer.filter_new_rows(
+            "600000.SS", self.frame(["2024-01-05", "2024-01-03", "2024-01-02"])
+        )
+        assert sorted(df["date"]) == list(pd.to_datetime(["2024-01-02", "2024-01-05"]))
+
+    def test_covered_rows_are_skipped(self, importer):
+        df = importer.filter_new_rows(
+            "600000.SS", self.frame(["2024-01-03", "2024-01-04"])
+        )
+        assert df.empty
+        assert importer.stats["records_skipped"] == 1
+
+    def test_unknown_symbol_keeps_everything(self, importer):
+        df = self.frame(["2024-01-03", "2024-01-04"])
+        assert importer.filter_new_rows("000001.SZ", df) is df
+
+
+class TestImportFromSource:
+    def test_incremental_import_with_duplicated_date(self, tmp_path, make_importer):
+        make_importer().import_from_source(
+            write_zip(
+                tmp_path / "first.zip",
+                {
+                    "sh600000.day": day_bytes([20240102]),
+                    "sz000001.day": day_bytes([20240102]),
+                },
+            )
+        )
+
+        importer = make_importer()
+        stats = importer.import_from_source(
+            write_zip(
+                tmp_path / "second.zip",
+                {
+                    "sh600000.day": day_bytes(
+                        [20240102, 20240103, 20240103], [10.0, 11.0, 11.0]
+                    ),
+                    "sz000001.day": day_bytes([20240102, 20240103], [10.0, 12.0]),
+                    "sh000001.day": day_bytes([20240103]),
+                },
+            )
+        )
+
+        assert stored_rows(importer) == [
+            ("000001.SZ", "20240102", 10.0),
+            ("000001.SZ", "20240103", 12.0),
+            ("600000.SS", "20240102", 10.0),
+            ("600000.SS", "20240103", 11.0),
+        ]
+        assert stats["files_processed"] == 2
+        assert stats["files_skipped"] == 1
+        assert stats["files_failed"] == 0
+
+    def test_directory_source(self, tmp_path, make_importer):
+        lday = tmp_path / "vipdoc" / "sz" / "lday"
+        lday.mkdir(parents=True)
+        (lday / "sz000001.day").write_bytes(day_bytes([20240102, 20240230]))
+        (lday / "sz399001.day").write_bytes(day_bytes([20240102]))
+
+        importer = make_importer(extract_workers=2)
+        stats = importer.import_from_source(tmp_path / "vipdoc")
+
+        assert stored_rows(importer) == [("000001.SZ", "20240102", 10.0)]
+        assert stats["records_imported"] == 1
+
+    def test_failed_stock_does_not_lose_the_batch(self, make_importer):
+        importer = make_importer()
+        good = parse_tdx_day_file(day_bytes([20240102]))
+        bad = good.assign(volume=["not a number"])
+
+        importer._write_batch(
+            importer.writer,
+            [
+                ("600000.SS", good),
+                ("000001.SZ", bad),
+                ("000002.SZ", good),
+            ],
+        )
+
+        assert [row[0] for row in stored_rows(importer)] == ["000002.SZ", "600000.SS"]
+        assert importer.stats["files_failed"] == 1
+        assert importer.stats["records_imported"] == 2
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""Tests for converting TDX FINVALUE data to PTrade fundamentals"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.import_tdx_finance import TdxFinanceImporter
+from simtradedata.config.mootdx_finvalue_map import (
+    FINVALUE_PUBL_DATE,
+    FINVALUE_REPORT_DATE,
+    PTRADE_TO_FINVALUE,
+)
+
+
+@pytest.fixture
+def importer(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        "simtradedata.utils.file_cache.DEFAULT_CACHE_DIR", tmp_path / ".cache"
+    )
+    importer = TdxFinanceImporter(
+        db_path=str(tmp_path / "finance.duckdb"),
+        download_dir=str(tmp_path / "downloads"),
+    )
+    yield importer
+    importer.writer.close()
+
+
+def affair_frame(rows, num_cols=FINVALUE_PUBL_DATE + 1):
+    """Frame shaped like Affair.parse: codes as index, fields by position"""
+    codes = list(rows)
+    df = pd.DataFrame(
+        np.zeros((len(codes), num_cols)),
+        index=pd.Index(codes, name="code"),
+    )
+    for code, fields in rows.items():
+        for position, value in fields.items():
+            df.loc[code, position] = value
+    return df
+
+
+ROE = PTRADE_TO_FINVALUE["roe"]
+BASIC_EPS = PTRADE_TO_FINVALUE["basic_eps"]
+TOTAL_ASSETS = PTRADE_TO_FINVALUE["total_assets"]
+
+
+def test_converts_a_share_rows(importer):
+    raw = affair_frame(
+        {
+            "600000": {
+                FINVALUE_REPORT_DATE: 20231231,
+                FINVALUE_PUBL_DATE: 240330,
+                BASIC_EPS: 1.25,
+                ROE: 8.5,
+                TOTAL_ASSETS: 1.2e12,
+            },
+            "000001": {FINVALUE_REPORT_DATE: 20231231, ROE: 9.0},
+            "510300": {FINVALUE_REPORT_DATE: 20231231, ROE: 1.0},  # ETF
+            "900901": {FINVALUE_REPORT_DATE: 20231231, ROE: 1.0},  # B share
+        }
+    )
+
+    df = importer._convert_to_ptrade_format(raw)
+
+    assert df["symbol"].tolist() == ["600000.SS", "000001.SZ"]
+    assert df["end_date"].tolist() == [pd.Timestamp("2023-12-31")] * 2
+    assert df["publ_date"].iloc[0] == pd.Timestamp("2024-03-30")
+    assert pd.isna(df["publ_date"].iloc[1])
+
+    first = df.iloc[0]
+    assert (first["basic_eps"], first["roe"], first["total_assets"]) == (
+        1.25,
+        8.5,
+        1.2e12,
+    )
+
+
+def test_zero_values_become_null(importer):
+    raw = affair_frame({"600000": {FINVALUE_REPORT_DATE: 20231231, ROE: 8.5}})
+
+    df = importer._convert_to_ptrade_format(raw)
+
+    assert df["roe"].iloc[0] == 8.5
+    assert pd.isna(df["basic_eps"].iloc[0])
+    assert pd.isna(df["total_assets"].iloc[0])
+
+
+def test_rows_without_a_valid_report_date_are_dropped(importer):
+    raw = affair_frame(
+        {
+            "600000": {FINVALUE_REPORT_DATE: 20230230, ROE: 1.0},  # Feb 30
+            "600001": {FINVALUE_REPORT_DATE: 0, ROE: 1.0},
+            "600002": {FINVALUE_REPORT_DATE: 19851231, ROE: 1.0},
+            "600003": {FINVALUE_REPORT_DATE: 20230930, ROE: 1.0},
+        }
+    )
+
+    df = importer._convert_to_ptrade_format(raw)
+
+    assert df["symbol"].tolist() == ["600003.SS"]
+    assert df["end_date"].tolist() == [pd.Timestamp("2023-09-30")]
+
+
+def test_short_files_keep_the_fields_they_have(importer):
+    raw = affair_frame(
+        {"600000": {FINVALUE_REPORT_DATE: 20231231, ROE: 8.5}},
+        num_cols=ROE + 1,
+    )
+
+    df = importer._convert_to_ptrade_format(raw)
+
+    assert "roe" in df.columns
+    assert "total_assets" not in df.columns
+    assert "publ_date" not in df.columns
+
+
+def test_no_a_share_rows(importer):
+    raw = affair_frame({"510300": {FINVALUE_REPORT_DATE: 20231231}})
+    assert importer._convert_to_ptrade_format(raw).empty
+
+
+def test_converted_quarter_is_written(importer):
+    raw = affair_frame(
+        {
+            "600000": {
+                FINVALUE_REPORT_DATE: 20231231,
+                FINVALUE_PUBL_DATE: 240330,
+                ROE: 8.5,
+            },
+        }
+    )
+
+    assert importer.write_quarter(importer._convert_to_ptrade_format(raw), 2023, 4) == 1
+
+    rows = importer.writer.conn.execute(
+        "SELECT symbol, strftime(date, '%Y-%m-%d'), publ_date, roe FROM fundamentals"
+    ).fetchall()
+    assert rows == [("600000.SS", "2023-12-31", "20240330", 8.5)]